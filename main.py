@@ -28,14 +28,18 @@ import csv
 import json
 import logging
 import os
-import uvicorn
+import orjson
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from pickr.config import APP_HOST, APP_PORT, DEBUG, DATA_DIR, SCHEMA_VERSION
 from pickr.models import (
-    init_db, SessionLocal, Lead, LeadCreateRequest,
-    RulesLeverageMatrix, Brand, ObjectionsKB,
+    init_db, SessionLocal, Lead, validate_lead_rows,
+    RulesLeverageMatrix, Brand, ObjectionsKB, Config,
 )
 from pickr.pipeline import PickrPipeline
+from pickr.engine.leverage import LeverageEngine, BrandMatcher
+from pickr.engine.objection_handler import ObjectionHandler
 
 # Setup logging - write to stdout instead of stderr for Railway
 import sys
@@ -48,46 +52,59 @@ logging.basicConfig(
 logger = logging.getLogger("pickr")
 
 
+SEED_SOURCES = [
+    # (marker name, data file, model, log label)
+    ("leverage_rules", "leverage_rules.json", RulesLeverageMatrix, "leverage rules"),
+    ("brands", "brands.json", Brand, "brands"),
+    ("objections_kb", "objections_kb.json", ObjectionsKB, "objection templates"),
+]
+
+
+@lru_cache(maxsize=8)
+def _load_seed(path_str: str, mtime: float) -> list[dict]:
+    """Parse a seed JSON file. Keyed on mtime so edits are picked up."""
+    return orjson.loads(Path(path_str).read_bytes())
+
+
 def seed_database(db):
     """Seed the database with leverage rules, brands, and objection templates."""
-    # Seed leverage rules
-    rules_file = DATA_DIR / "leverage_rules.json"
-    if rules_file.exists():
-        existing = db.query(RulesLeverageMatrix).count()
-        if existing == 0:
-            rules = json.loads(rules_file.read_text())
-            for r in rules:
-                db.add(RulesLeverageMatrix(**r))
-            db.commit()
-            logger.info(f"Seeded {len(rules)} leverage rules.")
-        else:
-            logger.info(f"Leverage rules already seeded ({existing} rules).")
-
-    # Seed brands
-    brands_file = DATA_DIR / "brands.json"
-    if brands_file.exists():
-        existing = db.query(Brand).count()
-        if existing == 0:
-            brands = json.loads(brands_file.read_text())
-            for b in brands:
-                db.add(Brand(**b))
-            db.commit()
-            logger.info(f"Seeded {len(brands)} brands.")
+    # One indexed lookup on config.key for all seed markers (no COUNT(*) scans)
+    markers = [f"seed:{name}" for name, _, _, _ in SEED_SOURCES]
+    applied = {row.key for row in db.query(Config.key).filter(Config.key.in_(markers))}
+
+    for name, filename, model, label in SEED_SOURCES:
+        marker = f"seed:{name}"
+        if marker in applied:
+            logger.info(f"{label.capitalize()} already seeded.")
+            continue
+
+        seed_file = DATA_DIR / filename
+        if not seed_file.exists():
+            continue
+
+        # Databases seeded before markers existed only get the marker written
+        seeded = db.query(model.id).first() is None
+        if seeded:
+            rows = _load_seed(str(seed_file), seed_file.stat().st_mtime)
+            # Through the constructor so @validates normalizers (lowercased
+            # channel/category tags) apply; the ORM still batches the INSERTs
+            db.add_all([model(**row) for row in rows])
+            logger.info(f"Seeded {len(rows)} {label}.")
         else:
-            logger.info(f"Brands already seeded ({existing} brands).")
-
-    # Seed objection templates
-    objections_file = DATA_DIR / "objections_kb.json"
-    if objections_file.exists():
-        existing = db.query(ObjectionsKB).count()
-        if existing == 0:
-            objections = json.loads(objections_file.read_text())
-            for o in objections:
-                db.add(ObjectionsKB(**o))
-            db.commit()
-            logger.info(f"Seeded {len(objections)} objection templates.")
-        else:
-            logger.info(f"Objections already seeded ({existing} templates).")
+            logger.info(f"{label.capitalize()} already seeded.")
+
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+
+        # Only once the rows are committed, or a concurrent reader could
+        # cache the empty table again before they land
+        if seeded:
+            if model is RulesLeverageMatrix:
+                LeverageEngine.invalidate_cache()
+            elif model is Brand:
+                BrandMatcher.invalidate_cache()
+            elif model is ObjectionsKB:
+                ObjectionHandler.invalidate_cache()
 
 
 def main():
@@ -112,6 +129,7 @@ def main():
 
         print(f"\n  Pickr AI v2 Dashboard running at http://localhost:{port}")
         print(f"  Schema: {SCHEMA_VERSION}\n")
+        import uvicorn  # only the serve command needs the ASGI server
         uvicorn.run(
             "pickr.web.dashboard:app",
             host=APP_HOST,
@@ -159,28 +177,22 @@ def main():
         pipeline.initialize()
         db = SessionLocal()
         try:
-            results = {"created": 0, "skipped": 0, "errors": 0}
             with open(csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    try:
-                        req = LeadCreateRequest(
-                            company_name=row.get("company_name", row.get("company", "")),
-                            website_url=row.get("website_url", row.get("website", "")),
-                            contact_email=row.get("contact_email", row.get("email", "")),
-                            channel=row.get("channel"),
-                            niche=row.get("niche"),
-                            location=row.get("location"),
-                        )
-                        result = pipeline.create_lead(db, req)
-                        if result.get("suppressed") or result.get("dedupe"):
-                            results["skipped"] += 1
-                        else:
-                            results["created"] += 1
-                    except Exception as e:
-                        logger.error(f"Row import error: {e}")
-                        results["errors"] += 1
-
+                rows = [
+                    {
+                        "company_name": row.get("company_name", row.get("company", "")),
+                        "website_url": row.get("website_url", row.get("website", "")),
+                        "contact_email": row.get("contact_email", row.get("email", "")),
+                        "channel": row.get("channel"),
+                        "niche": row.get("niche"),
+                        "location": row.get("location"),
+                    }
+                    for row in csv.DictReader(f)
+                ]
+
+            reqs, parse_errors = validate_lead_rows(rows)
+            results = pipeline.create_leads_bulk(db, reqs)
+            results["errors"] += parse_errors
             print(f"Import from {csv_path}: {results}")
         finally:
             db.close()
@@ -2,20 +2,80 @@
 Pickr AI - Audit Logging
 Forensic traceability for every state change.
 Spec: Every event writes to audit_log with request_id, actor, and payload.
+
+Entries are buffered per session and written as one multi-row INSERT when
+the session commits (or when the buffer reaches AUDIT_BUFFER_SIZE).
 """
-import uuid
+import secrets
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import event
 from sqlalchemy.orm import Session
-from pickr.models import AuditLog
+from pickr.models import AuditLog, SessionLocal
 
 logger = logging.getLogger(__name__)
 
+AUDIT_BUFFER_SIZE = 500
+
 
 def gen_request_id() -> str:
     """Generate a unique request ID for tracing across services."""
-    return f"req-{uuid.uuid4().hex[:12]}"
+    return f"req-{secrets.token_hex(6)}"
+
+
+@dataclass
+class AuditEntry:
+    """Buffered audit row. Mirrors the AuditLog columns callers care about."""
+    request_id: str
+    event: str
+    lead_id: Optional[str] = None
+    job_id: Optional[str] = None
+    actor: str = "system"
+    payload: dict = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class AuditBuffer:
+    """Accumulates audit rows for one session and writes them in a single INSERT."""
+
+    def __init__(self):
+        self.rows: list[dict] = []
+
+    def append(self, row: dict):
+        self.rows.append(row)
+
+    def flush(self, db: Session):
+        if not self.rows:
+            return
+        rows, self.rows = self.rows, []
+        db.execute(AuditLog.__table__.insert(), rows)
+
+    def clear(self):
+        self.rows = []
+
+
+def get_buffer(db: Session) -> AuditBuffer:
+    """Return the audit buffer attached to this session, creating it on first use."""
+    buffer = db.info.get("audit_buffer")
+    if buffer is None:
+        buffer = db.info["audit_buffer"] = AuditBuffer()
+    return buffer
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _flush_before_commit(db: Session):
+    buffer = db.info.get("audit_buffer")
+    if buffer is not None:
+        buffer.flush(db)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _clear_after_rollback(db: Session):
+    buffer = db.info.get("audit_buffer")
+    if buffer is not None:
+        buffer.clear()
 
 
 def audit(
@@ -26,7 +86,7 @@ def audit(
     actor: str = "system",
     request_id: Optional[str] = None,
     payload: Optional[dict] = None,
-) -> AuditLog:
+) -> AuditEntry:
     """
     Write an audit log entry.
 
@@ -38,7 +98,7 @@ def audit(
       reply_received, reply_classified, reply_response_sent,
       suppression_added, job_created, job_started, job_completed, job_failed
     """
-    entry = AuditLog(
+    entry = AuditEntry(
         request_id=request_id or gen_request_id(),
         event=event,
         lead_id=lead_id,
@@ -46,18 +106,52 @@ def audit(
         actor=actor,
         payload=payload or {},
     )
-    db.add(entry)
+    buffer = get_buffer(db)
+    buffer.append(entry.__dict__.copy())
     # Don't commit here — let the caller control the transaction
+    if len(buffer.rows) >= AUDIT_BUFFER_SIZE:
+        buffer.flush(db)
     logger.debug(f"AUDIT [{event}] lead={lead_id} job={job_id} actor={actor}")
     return entry
 
 
+def bulk_audit(
+    db: Session,
+    events: list[dict],
+    actor: str = "system",
+    request_id: Optional[str] = None,
+):
+    """
+    Buffer many audit rows in one go (bulk imports). Each event dict needs
+    "event" and may carry lead_id, job_id and payload; rows skip the
+    per-entry AuditEntry/logging overhead of audit().
+    """
+    now = datetime.utcnow()
+    buffer = get_buffer(db)
+    buffer.rows.extend(
+        {
+            "request_id": request_id or gen_request_id(),
+            "event": e["event"],
+            "lead_id": e.get("lead_id"),
+            "job_id": e.get("job_id"),
+            "actor": actor,
+            "payload": e.get("payload") or {},
+            "created_at": now,
+        }
+        for e in events
+    )
+    if len(buffer.rows) >= AUDIT_BUFFER_SIZE:
+        buffer.flush(db)
+    logger.debug(f"AUDIT bulk: {len(events)} events actor={actor}")
+
+
 def audit_and_commit(
     db: Session,
     event: str,
     **kwargs,
-) -> AuditLog:
+) -> AuditEntry:
     """Write audit entry and commit immediately."""
     entry = audit(db, event, **kwargs)
+    get_buffer(db).flush(db)
     db.commit()
     return entry
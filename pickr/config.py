@@ -23,6 +23,17 @@ DATABASE_URL = os.getenv(
 # SQLAlchemy needs postgresql:// not postgres://
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Pre-ping costs a SELECT 1 per checkout and misbehaves behind PgBouncer
+# transaction pooling; recycling connections (shorter than the bouncer's
+# server_idle_timeout) handles stale sockets instead
+DB_PRE_PING = os.getenv("DB_PRE_PING", "false").lower() == "true"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "60"))   # seconds
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))   # seconds to wait for a connection
+# Threads for sync request handlers; by default one per pooled connection,
+# so handlers never queue on pool checkout while holding a thread
+WEB_THREADPOOL_SIZE = int(os.getenv("WEB_THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW))
 
 # ── Redis (Job Queue) ───────────────────────────────────────────
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -30,6 +41,9 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 # ── LLM ──────────────────────────────────────────────────────────
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 LLM_MODEL = os.getenv("LLM_MODEL", "claude-sonnet-4-20250514")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))  # Cached analyzer completions
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"  # Back the cache with the llm_cache table
+LLM_CACHE_TTL_HOURS = int(os.getenv("LLM_CACHE_TTL_HOURS", "168"))  # Persisted completions older than this are ignored and pruned
 
 # ── Email Provider ───────────────────────────────────────────────
 # Primary: SmartLead or Instantly (NOT raw SMTP)
@@ -43,8 +57,19 @@ SMARTLEAD_BASE_URL = os.getenv("SMARTLEAD_BASE_URL", "https://server.smartlead.a
 INSTANTLY_API_KEY = os.getenv("INSTANTLY_API_KEY", "")
 INSTANTLY_BASE_URL = os.getenv("INSTANTLY_BASE_URL", "https://api.instantly.ai/api/v1")
 
+# Max in-flight API calls per provider (keeps bursts under provider rate limits)
+SMARTLEAD_MAX_CONCURRENCY = int(os.getenv("SMARTLEAD_MAX_CONCURRENCY", "20"))
+INSTANTLY_MAX_CONCURRENCY = int(os.getenv("INSTANTLY_MAX_CONCURRENCY", "20"))
+
+# Requests per minute per endpoint family (lead writes / campaign calls),
+# enforced client-side from the first call, before any header feedback
+SMARTLEAD_RPM = int(os.getenv("SMARTLEAD_RPM", "600"))
+INSTANTLY_RPM = int(os.getenv("INSTANTLY_RPM", "600"))
+
 # Webhook secret for provider callbacks
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Carry the inbound payload on normalized webhook events as "raw" (debugging)
+WEBHOOK_KEEP_RAW = os.getenv("WEBHOOK_KEEP_RAW", "false").lower() == "true"
 
 # Sender identity (used in provider campaigns)
 SENDER_NAME = os.getenv("SENDER_NAME", "")
@@ -85,6 +110,21 @@ HUMAN_APPROVAL_THRESHOLD = 200    # First N replies need human approval
 SCRAPE_BUDGET_MS = 25000          # Max scrape time per lead
 SCRAPE_MAX_PAGES = 6              # Max pages to scrape per site
 RATE_LIMIT_PER_DOMAIN_PER_DAY = 50  # Email rate limit
+IMPORT_BATCH_SIZE = 1000          # Leads per INSERT batch on bulk import
+STATS_CACHE_TTL_SECONDS = 15      # Pipeline stats cache lifetime
+STATS_COUNTER_SHARDS = 16         # Rows per stats counter, so concurrent writers rarely share one (PostgreSQL)
+RULES_CACHE_TTL_SECONDS = 60      # In-process leverage rule cache lifetime
+BRANDS_CACHE_TTL_SECONDS = 60     # In-process brand catalog cache lifetime
+OBJECTIONS_CACHE_TTL_SECONDS = 60 # In-process objection template cache lifetime
+SUPPRESSION_CACHE_TTL_SECONDS = 60  # Suppression snapshot lifetime for bulk intake
+AUDIT_PARTITION_MONTHS_AHEAD = 2  # Monthly audit_log partitions created ahead (PostgreSQL)
+AUDIT_HOT_MONTHS = int(os.getenv("AUDIT_HOT_MONTHS", "0"))  # Months of audit_log kept attached; 0 keeps all
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "8"))  # Leads processed in parallel
+JOB_CLAIM_BATCH_SIZE = 32         # Queued jobs a worker claims per round (PostgreSQL)
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "1800"))  # Running jobs older than this are requeued
+JOB_NOTIFY_CHANNEL = "pickr_jobs"  # LISTEN/NOTIFY channel that wakes workers for new jobs
+EMAIL_FINDER_CONCURRENCY = int(os.getenv("EMAIL_FINDER_CONCURRENCY", "50"))  # Sites searched in parallel
+EMAIL_SMTP_VERIFY = os.getenv("EMAIL_SMTP_VERIFY", "false").lower() == "true"  # RCPT-probe found emails (some hosts greylist)
 
 # ── Forbidden Phrases ────────────────────────────────────────────
 # These MUST NEVER appear in any outbound email
@@ -3,20 +3,25 @@ Pickr AI - Email Generation Engine (v2)
 Spec steps 52-57: Build vars, render template, lint, persist.
 High Authority Executive voice. Short confident paragraphs only.
 """
+import asyncio
 import uuid
 import logging
-from typing import Optional
-from anthropic import Anthropic
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+import orjson
 from pickr.config import (
-    ANTHROPIC_API_KEY, LLM_MODEL, BOOKING_LINK,
+    LLM_MODEL, BOOKING_LINK,
     MEETING_TITLE_TEMPLATE, MEETING_DAYS, MEETING_HOURS,
     MEETING_DURATION, MAX_BRANDS_PER_EMAIL,
 )
 from pickr.engine.linter import EmailLinter
+from pickr.llm import get_client, new_async_client
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
 
 logger = logging.getLogger(__name__)
 
-client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
 linter = EmailLinter()
 
 PERSONALITY_SYSTEM = """You are writing emails for Pickr, a wholesale distributor of premium brands
@@ -39,34 +44,28 @@ TOUCH_FRAMEWORKS = {
     5: "Last touch. Respectful. Quick note that you're available if timing ever changes. Calendar link. No breakup energy.",
 }
 
+# Persona + every touch framework as one fixed system prompt; the user
+# prompt only names which touch framework to follow. At a few hundred
+# tokens it is below the API's minimum cacheable prefix, so it is not
+# marked for prompt caching.
+SYSTEM_BLOCKS = [{
+    "type": "text",
+    "text": (
+        PERSONALITY_SYSTEM
+        + "\n\nTouch frameworks for the 5-touch sequence:\n"
+        + "\n".join(f"Touch {n}: {fw}" for n, fw in TOUCH_FRAMEWORKS.items())
+    ),
+}]
 
-def generate_email(
-    company_name: str,
-    niche: str,
-    primary_angle: str,
-    touch_number: int,
-    brand_names: list[str],
-    site_excerpt: Optional[str] = None,
-    categories: Optional[list[str]] = None,
-) -> dict:
-    """
-    Generate an email for a lead.
-    Returns {subject, body} or raises on lint failure.
-    """
-    framework = TOUCH_FRAMEWORKS.get(touch_number, TOUCH_FRAMEWORKS[1])
 
-    # Enforce brand cap
-    brands_to_mention = brand_names[:MAX_BRANDS_PER_EMAIL]
+# Touch number → framework line, materialized once. Index 0 covers
+# out-of-range touches, which follow the Touch 1 framework.
+_FRAMEWORK_LINES = ("follow the Touch 1 framework",) + tuple(
+    f"follow the Touch {n} framework" for n in range(1, len(TOUCH_FRAMEWORKS) + 1)
+)
 
-    prompt = f"""Write a cold email for this lead:
-Company: {company_name}
-Niche: {niche}
-Leverage angle: {primary_angle}
-Touch: {touch_number} of 5
-Framework: {framework}
-Brands to mention (max {MAX_BRANDS_PER_EMAIL}): {', '.join(brands_to_mention) if brands_to_mention else 'none specific'}
-Store categories: {', '.join(categories or [])}
-Store excerpt (for specific references): {(site_excerpt or '')[:500]}
+# Everything after the lead-specific lines is constant for the process.
+_PROMPT_TAIL = f"""
 Calendar link: {BOOKING_LINK}
 Meeting: {MEETING_DURATION}, {MEETING_DAYS}, {MEETING_HOURS}
 
@@ -81,71 +80,190 @@ Rules:
 - No full catalog mentions
 - Reference something specific from their store if possible"""
 
+
+def _build_prompt(
+    company_name: str,
+    niche: str,
+    primary_angle: str,
+    touch_number: int,
+    brands_to_mention: list[str],
+    site_excerpt: Optional[str],
+    categories: Optional[list[str]],
+) -> str:
+    framework = _FRAMEWORK_LINES[touch_number if 0 < touch_number < len(_FRAMEWORK_LINES) else 0]
+    return f"""Write a cold email for this lead:
+Company: {company_name}
+Niche: {niche}
+Leverage angle: {primary_angle}
+Touch: {touch_number} of 5
+Framework: {framework}
+Brands to mention (max {MAX_BRANDS_PER_EMAIL}): {', '.join(brands_to_mention) if brands_to_mention else 'none specific'}
+Store categories: {', '.join(categories or [])}
+Store excerpt (for specific references): {(site_excerpt or '')[:500]}{_PROMPT_TAIL}"""
+
+
+def _log_usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        logger.debug(f"Email LLM usage: input={usage.input_tokens} output={usage.output_tokens}")
+
+
+@lru_cache(maxsize=4096)
+def _fallback_parts(company_name: str, niche: str) -> tuple[str, str]:
+    return (
+        f"{company_name} — quick brand sourcing idea",
+        f"Hi,\n\nNoticed your {niche} catalog. We source premium brands at competitive terms.\n\nWorth a quick chat?\n\n{BOOKING_LINK}",
+    )
+
+
+def _fallback_email(company_name: str, niche: str) -> dict:
+    # Fresh dict per call; only the strings are shared
+    return dict(zip(("subject", "body"), _fallback_parts(company_name, niche)))
+
+
+def _parse_email_response(text: str, company_name: str, niche: str, brand_count: int) -> dict:
+    """Parse the model's JSON reply, lint it, and fall back to a safe email."""
+    # Slice to the outermost braces up front so prose framing ("Here is the
+    # JSON:") or code fences cost one parse instead of a failed one plus a retry
+    parsed = None
+    start, end = text.find("{"), text.rfind("}") + 1
+    if start >= 0 and end > start:
+        try:
+            parsed = orjson.loads(text[start:end])
+        except orjson.JSONDecodeError:
+            pass
+
+    if isinstance(parsed, dict) and "subject" in parsed and "body" in parsed:
+        # Step 56: Forbidden phrase lint
+        lint_result = linter.lint(
+            parsed["subject"],
+            parsed["body"],
+            brand_count=brand_count,
+        )
+        if not lint_result["ok"]:
+            logger.warning(f"Email lint failed: {lint_result}")
+            # Return a safe fallback
+            return {
+                "subject": f"{company_name} — curated brand opportunity",
+                "body": f"Hi,\n\nWe source premium brands relevant to your {niche} business.\n\nWorth a quick call?\n\n{BOOKING_LINK}",
+            }
+        return parsed
+
+    logger.warning("Email generation returned invalid JSON")
+    return _fallback_email(company_name, niche)
+
+
+def generate_email(
+    company_name: str,
+    niche: str,
+    primary_angle: str,
+    touch_number: int,
+    brand_names: list[str],
+    site_excerpt: Optional[str] = None,
+    categories: Optional[list[str]] = None,
+) -> dict:
+    """
+    Generate an email for a lead.
+    Returns {subject, body}; falls back to a safe template on lint failure.
+    """
+    # Enforce brand cap
+    brands_to_mention = brand_names[:MAX_BRANDS_PER_EMAIL]
+
+    client = get_client()
     if not client:
-        return {
-            "subject": f"{company_name} — quick brand sourcing idea",
-            "body": f"Hi,\n\nNoticed your {niche} catalog. We source premium brands at competitive terms.\n\nWorth a quick chat?\n\n{BOOKING_LINK}",
-        }
+        return _fallback_email(company_name, niche)
 
+    prompt = _build_prompt(company_name, niche, primary_angle, touch_number,
+                           brands_to_mention, site_excerpt, categories)
     try:
         response = client.messages.create(
             model=LLM_MODEL,
             max_tokens=512,
-            system=PERSONALITY_SYSTEM,
+            system=SYSTEM_BLOCKS,
             messages=[{"role": "user", "content": prompt}],
         )
-        text = response.content[0].text
+        _log_usage(response)
+        return _parse_email_response(response.content[0].text, company_name, niche, len(brands_to_mention))
+    except Exception as e:
+        logger.error(f"Email generation failed: {e}")
+
+    return _fallback_email(company_name, niche)
 
-        # Parse JSON response
-        import json
-        parsed = None
-        try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError:
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start >= 0 and end > start:
-                try:
-                    parsed = json.loads(text[start:end])
-                except json.JSONDecodeError:
-                    pass
-
-        if parsed and "subject" in parsed and "body" in parsed:
-            # Step 56: Forbidden phrase lint
-            lint_result = linter.lint(
-                parsed["subject"],
-                parsed["body"],
-                brand_count=len(brands_to_mention),
-            )
-            if not lint_result["ok"]:
-                logger.warning(f"Email lint failed: {lint_result}")
-                # Return a safe fallback
-                return {
-                    "subject": f"{company_name} — curated brand opportunity",
-                    "body": f"Hi,\n\nWe source premium brands relevant to your {niche} business.\n\nWorth a quick call?\n\n{BOOKING_LINK}",
-                }
-            return parsed
-        else:
-            logger.warning("Email generation returned invalid JSON")
 
+async def generate_email_async(
+    aclient: "AsyncAnthropic",
+    company_name: str,
+    niche: str,
+    primary_angle: str,
+    touch_number: int,
+    brand_names: list[str],
+    site_excerpt: Optional[str] = None,
+    categories: Optional[list[str]] = None,
+) -> dict:
+    """Async twin of generate_email, used to fan out a whole sequence at once."""
+    brands_to_mention = brand_names[:MAX_BRANDS_PER_EMAIL]
+    prompt = _build_prompt(company_name, niche, primary_angle, touch_number,
+                           brands_to_mention, site_excerpt, categories)
+    try:
+        response = await aclient.messages.create(
+            model=LLM_MODEL,
+            max_tokens=512,
+            system=SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        _log_usage(response)
+        return _parse_email_response(response.content[0].text, company_name, niche, len(brands_to_mention))
     except Exception as e:
-        logger.error(f"Email generation failed: {e}")
+        logger.error(f"Email generation failed (touch {touch_number}): {e}")
 
-    return {
-        "subject": f"{company_name} — quick brand sourcing idea",
-        "body": f"Hi,\n\nNoticed your {niche} catalog. We source premium brands at competitive terms.\n\nWorth a quick chat?\n\n{BOOKING_LINK}",
-    }
+    return _fallback_email(company_name, niche)
 
 
-def generate_interest_response(company_name: str) -> dict:
-    """Generate response for interested lead. Always includes calendar."""
-    return {
-        "subject": f"Re: {company_name}",
-        "body": (
+def generate_sequence(
+    company_name: str,
+    niche: str,
+    primary_angle: str,
+    brand_names: list[str],
+    site_excerpt: Optional[str] = None,
+    categories: Optional[list[str]] = None,
+    touches: int = 5,
+) -> list[dict]:
+    """
+    Generate every touch of a sequence concurrently.
+    Returns [{subject, body}, ...] ordered by touch number (1..touches).
+    """
+    async def _gather():
+        aclient = new_async_client()
+        if aclient is None:
+            return [_fallback_email(company_name, niche) for _ in range(touches)]
+        # One client per run: all touches share its (HTTP/2) connection
+        async with aclient:
+            return await asyncio.gather(*[
+                generate_email_async(
+                    aclient, company_name=company_name, niche=niche, primary_angle=primary_angle,
+                    touch_number=touch, brand_names=brand_names,
+                    site_excerpt=site_excerpt, categories=categories,
+                )
+                for touch in range(1, touches + 1)
+            ])
+
+    return list(asyncio.run(_gather()))
+
+
+@lru_cache(maxsize=4096)
+def _interest_parts(company_name: str) -> tuple[str, str]:
+    return (
+        f"Re: {company_name}",
+        (
             f"Perfect.\n\n"
             f"Grab a quick {MEETING_DURATION} here:\n"
             f"{BOOKING_LINK}\n\n"
             f"{MEETING_DAYS}, {MEETING_HOURS} works best.\n\n"
             f"Title: {MEETING_TITLE_TEMPLATE.format(company_name=company_name)}"
         ),
-    }
+    )
+
+
+def generate_interest_response(company_name: str) -> dict:
+    """Generate response for interested lead. Always includes calendar."""
+    return dict(zip(("subject", "body"), _interest_parts(company_name)))
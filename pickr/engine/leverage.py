@@ -4,25 +4,188 @@ Spec: AI cannot invent strategy. Strategy comes ONLY from the
 rules_leverage_matrix stored in DB. Evaluated deterministic,
 first-match by priority (lower priority number = higher rank).
 """
+import heapq
 import logging
-from typing import Optional
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from pickr.models import (
     RulesLeverageMatrix, LeadSignal, Lead, LeadLeverage,
     Brand, LeverageAngle
 )
 from pickr.audit import audit
-from pickr.config import MAX_BRANDS_PER_EMAIL
+from pickr.config import MAX_BRANDS_PER_EMAIL, RULES_CACHE_TTL_SECONDS, BRANDS_CACHE_TTL_SECONDS
 
 logger = logging.getLogger(__name__)
 
+# Built once so every execution reuses the compiled SQL from the
+# SQLAlchemy statement cache instead of rebuilding a Query per lead.
+_SELECT_ACTIVE_RULES = select(RulesLeverageMatrix).where(
+    RulesLeverageMatrix.is_active.is_(True)
+).order_by(RulesLeverageMatrix.priority.asc())
+
+_SELECT_ACTIVE_BRANDS = select(Brand).where(
+    Brand.active.is_(True)
+).order_by(Brand.priority.desc(), Brand.pct_off_retail.desc())
+
+_SELECT_LEAD_LEVERAGE = select(LeadLeverage).where(
+    LeadLeverage.lead_id == bindparam("lead_id")
+)
+
+
+RulePredicate = Callable[[Lead, LeadSignal], bool]
+
+
+def _compile_predicates(row: RulesLeverageMatrix) -> tuple[RulePredicate, ...]:
+    """
+    One check per non-null non-numeric condition on the rule. The threshold
+    gates are left out: RuleSet.candidates() already applies them. A rule
+    with no such conditions compiles to () and always passes.
+    """
+    checks: list[RulePredicate] = []
+
+    # Channel match (both sides are stored lowercase)
+    if row.channel_match is not None:
+        channel = row.channel_match
+        checks.append(lambda lead, s: lead.channel == channel)
+
+    # Requires brand overlap / adjacent brands: both need a scraped brand
+    # list (overlap itself is checked in pipeline context)
+    if row.requires_brand_overlap or row.requires_adjacent_brands:
+        checks.append(lambda lead, s: bool(s.brand_list))
+
+    return tuple(checks)
+
+
+@dataclass(frozen=True)
+class LeverageRule:
+    """Detached snapshot of an active rules_leverage_matrix row."""
+    rule_id: str
+    priority: int
+    channel_match: Optional[str]      # Stored lowercase
+    min_scale_score: Optional[int]
+    max_private_label_ratio: Optional[float]
+    min_map_behavior_score: Optional[int]
+    min_store_count: Optional[int]
+    requires_brand_overlap: Optional[bool]
+    requires_adjacent_brands: Optional[bool]
+    primary_angle: str
+    secondary_angle: Optional[str]
+    brand_query: Optional[dict]
+    description: Optional[str]
+    # Non-numeric checks only, for rules that already passed RuleSet.candidates()
+    residual: tuple[RulePredicate, ...] = field(default=(), compare=False, repr=False)
+
+    @classmethod
+    def from_row(cls, row: RulesLeverageMatrix) -> "LeverageRule":
+        return cls(
+            rule_id=row.rule_id,
+            priority=row.priority,
+            channel_match=row.channel_match,
+            min_scale_score=row.min_scale_score,
+            max_private_label_ratio=row.max_private_label_ratio,
+            min_map_behavior_score=row.min_map_behavior_score,
+            min_store_count=row.min_store_count,
+            requires_brand_overlap=row.requires_brand_overlap,
+            requires_adjacent_brands=row.requires_adjacent_brands,
+            primary_angle=row.primary_angle,
+            secondary_angle=row.secondary_angle,
+            brand_query=row.brand_query,
+            description=row.description,
+            residual=_compile_predicates(row),
+        )
+
+
+# Qualification gates (spec): scraped private-label share, SKU count, scale
+PRIVATE_LABEL_ONLY_RATIO = 0.95
+ARBITRAGE_MAX_SKUS = 10
+ARBITRAGE_MAX_SCALE_SCORE = 20
+
+# Numeric gates indexed for prefiltering: (signal attr, rule attr, is_minimum)
+_RULE_GATES = (
+    ("scale_score", "min_scale_score", True),
+    ("private_label_ratio", "max_private_label_ratio", False),
+    ("map_behavior_score", "min_map_behavior_score", True),
+    ("store_count", "min_store_count", True),
+)
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    Active rules in priority order, plus each numeric gate's thresholds
+    sorted ascending so the rules a lead's signals can't satisfy are found
+    by bisection instead of being tested one by one.
+    """
+    rules: tuple[LeverageRule, ...]
+    # (signal attr, sorted thresholds, rule indices in threshold order, is_minimum)
+    gates: tuple[tuple[str, tuple, tuple[int, ...], bool], ...] = ()
+
+    @classmethod
+    def build(cls, rules: list[LeverageRule]) -> "RuleSet":
+        gates = []
+        for signal_attr, rule_attr, is_min in _RULE_GATES:
+            gated = sorted(
+                (getattr(rule, rule_attr), i) for i, rule in enumerate(rules)
+                if getattr(rule, rule_attr) is not None
+            )
+            if gated:
+                gates.append((
+                    signal_attr,
+                    tuple(t for t, _ in gated),
+                    tuple(i for _, i in gated),
+                    is_min,
+                ))
+        return cls(rules=tuple(rules), gates=tuple(gates))
+
+    def candidates(self, signals: LeadSignal) -> list[LeverageRule]:
+        """Rules, in priority order, whose numeric gates the signals pass."""
+        excluded = set()
+        for signal_attr, thresholds, indices, is_min in self.gates:
+            value = getattr(signals, signal_attr) or 0
+            if is_min:
+                # Fails where threshold > value
+                excluded.update(indices[bisect_right(thresholds, value):])
+            else:
+                # Fails where threshold < value
+                excluded.update(indices[:bisect_left(thresholds, value)])
+        if not excluded:
+            return list(self.rules)
+        return [rule for i, rule in enumerate(self.rules) if i not in excluded]
+
 
 class LeverageEngine:
     """
     Deterministic rule engine for leverage selection.
     Loads rules from rules_leverage_matrix table, evaluates in priority order.
+    Active rules are cached in-process for RULES_CACHE_TTL_SECONDS; anything
+    that writes to the table should call invalidate_cache().
     """
 
+    _rules_cache: Optional[tuple[float, RuleSet]] = None
+
+    @classmethod
+    def invalidate_cache(cls):
+        cls._rules_cache = None
+
+    @classmethod
+    def load_rules(cls, db: Session) -> RuleSet:
+        """Active rules ordered by priority ASC, from cache when fresh."""
+        cached = cls._rules_cache
+        if cached is not None and time.monotonic() - cached[0] < RULES_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        rows = db.execute(_SELECT_ACTIVE_RULES).scalars().all()
+        rule_set = RuleSet.build([LeverageRule.from_row(row) for row in rows])
+        cls._rules_cache = (time.monotonic(), rule_set)
+        return rule_set
+
     def evaluate(
         self,
         db: Session,
@@ -38,11 +201,9 @@ class LeverageEngine:
           44. Evaluate each rule against lead fields — first match stops
           45. Write primary_angle, secondary_angle, brand_query
         """
-        rules = db.query(RulesLeverageMatrix).filter(
-            RulesLeverageMatrix.is_active == True
-        ).order_by(RulesLeverageMatrix.priority.asc()).all()
+        rule_set = self.load_rules(db)
 
-        if not rules:
+        if not rule_set.rules:
             logger.warning("No active leverage rules found in DB. Using growth fallback.")
             return self._create_leverage(
                 db, lead,
@@ -54,10 +215,15 @@ class LeverageEngine:
                 request_id=request_id,
             )
 
-        logger.info(f"Evaluating {len(rules)} leverage rules for lead {lead.lead_id}")
+        rules = rule_set.candidates(signals)
+        logger.info(
+            f"Evaluating {len(rules)} of {len(rule_set.rules)} leverage rules for lead {lead.lead_id}"
+        )
 
+        # Candidates already passed every numeric gate; only the residual
+        # channel / brand-list checks remain per rule
         for rule in rules:
-            if self._rule_matches(rule, lead, signals):
+            if all(check(lead, signals) for check in rule.residual):
                 logger.info(
                     f"Rule matched: {rule.rule_id} (priority={rule.priority}) "
                     f"→ {rule.primary_angle} for lead {lead.lead_id}"
@@ -69,7 +235,7 @@ class LeverageEngine:
                     secondary_angle=rule.secondary_angle,
                     rule_id=rule.rule_id,
                     match_reason=rule.description or f"rule_{rule.priority}_matched",
-                    brand_query=rule.brand_query or {"priority_first": True, "cap": MAX_BRANDS_PER_EMAIL},
+                    brand_query=dict(rule.brand_query or {"priority_first": True, "cap": MAX_BRANDS_PER_EMAIL}),
                     request_id=request_id,
                 )
 
@@ -100,54 +266,6 @@ class LeverageEngine:
             request_id=request_id,
         )
 
-    def _rule_matches(
-        self,
-        rule: RulesLeverageMatrix,
-        lead: Lead,
-        signals: LeadSignal,
-    ) -> bool:
-        """Check if ALL non-null conditions in a rule match the lead."""
-
-        # Channel match
-        if rule.channel_match is not None:
-            if (lead.channel or "").lower() != rule.channel_match.lower():
-                return False
-
-        # Min scale score
-        if rule.min_scale_score is not None:
-            if (signals.scale_score or 0) < rule.min_scale_score:
-                return False
-
-        # Max private label ratio
-        if rule.max_private_label_ratio is not None:
-            if (signals.private_label_ratio or 0) > rule.max_private_label_ratio:
-                return False
-
-        # Min MAP behavior score
-        if rule.min_map_behavior_score is not None:
-            if (signals.map_behavior_score or 0) < rule.min_map_behavior_score:
-                return False
-
-        # Min store count
-        if rule.min_store_count is not None:
-            if (signals.store_count or 0) < rule.min_store_count:
-                return False
-
-        # Requires brand overlap
-        if rule.requires_brand_overlap:
-            brand_list = signals.brand_list or []
-            our_brands = db_brand_names = []  # Will be checked in pipeline context
-            if not brand_list:
-                return False
-
-        # Requires adjacent brands
-        if rule.requires_adjacent_brands:
-            brand_list = signals.brand_list or []
-            if not brand_list:
-                return False
-
-        return True
-
     def _create_leverage(
         self,
         db: Session,
@@ -160,9 +278,29 @@ class LeverageEngine:
         request_id: Optional[str] = None,
     ) -> LeadLeverage:
         """Create or update LeadLeverage record."""
-        existing = db.query(LeadLeverage).filter(
-            LeadLeverage.lead_id == lead.lead_id
-        ).first()
+        values = {
+            "primary_angle": primary_angle,
+            "secondary_angle": secondary_angle,
+            "matched_rule_id": rule_id,
+            "match_reason": match_reason,
+            "brand_query": brand_query,
+        }
+
+        # One round-trip upsert where the dialect supports ON CONFLICT
+        dialect = db.get_bind().dialect
+        if dialect.name in ("postgresql", "sqlite"):
+            dialect_insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+            stmt = (
+                dialect_insert(LeadLeverage)
+                .values(lead_id=lead.lead_id, **values)
+                .on_conflict_do_update(index_elements=[LeadLeverage.lead_id], set_=values)
+                .returning(LeadLeverage)
+            )
+            return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+        existing = db.execute(
+            _SELECT_LEAD_LEVERAGE, {"lead_id": lead.lead_id}
+        ).scalars().first()
 
         if existing:
             existing.primary_angle = primary_angle
@@ -183,24 +321,39 @@ class LeverageEngine:
             db.add(leverage)
             return leverage
 
-    def qualify(
+    def prequalify(
         self,
         signals: LeadSignal,
-    ) -> dict:
+    ) -> Optional[dict]:
         """
-        Determine if a lead qualifies. Spec disqualify gates:
-          - private_label_only (ratio > 0.95)
-          - arbitrage_no_scale (low SKU + low scale_score)
+        Disqualify gates decidable from scraped signals alone, checked before
+        the AI classifier so those leads never cost an LLM call. Returns the
+        qualify() result for a disqualified lead, None when undecided.
         """
         # Gate: Private label only
-        if (signals.private_label_ratio or 0) > 0.95:
+        if (signals.private_label_ratio or 0) > PRIVATE_LABEL_ONLY_RATIO:
             return {
                 "qualified": False,
                 "reason": "private_label_only",
             }
+        return None
+
+    def qualify(
+        self,
+        signals: LeadSignal,
+    ) -> dict:
+        """
+        Determine if a lead qualifies. Spec disqualify gates:
+          - private_label_only (ratio > 0.95)
+          - arbitrage_no_scale (low SKU + low scale_score)
+        """
+        disqualified = self.prequalify(signals)
+        if disqualified:
+            return disqualified
 
         # Gate: Arbitrage with no scale
-        if (signals.sku_count_estimate or 0) < 10 and (signals.scale_score or 0) < 20:
+        if ((signals.sku_count_estimate or 0) < ARBITRAGE_MAX_SKUS
+                and (signals.scale_score or 0) < ARBITRAGE_MAX_SCALE_SCORE):
             return {
                 "qualified": False,
                 "reason": "arbitrage_no_scale",
@@ -212,13 +365,65 @@ class LeverageEngine:
         }
 
 
+@dataclass(frozen=True)
+class BrandCatalog:
+    """
+    Active brands as parallel arrays (index i is one brand), built once per
+    load so matching does no per-brand allocation. Indices are ordered
+    pct_off_retail desc within each priority group.
+    """
+    brand_ids: tuple[str, ...]
+    names_by_id: dict[str, str]
+    pct_off: tuple[float, ...]
+    replenishable: tuple[bool, ...]
+    primary_category: tuple[str, ...]
+    category_sets: tuple[frozenset, ...]     # Stored lowercase
+    channel_sets: tuple[frozenset, ...]
+    priority_idx: tuple[int, ...]
+    non_priority_idx: tuple[int, ...]
+
+    @classmethod
+    def from_rows(cls, rows: list[Brand]) -> "BrandCatalog":
+        return cls(
+            brand_ids=tuple(b.brand_id for b in rows),
+            names_by_id={b.brand_id: b.brand_name for b in rows},
+            pct_off=tuple(float(b.pct_off_retail or 0) for b in rows),
+            replenishable=tuple(bool(b.replenishable) for b in rows),
+            primary_category=tuple((b.category or ["general"])[0] for b in rows),
+            category_sets=tuple(frozenset(b.category or []) for b in rows),
+            channel_sets=tuple(frozenset(b.channel_fit or []) for b in rows),
+            priority_idx=tuple(i for i, b in enumerate(rows) if b.priority),
+            non_priority_idx=tuple(i for i, b in enumerate(rows) if not b.priority),
+        )
+
+
 class BrandMatcher:
     """
     Brand matching engine.
     Spec: Hard cap at 3 brands. Priority brands first.
     Category adjacency fallback if too few candidates.
+    The active catalog is cached in-process for BRANDS_CACHE_TTL_SECONDS;
+    anything that writes to the brands table should call invalidate_cache().
     """
 
+    _catalog_cache: Optional[tuple[float, BrandCatalog]] = None
+
+    @classmethod
+    def invalidate_cache(cls):
+        cls._catalog_cache = None
+
+    @classmethod
+    def load_catalog(cls, db: Session) -> BrandCatalog:
+        """Active brands, from cache when fresh."""
+        cached = cls._catalog_cache
+        if cached is not None and time.monotonic() - cached[0] < BRANDS_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        rows = db.execute(_SELECT_ACTIVE_BRANDS).scalars().all()
+        catalog = BrandCatalog.from_rows(rows)
+        cls._catalog_cache = (time.monotonic(), catalog)
+        return catalog
+
     def match(
         self,
         db: Session,
@@ -239,67 +444,44 @@ class BrandMatcher:
         """
         cap = brand_query.get("cap", MAX_BRANDS_PER_EMAIL)
         channel = lead.channel or "other"
-        categories = signals.categories or []
-
-        # Step 48: Fetch priority brands with channel fit
-        query = db.query(Brand).filter(
-            Brand.active == True,
-            Brand.priority == True,
-        )
-
-        candidates = query.order_by(Brand.pct_off_retail.desc()).all()
-
-        # Score and filter candidates
-        scored = []
-        for brand in candidates:
-            score = 0
-            brand_cats = brand.category or []
-            brand_channels = brand.channel_fit or []
+        lead_cats = frozenset(c.lower() for c in signals.categories or [])
+        catalog = self.load_catalog(db)
+        pct_off = catalog.pct_off
 
+        # Step 48: Score priority brands
+        scores = {}
+        for i in catalog.priority_idx:
             # Channel fit
-            if channel in brand_channels or "multi-channel" in brand_channels:
-                score += 20
-
+            brand_channels = catalog.channel_sets[i]
+            score = 20 if channel in brand_channels or "multi-channel" in brand_channels else 0
             # Category overlap
-            cat_overlap = set(c.lower() for c in categories) & set(c.lower() for c in brand_cats)
-            score += len(cat_overlap) * 15
-
+            score += len(lead_cats & catalog.category_sets[i]) * 15
             # High discount bonus
-            if (brand.pct_off_retail or 0) >= 60:
+            if pct_off[i] >= 60:
                 score += 10
-
             # Replenishable bonus (especially for Amazon)
-            if brand.replenishable and channel == "amazon":
+            if catalog.replenishable[i] and channel == "amazon":
                 score += 10
+            scores[i] = score
 
-            scored.append({"brand": brand, "score": score})
-
-        # Sort by score desc, pct_off_retail desc as tiebreaker
-        scored.sort(key=lambda x: (x["score"], x["brand"].pct_off_retail or 0), reverse=True)
+        # Top 2*cap by score desc, pct_off_retail desc as tiebreaker — the
+        # extra headroom is for brands the diversity rule skips
+        rank_key = lambda i: (scores[i], pct_off[i])
+        ranked = heapq.nlargest(cap * 2, catalog.priority_idx, key=rank_key)
+        candidates_found = len(catalog.priority_idx)
 
         # Step 49: Adjacency fallback — if fewer than cap, include non-priority
-        if len(scored) < cap:
-            non_priority = db.query(Brand).filter(
-                Brand.active == True,
-                Brand.priority == False,
-            ).order_by(Brand.pct_off_retail.desc()).limit(cap).all()
-
-            for brand in non_priority:
-                if not any(s["brand"].brand_id == brand.brand_id for s in scored):
-                    scored.append({"brand": brand, "score": 0})
+        if candidates_found < cap:
+            fallback = catalog.non_priority_idx[:cap]
+            ranked.extend(fallback)
+            candidates_found += len(fallback)
 
         # Step 50: Diversity rule — avoid 3 same subcategory
-        selected = []
-        category_counts = {}
-        for item in scored:
-            if len(selected) >= cap:
-                break
-            brand = item["brand"]
-            primary_cat = (brand.category or ["general"])[0]
-            count = category_counts.get(primary_cat, 0)
-            if count < 2:  # Max 2 from same category
-                selected.append(brand.brand_id)
-                category_counts[primary_cat] = count + 1
+        selected = self._pick_diverse(catalog, ranked, cap)
+        if len(selected) < cap and len(ranked) < candidates_found:
+            # Diversity rule ate the headroom; rank every priority brand
+            ranked = sorted(catalog.priority_idx, key=rank_key, reverse=True)
+            selected = self._pick_diverse(catalog, ranked, cap)
 
         # Audit
         if request_id:
@@ -310,9 +492,23 @@ class BrandMatcher:
                 request_id=request_id,
                 payload={
                     "selected_brand_ids": selected,
-                    "candidates_found": len(scored),
+                    "candidates_found": candidates_found,
                     "cap": cap,
                 },
             )
 
         return selected
+
+    @staticmethod
+    def _pick_diverse(catalog: BrandCatalog, ranked: list[int], cap: int) -> list[str]:
+        """Take brand_ids in rank order, at most 2 per primary category."""
+        selected = []
+        category_counts = Counter()
+        for i in ranked:
+            if len(selected) >= cap:
+                break
+            primary_cat = catalog.primary_category[i]
+            if category_counts[primary_cat] < 2:  # Max 2 from same category
+                selected.append(catalog.brand_ids[i])
+                category_counts[primary_cat] += 1
+        return selected
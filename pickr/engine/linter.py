@@ -4,11 +4,48 @@ Spec: Every email subject+body must be scanned before send.
 Blocks: cost basis, invoices, exclusivity, full catalog, margins, etc.
 """
 import logging
+import re
 from typing import Optional
 from pickr.config import FORBIDDEN_PHRASES, MAX_BRANDS_PER_EMAIL
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 logger = logging.getLogger(__name__)
 
+# (phrase as written in config, lowercased phrase), lowered once at import.
+# Violations report the phrase as written.
+_FORBIDDEN_LC = tuple((p, p.lower()) for p in FORBIDDEN_PHRASES)
+
+# Built once at import: a single-pass multi-pattern matcher over all phrases.
+if HAS_AHOCORASICK:
+    _FORBIDDEN_AC = ahocorasick.Automaton()
+    for _phrase, _lower in _FORBIDDEN_LC:
+        _FORBIDDEN_AC.add_word(_lower, _phrase)
+    _FORBIDDEN_AC.make_automaton()
+else:
+    _FORBIDDEN_RE = re.compile("|".join(re.escape(lower) for _, lower in _FORBIDDEN_LC))
+
+
+# Template variables that must never reach an email (spec step 54).
+# Tuple keeps violation order stable; the frozenset does the membership test.
+_FORBIDDEN_VARS = ("catalog_url", "full_catalog", "price_list", "invoice")
+_FORBIDDEN_VAR_SET = frozenset(_FORBIDDEN_VARS)
+
+
+def scan_forbidden(text: str) -> set[str]:
+    """Return the set of FORBIDDEN_PHRASES that occur in text (case-insensitive)."""
+    lower = text.lower()
+    if HAS_AHOCORASICK:
+        return {phrase for _, phrase in _FORBIDDEN_AC.iter(lower)}
+    # The alternation can't report overlapping phrases, so use it as a
+    # one-pass prefilter and only do the exact per-phrase scan on a hit.
+    if not _FORBIDDEN_RE.search(lower):
+        return set()
+    return {phrase for phrase, p_lower in _FORBIDDEN_LC if p_lower in lower}
+
 
 class EmailLinter:
     """
@@ -35,12 +72,14 @@ class EmailLinter:
         violations = []
 
         # Check forbidden phrases
-        for phrase in FORBIDDEN_PHRASES:
-            phrase_lower = phrase.lower()
-            if phrase_lower in subject.lower():
-                violations.append({"phrase": phrase, "location": "subject"})
-            if phrase_lower in body.lower():
-                violations.append({"phrase": phrase, "location": "body"})
+        in_subject = scan_forbidden(subject)
+        in_body = scan_forbidden(body)
+        if in_subject or in_body:
+            for phrase in FORBIDDEN_PHRASES:
+                if phrase in in_subject:
+                    violations.append({"phrase": phrase, "location": "subject"})
+                if phrase in in_body:
+                    violations.append({"phrase": phrase, "location": "body"})
 
         # Check brand count cap
         brand_cap_violation = brand_count > MAX_BRANDS_PER_EMAIL
@@ -75,21 +114,22 @@ class EmailLinter:
         violations = []
 
         # Check brand count in variables
-        brands = template_vars.get("brand_names", [])
-        if len(brands) > MAX_BRANDS_PER_EMAIL:
+        brand_count = len(template_vars.get("brand_names") or ())
+        if brand_count > MAX_BRANDS_PER_EMAIL:
             violations.append({
-                "issue": f"Too many brands: {len(brands)} (max {MAX_BRANDS_PER_EMAIL})",
+                "issue": f"Too many brands: {brand_count} (max {MAX_BRANDS_PER_EMAIL})",
                 "field": "brand_names",
             })
 
         # Check for forbidden variable keys
-        forbidden_vars = ["catalog_url", "full_catalog", "price_list", "invoice"]
-        for var in forbidden_vars:
-            if var in template_vars and template_vars[var]:
-                violations.append({
-                    "issue": f"Forbidden variable present: {var}",
-                    "field": var,
-                })
+        present = _FORBIDDEN_VAR_SET & template_vars.keys()
+        if present:
+            for var in _FORBIDDEN_VARS:
+                if var in present and template_vars[var]:
+                    violations.append({
+                        "issue": f"Forbidden variable present: {var}",
+                        "field": var,
+                    })
 
         ok = len(violations) == 0
 
@@ -4,20 +4,50 @@ Spec steps 68-71: Fetch approved template from objections_kb.
 AI cannot invent rebuttals. Every response ends with calendar link.
 """
 import logging
+import time
 from typing import Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pickr.models import ObjectionsKB
-from pickr.config import BOOKING_LINK
+from pickr.config import BOOKING_LINK, OBJECTIONS_CACHE_TTL_SECONDS
 
 logger = logging.getLogger(__name__)
 
+# Module-level so the compiled statement is reused from SQLAlchemy's cache
+_SELECT_ACTIVE_TEMPLATES = select(
+    ObjectionsKB.objection_type, ObjectionsKB.template_subject, ObjectionsKB.template_body,
+).where(ObjectionsKB.is_active.is_(True))
+
 
 class ObjectionHandler:
     """
     Handles objections using ONLY approved templates from objections_kb.
     AI fallback is only for unmatched types — and even then, short + calendar.
+    Active templates are cached in-process for OBJECTIONS_CACHE_TTL_SECONDS;
+    anything that writes to objections_kb should call invalidate_cache().
     """
 
+    # objection_type → (template_subject, template_body)
+    _templates_cache: Optional[tuple[float, dict[str, tuple[Optional[str], str]]]] = None
+
+    @classmethod
+    def invalidate_cache(cls):
+        cls._templates_cache = None
+
+    @classmethod
+    def load_templates(cls, db: Session) -> dict[str, tuple[Optional[str], str]]:
+        """Active templates by objection type, from cache when fresh."""
+        cached = cls._templates_cache
+        if cached is not None and time.monotonic() - cached[0] < OBJECTIONS_CACHE_TTL_SECONDS:
+            return cached[1]
+
+        templates = {
+            row.objection_type: (row.template_subject, row.template_body)
+            for row in db.execute(_SELECT_ACTIVE_TEMPLATES)
+        }
+        cls._templates_cache = (time.monotonic(), templates)
+        return templates
+
     def handle(
         self,
         db: Session,
@@ -31,22 +61,20 @@ class ObjectionHandler:
         """
         brand_names = brand_names or []
 
-        # Step 68: Query objections_kb
+        # Step 68: Look up objections_kb (cached)
         template = None
         if objection_type:
-            template = db.query(ObjectionsKB).filter(
-                ObjectionsKB.objection_type == objection_type,
-                ObjectionsKB.is_active == True,
-            ).first()
+            template = self.load_templates(db).get(objection_type)
 
         if template:
+            template_subject, template_body = template
             # Render template with variables
-            body = template.template_body.format(
+            body = template_body.format(
                 company_name=company_name,
                 brand_names=", ".join(brand_names[:3]) if brand_names else "relevant lines",
                 booking_link=BOOKING_LINK,
             )
-            subject = (template.template_subject or f"Re: {company_name}").format(
+            subject = (template_subject or f"Re: {company_name}").format(
                 company_name=company_name,
             )
 
@@ -57,7 +85,7 @@ class ObjectionHandler:
             return {
                 "subject": subject,
                 "body": body,
-                "template_id": template.objection_type,
+                "template_id": objection_type,
                 "action": "respond_then_calendar",
             }
 
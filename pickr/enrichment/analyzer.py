@@ -3,18 +3,37 @@ Pickr AI - Lead Analyzer (v2)
 Spec steps 31-41: Build prompt, call AI with strict JSON, validate schema,
 repair retry if invalid. Classify replies with strict JSON.
 """
-import json
 import uuid
+import hashlib
 import logging
-from typing import Optional
-from anthropic import Anthropic
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Optional
+import orjson
 from pydantic import ValidationError
-from pickr.config import ANTHROPIC_API_KEY, LLM_MODEL, MAX_REPAIR_RETRIES, SCHEMA_VERSION
-from pickr.models import LeadClassifierOutput, ReplyClassifierOutput
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from pickr.config import (
+    LLM_MODEL, LLM_CACHE_SIZE, LLM_CACHE_PERSIST, LLM_CACHE_TTL_HOURS, MAX_REPAIR_RETRIES, SCHEMA_VERSION,
+)
+from pickr.models import LeadClassifierOutput, ReplyClassifierOutput, LLMCache, SessionLocal
+from pickr.llm import get_client
 
 logger = logging.getLogger(__name__)
 
-client = Anthropic(api_key=ANTHROPIC_API_KEY) if ANTHROPIC_API_KEY else None
+# Raw completions keyed by (model, prompt) digest, least recently used
+# evicted first. Replies are dominated by boilerplate ("unsubscribe",
+# out-of-office), so identical prompts are common. With LLM_CACHE_PERSIST
+# the llm_cache table sits behind it (see _load_persisted/_persist), its
+# rows expiring after LLM_CACHE_TTL_HOURS (see prune_llm_cache).
+_llm_cache: "OrderedDict[bytes, str]" = OrderedDict()
+_llm_cache_lock = threading.Lock()
+
+# First ```-fenced (optionally ```json) object in a completion
+_FENCED_JSON = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
 
 
 CLASSIFIER_PROMPT = """You are a wholesale lead qualification analyst for Pickr, a wholesale distributor
@@ -86,7 +105,7 @@ def classify_lead(
     Returns (parsed_output, llm_call_id).
     Spec: strict JSON or fail. One repair retry.
     """
-    if not client:
+    if get_client() is None:
         logger.warning("No Anthropic API key. Returning default classification.")
         return LeadClassifierOutput(), "no-api-key"
 
@@ -122,7 +141,7 @@ def classify_lead(
             f'"scale_score":0,"map_behavior_score":0,"store_count":0,'
             f'"qualifies":true,"disqualify_reason":null}}'
         )
-        raw_text = _call_llm(repair_prompt, f"{llm_call_id}-repair")
+        raw_text = _call_llm(repair_prompt, f"{llm_call_id}-repair", cache=False)
         parsed = _parse_strict_json(raw_text)
 
     if parsed is None:
@@ -131,7 +150,7 @@ def classify_lead(
 
     # Step 35: Schema validate via Pydantic
     try:
-        output = LeadClassifierOutput(**parsed)
+        output = LeadClassifierOutput.model_validate(parsed)
         return output, llm_call_id
     except ValidationError as e:
         logger.error(f"Schema validation failed for {llm_call_id}: {e}")
@@ -146,7 +165,7 @@ def classify_reply(
     Classify a reply using AI with strict JSON schema.
     Returns (parsed_output, llm_call_id).
     """
-    if not client:
+    if get_client() is None:
         return ReplyClassifierOutput(
             classification="unknown", action="handoff_to_human"
         ), "no-api-key"
@@ -168,7 +187,7 @@ def classify_reply(
             f'{{"classification":"unknown","objection_type":null,'
             f'"action":"handoff_to_human","interest_level":5}}'
         )
-        raw_text = _call_llm(repair_prompt, f"{llm_call_id}-repair")
+        raw_text = _call_llm(repair_prompt, f"{llm_call_id}-repair", cache=False)
         parsed = _parse_strict_json(raw_text)
 
     if parsed is None:
@@ -177,7 +196,7 @@ def classify_reply(
         ), llm_call_id
 
     try:
-        output = ReplyClassifierOutput(**parsed)
+        output = ReplyClassifierOutput.model_validate(parsed)
         return output, llm_call_id
     except ValidationError:
         return ReplyClassifierOutput(
@@ -185,49 +204,163 @@ def classify_reply(
         ), llm_call_id
 
 
-def _call_llm(prompt: str, call_id: str) -> str:
-    """Call Claude API and return raw text response."""
+def _call_llm(prompt: str, call_id: str, cache: bool = True) -> str:
+    """
+    Call Claude API and return raw text response.
+    With cache=True an identical earlier prompt is answered from memory;
+    repair retries pass cache=False so they always reach the model.
+    """
+    key = hashlib.blake2b(f"{LLM_MODEL}\0{prompt}".encode(), digest_size=16).digest()
+    if cache:
+        with _llm_cache_lock:
+            text = _llm_cache.get(key)
+            if text is not None:
+                _llm_cache.move_to_end(key)
+        if text is None and LLM_CACHE_PERSIST:
+            text = _load_persisted(key)
+            if text is not None:
+                _remember(key, text)
+        if text is not None:
+            logger.info(f"LLM cache hit [{call_id}]")
+            return text
+
     logger.info(f"LLM call [{call_id}]: {len(prompt)} chars")
     try:
-        response = client.messages.create(
+        # Streamed so we can hang up as soon as the JSON object is complete
+        # instead of waiting out any trailing commentary
+        with get_client().messages.stream(
             model=LLM_MODEL,
             max_tokens=1024,
             messages=[{"role": "user", "content": prompt}],
-        )
-        return response.content[0].text
+        ) as stream:
+            text = _collect_json_text(stream.text_stream)
     except Exception as e:
         logger.error(f"LLM call failed [{call_id}]: {e}")
         return ""
 
+    # Only keep completions that parse, so a bad one isn't replayed forever
+    if cache and _parse_strict_json(text) is not None:
+        _remember(key, text)
+        if LLM_CACHE_PERSIST:
+            _persist(key, text)
+    return text
+
+
+def _remember(key: bytes, text: str):
+    with _llm_cache_lock:
+        _llm_cache[key] = text
+        if len(_llm_cache) > LLM_CACHE_SIZE:
+            _llm_cache.popitem(last=False)
 
+
+def _load_persisted(key: bytes) -> Optional[str]:
+    """Unexpired completion stored in llm_cache, or None. Cache failures never fail the call."""
+    db = SessionLocal()
+    try:
+        return db.query(LLMCache.completion).filter(
+            LLMCache.key == key,
+            LLMCache.created_at > datetime.utcnow() - timedelta(hours=LLM_CACHE_TTL_HOURS),
+        ).scalar()
+    except Exception as e:
+        logger.warning(f"LLM cache read failed: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def _persist(key: bytes, text: str):
+    """Store a completion in llm_cache; a concurrent writer of the same key wins."""
+    db = SessionLocal()
+    try:
+        dialect = db.get_bind().dialect
+        if dialect.name in ("postgresql", "sqlite"):
+            dialect_insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+            db.execute(
+                dialect_insert(LLMCache.__table__)
+                .values(key=key, completion=text)
+                .on_conflict_do_nothing(index_elements=["key"])
+            )
+        elif db.get(LLMCache, key) is None:
+            db.add(LLMCache(key=key, completion=text))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"LLM cache write failed: {e}")
+    finally:
+        db.close()
+
+
+def prune_llm_cache() -> int:
+    """Delete llm_cache rows past LLM_CACHE_TTL_HOURS (worker upkeep). Returns rows deleted."""
+    if not LLM_CACHE_PERSIST:
+        return 0
+    db = SessionLocal()
+    try:
+        deleted = db.query(LLMCache).filter(
+            LLMCache.created_at <= datetime.utcnow() - timedelta(hours=LLM_CACHE_TTL_HOURS)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+def _collect_json_text(chunks: Iterable[str]) -> str:
+    """
+    Join streamed text, stopping once the first top-level JSON object
+    closes. Braces inside JSON strings are ignored.
+    """
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    for chunk in chunks:
+        parts.append(chunk)
+        for ch in chunk:
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif ch == "\\":
+                    escaped = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == "{":
+                depth += 1
+            elif depth and ch == '"':
+                in_string = True
+            elif depth and ch == "}":
+                depth -= 1
+                if depth == 0:
+                    return "".join(parts)
+    return "".join(parts)
+
+
+@lru_cache(maxsize=LLM_CACHE_SIZE)
 def _parse_strict_json(text: str) -> Optional[dict]:
-    """Parse strict JSON from LLM output. No commentary allowed."""
-    text = text.strip()
-    # Try direct parse
+    """
+    Parse strict JSON from LLM output. No commentary allowed.
+    Memoized (pure function); callers must treat the result as read-only.
+    """
+    # Try direct parse (JSON allows surrounding whitespace, so no strip copy)
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         pass
 
     # Try extracting JSON from markdown code block
-    if "```" in text:
-        parts = text.split("```")
-        for part in parts:
-            part = part.strip()
-            if part.startswith("json"):
-                part = part[4:].strip()
-            try:
-                return json.loads(part)
-            except json.JSONDecodeError:
-                continue
+    match = _FENCED_JSON.search(text)
+    if match:
+        try:
+            return orjson.loads(match.group(1))
+        except orjson.JSONDecodeError:
+            pass
 
     # Try finding JSON object
     start = text.find("{")
     end = text.rfind("}") + 1
     if start >= 0 and end > start:
         try:
-            return json.loads(text[start:end])
-        except json.JSONDecodeError:
+            return orjson.loads(text[start:end])
+        except orjson.JSONDecodeError:
             pass
 
     return None
@@ -3,12 +3,17 @@ Pickr AI - Email Finder (v2)
 Finds purchasing department email addresses for leads.
 Scrapes contact pages, uses email pattern matching, and validates emails via DNS.
 """
+import asyncio
 import logging
 import re
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional, List
-from urllib.parse import urljoin
+from urllib.parse import urlsplit
 import httpx
-from bs4 import BeautifulSoup
+from pickr.config import EMAIL_FINDER_CONCURRENCY, EMAIL_SMTP_VERIFY, SENDER_EMAIL
 try:
     import dns.resolver
     HAS_DNS = True
@@ -31,6 +36,36 @@ PURCHASING_PATTERNS = [
     r'info@',
 ]
 
+# All purchasing patterns as one alternation, one group per pattern, so
+# m.lastindex - 1 is the matched pattern's priority. Emails have a single
+# '@' and no pattern is a suffix of another, so at most one can match.
+PURCHASING_RE = re.compile('|'.join(f'({p})' for p in PURCHASING_PATTERNS), re.IGNORECASE)
+
+# Runs on raw response bytes: emails are ASCII, so no decode or DOM is needed
+EMAIL_RE_BYTES = re.compile(rb'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+EMAIL_STRICT_RE = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}$')
+NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]')
+
+# Qualifiers stripped from (lowercased) company names before guessing URLs,
+# removed in one pass. None is a prefix of another, so alternation order is moot.
+NAME_NOISE = [
+    '(regional)', '(shoppers owned)', '(vibrant beauty)', '(bed bath & beyond)',
+    '(if physical)', '(if physical retail)', '(if physical stores)',
+    '(airport retail)', '(retail sections)', '(general nutrition centers)',
+    'beauty departments', 'beauty sections', 'beauty boutique',
+    'life cafes', 'day spa',
+]
+NAME_NOISE_RE = re.compile('|'.join(map(re.escape, NAME_NOISE)))
+
+# Free webmail domains; never a purchasing department
+SPAM_DOMAINS = frozenset([
+    'gmail.com', 'outlook.com', 'yahoo.com', 'hotmail.com', 'aol.com',
+    'icloud.com', 'protonmail.com', 'mail.com',
+])
+
+# Conventional role addresses tried when no page lists an email, best first
+FALLBACK_PREFIXES = ['purchasing', 'buyers', 'wholesale', 'sales', 'orders', 'info', 'contact']
+
 CONTACT_PATHS = [
     '/contact',
     '/contact-us',
@@ -46,15 +81,137 @@ CONTACT_PATHS = [
 ]
 
 
+def _purchasing_rank(email: str) -> int:
+    """Priority of the purchasing pattern an email matches; unmatched sort last."""
+    m = PURCHASING_RE.search(email)
+    return m.lastindex - 1 if m else len(PURCHASING_PATTERNS)
+
+
+FETCH_CONCURRENCY = 10          # Max in-flight page fetches per site
+PAGE_BYTES_LIMIT = 256 * 1024   # Contact pages rarely need more; the tail is JS/CSS
+PROBE_TIMEOUT = 5.0             # Homepage HEAD before fetching contact pages
+DNS_LIFETIME = 2.0              # Seconds before an MX lookup gives up
+SMTP_TIMEOUT = 8.0              # Per step of an SMTP RCPT probe
+SMTP_PROBE_LIMIT = 7            # Top-ranked candidates probed per search step
+SMTP_HELO = SENDER_EMAIL.rpartition('@')[2] or 'localhost'
+
+SITEMAP_LOC_RE = re.compile(rb'<loc>\s*([^<\s]+)\s*</loc>', re.IGNORECASE)
+
+
+def _sitemap_contact_paths(sitemap: Optional[bytes], base_path: str) -> list[str]:
+    """
+    CONTACT_PATHS the sitemap actually lists. Empty when there is no plain
+    urlset sitemap or it lists none of them, meaning: try every path.
+    """
+    if not isinstance(sitemap, bytes) or b'<urlset' not in sitemap:
+        return []
+    listed = {
+        urlsplit(loc.decode('ascii', 'ignore')).path.rstrip('/').lower()
+        for loc in SITEMAP_LOC_RE.findall(sitemap)
+    }
+    return [path for path in CONTACT_PATHS if base_path + path in listed]
+
+
+@lru_cache(maxsize=1)
+def _get_resolver() -> "dns.resolver.Resolver":
+    """Process-wide resolver with bounded lookup time and its own record cache."""
+    resolver = dns.resolver.Resolver(configure=True)
+    resolver.lifetime = DNS_LIFETIME
+    resolver.cache = dns.resolver.LRUCache(10000)
+    return resolver
+
+
+@lru_cache(maxsize=10000)
+def _mx_exists(domain: str) -> bool:
+    """Whether a domain has MX records. Lookup errors count as a pass."""
+    try:
+        return len(_get_resolver().resolve(domain, 'MX')) > 0
+    except Exception as e:
+        logger.debug(f"DNS verification failed for {domain}: {e}")
+        # Fall back to just format validation
+        return True
+
+
+@lru_cache(maxsize=10000)
+def _mx_host(domain: str) -> Optional[str]:
+    """Preferred (lowest-preference) mail exchanger for a domain, or None."""
+    try:
+        answers = _get_resolver().resolve(domain, 'MX')
+    except Exception:
+        return None
+    return str(min(answers, key=lambda mx: mx.preference).exchange).rstrip('.') or None
+
+
+async def _smtp_probe(email: str) -> Optional[bool]:
+    """
+    Ask the domain's mail server whether it accepts RCPT TO for this address.
+    True/False on a definitive 2xx/5xx answer; None when inconclusive (no MX,
+    connection refused, timeouts, greylisting 4xx).
+    """
+    host = await asyncio.to_thread(_mx_host, email.rpartition('@')[2])
+    if not host:
+        return None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, 25), SMTP_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+    async def reply(line: Optional[str] = None) -> int:
+        if line is not None:
+            writer.write(line.encode('ascii') + b'\r\n')
+            await writer.drain()
+        # Multi-line replies continue with "250-..." and end with "250 ..."
+        while True:
+            resp = await asyncio.wait_for(reader.readline(), SMTP_TIMEOUT)
+            if not resp:
+                raise ConnectionError("connection closed")
+            if resp[3:4] != b'-':
+                return int(resp[:3])
+
+    try:
+        if await reply() != 220 or await reply(f'EHLO {SMTP_HELO}') != 250:
+            return None
+        # Null reverse-path, as for bounces; no mail is ever sent
+        if await reply('MAIL FROM:<>') != 250:
+            return None
+        code = await reply(f'RCPT TO:<{email}>')
+        writer.write(b'QUIT\r\n')
+        if 200 <= code < 300:
+            return True
+        if 500 <= code < 600:
+            return False
+        return None
+    except (OSError, asyncio.TimeoutError, ConnectionError, ValueError) as e:
+        logger.debug(f"SMTP probe failed for {email}: {e}")
+        return None
+    finally:
+        writer.close()
+
+
+async def _smtp_rejected(emails: list[str]) -> set[str]:
+    """Probe candidates concurrently; return those a mail server refused outright."""
+    results = await asyncio.gather(*(_smtp_probe(e) for e in emails))
+    return {e for e, ok in zip(emails, results) if ok is False}
+
+
+async def _prefetch_mx(domains: set[str]):
+    """Warm the _mx_exists cache for many domains at once."""
+    if not HAS_DNS or not domains:
+        return
+    await asyncio.gather(*(asyncio.to_thread(_mx_exists, d) for d in domains))
+
+
 class EmailFinder:
     """Finds email addresses for contacts on a website."""
 
-    def __init__(self):
-        self.client = httpx.Client(
-            timeout=10,
-            follow_redirects=True,
-            headers={"User-Agent": "Mozilla/5.0 (compatible; PickrBot/1.0)"},
-        )
+    # HTTP/2 multiplexes every candidate path over one connection per site
+    client_kwargs = dict(
+        http2=True,
+        timeout=httpx.Timeout(10.0, connect=3.0),
+        limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+        follow_redirects=True,
+        headers={"User-Agent": "Mozilla/5.0 (compatible; PickrBot/1.0)"},
+    )
 
     def find_email(self, company_name: str, website_url: str) -> Optional[str]:
         """
@@ -62,6 +219,10 @@ class EmailFinder:
 
         Returns: Email address or None if not found
         """
+        return asyncio.run(self.find_email_async(company_name, website_url))
+
+    async def find_email_async(self, company_name: str, website_url: str) -> Optional[str]:
+        """Async twin of find_email: fetches every candidate page concurrently."""
         # Clean up the URL
         if not website_url.startswith(('http://', 'https://')):
             website_url = 'https://' + website_url
@@ -69,90 +230,117 @@ class EmailFinder:
         # Remove trailing slashes
         website_url = website_url.rstrip('/')
 
-        # Try to extract domain for fallback patterns
+        # Split once; the domain feeds the fallback patterns, the origin the sitemap
         try:
-            from urllib.parse import urlparse
-            domain = urlparse(website_url).netloc.replace('www.', '')
-        except Exception:
-            domain = website_url.replace('https://', '').replace('http://', '')
+            parts = urlsplit(website_url)
+        except ValueError as e:
+            logger.info(f"Invalid website URL for {company_name}: {e}")
+            return None
+        domain = parts.netloc.removeprefix('www.')
 
         logger.info(f"Finding email for {company_name} ({website_url})")
 
-        # Step 1: Try common contact pages
-        for path in CONTACT_PATHS:
-            email = self._scrape_page_for_email(website_url + path)
-            if email:
-                logger.info(f"Found email on {path}: {email}")
-                return email
-
-        # Step 2: Try homepage
-        email = self._scrape_page_for_email(website_url)
-        if email:
-            logger.info(f"Found email on homepage: {email}")
-            return email
-
-        # Step 3: Try common email patterns
-        common_emails = [
-            f'purchasing@{domain}',
-            f'buyers@{domain}',
-            f'wholesale@{domain}',
-            f'sales@{domain}',
-            f'orders@{domain}',
-            f'info@{domain}',
-            f'contact@{domain}',
+        # httpx async pools are bound to their event loop, so one client per run
+        async with httpx.AsyncClient(**self.client_kwargs) as client:
+            semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+            # Probe the homepage (and read the sitemap) before fanning out, so
+            # a dead site costs one short request instead of a dozen timeouts
+            probe, sitemap = await asyncio.gather(
+                client.head(website_url, timeout=PROBE_TIMEOUT),
+                self._fetch_page(client, semaphore, f"{parts.scheme}://{parts.netloc}/sitemap.xml"),
+                return_exceptions=True,
+            )
+            if isinstance(probe, Exception) or probe.status_code >= 500:
+                logger.info(f"Site unreachable for {company_name}: {probe if isinstance(probe, Exception) else probe.status_code}")
+                return None
+
+            # Steps 1-2: Contact pages, then the homepage. Fetch them all at
+            # once and take the first hit in that priority order.
+            paths = _sitemap_contact_paths(sitemap, parts.path) or CONTACT_PATHS
+            labels = paths + ['homepage']
+            urls = [website_url + path for path in paths] + [website_url]
+            pages = await asyncio.gather(
+                *(self._fetch_page(client, semaphore, url) for url in urls)
+            )
+
+        ranked = [
+            (label, self._page_emails(page))
+            for label, page in zip(labels, pages) if page is not None
         ]
 
-        for email in common_emails:
-            if self._verify_email(email):
-                logger.info(f"Verified common pattern email: {email}")
-                return email
+        # Resolve every domain we might verify (page emails + the fallback
+        # domain) concurrently, so the checks below are cache hits
+        domains = {e.rpartition('@')[2] for _, emails in ranked for e in emails}
+        domains.add(domain.lower())
+        await _prefetch_mx(domains)
+
+        # Optionally probe the top candidates' mail servers in parallel and
+        # drop any address they refuse; inconclusive probes change nothing
+        smtp_verify = EMAIL_SMTP_VERIFY and HAS_DNS
+        rejected = set()
+        if smtp_verify:
+            candidates = [e for _, emails in ranked for e in emails]
+            top = [e for e in dict.fromkeys(candidates) if self._verify_email(e)][:SMTP_PROBE_LIMIT]
+            rejected = await _smtp_rejected(top)
+
+        for label, emails in ranked:
+            for email in emails:
+                if email not in rejected and self._verify_email(email):
+                    logger.info(f"Found email on {label}: {email}")
+                    return email
+
+        # Step 3: Fall back to a conventional role address. The prefixes share
+        # this domain, so the DNS checks agree for all of them; only an SMTP
+        # probe can tell them apart, since RCPT rejection is per mailbox.
+        roles = [e for e in (f'{prefix}@{domain}' for prefix in FALLBACK_PREFIXES) if self._verify_email(e)]
+        if roles and smtp_verify:
+            probed = roles[:SMTP_PROBE_LIMIT]
+            rejected = await _smtp_rejected(probed)
+            roles = [e for e in probed if e not in rejected]
+        if roles:
+            logger.info(f"Verified common pattern email: {roles[0]}")
+            return roles[0]
 
         logger.info(f"No email found for {company_name}")
         return None
 
-    def _scrape_page_for_email(self, url: str) -> Optional[str]:
-        """
-        Scrape a page for email addresses.
-        Prioritizes purchasing-related emails.
-        """
+    async def _fetch_page(
+        self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str,
+    ) -> Optional[bytes]:
+        """GET a page; returns up to PAGE_BYTES_LIMIT of its body, or None on error or non-200."""
         try:
-            resp = self.client.get(url, timeout=10)
-            if resp.status_code != 200:
-                return None
-
-            soup = BeautifulSoup(resp.text, 'html.parser')
-
-            # Get all text content
-            text = soup.get_text() + '\n' + resp.text
-
-            # Find all emails
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, text)
-
-            # Remove duplicates and filter
-            emails = list(set(emails))
-
-            # Filter out common non-purchasing emails
-            spam_domains = ['gmail.com', 'outlook.com', 'yahoo.com', 'hotmail.com', 'aol.com']
-            emails = [e for e in emails if not any(e.endswith('@' + d) for d in spam_domains)]
+            async with semaphore, client.stream('GET', url) as resp:
+                if resp.status_code != 200:
+                    return None
+                body = bytearray()
+                async for chunk in resp.aiter_bytes(chunk_size=65536):
+                    body += chunk
+                    if len(body) >= PAGE_BYTES_LIMIT:
+                        break
+                return bytes(body[:PAGE_BYTES_LIMIT])
+        except Exception as e:
+            logger.debug(f"Error scraping {url}: {e}")
+            return None
 
-            # Prioritize purchasing-related emails
-            for pattern in PURCHASING_PATTERNS:
-                for email in emails:
-                    if re.search(pattern, email, re.IGNORECASE):
-                        if self._verify_email(email):
-                            return email
+    def _page_emails(self, body: bytes) -> list[str]:
+        """
+        Candidate emails on a page, purchasing-related first.
+        Emails are not verified here; the caller checks them in order.
+        """
+        # Most pages have no '@' at all; a memchr scan rules them out before
+        # the regex walks every byte
+        if b'@' not in body:
+            return []
 
-            # Return first valid email if no purchasing match
-            for email in emails:
-                if self._verify_email(email):
-                    return email
+        # Find all emails, deduplicated case-insensitively
+        emails = {e.decode('ascii').lower() for e in EMAIL_RE_BYTES.findall(body)}
 
-            return None
+        # Filter out common non-purchasing emails
+        emails = [e for e in emails if e.rpartition('@')[2] not in SPAM_DOMAINS]
 
-        except Exception as e:
-            logger.debug(f"Error scraping {url}: {e}")
-            return None
+        # Purchasing-related emails first (by pattern priority), then the rest
+        return sorted(emails, key=_purchasing_rank)
 
     def _verify_email(self, email: str) -> bool:
         """
@@ -163,20 +351,12 @@ class EmailFinder:
             return False
 
         # Basic format check
-        email_pattern = r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}$'
-        if not re.match(email_pattern, email):
+        if not EMAIL_STRICT_RE.match(email):
             return False
 
         # Try DNS verification if available
         if HAS_DNS:
-            try:
-                domain = email.split('@')[1]
-                mx_records = dns.resolver.resolve(domain, 'MX')
-                return len(mx_records) > 0
-            except Exception as e:
-                logger.debug(f"DNS verification failed for {email}: {e}")
-                # Fall back to just format validation
-                return True
+            return _mx_exists(email.split('@')[1].lower())
 
         return True
 
@@ -186,20 +366,15 @@ def guess_website_urls(company_name: str) -> List[str]:
     Generate likely website URLs from a company name.
     E.g. "CREDO BEAUTY" → ["credobeauty.com", "credo-beauty.com", "credo.com"]
     """
-    import unicodedata
-    # Normalize and clean
-    name = unicodedata.normalize('NFKD', company_name.lower())
-    name = name.encode('ascii', 'ignore').decode('ascii')
+    # Normalize and clean (NFKD only matters when there is non-ASCII to fold)
+    name = company_name.lower()
+    if not name.isascii():
+        name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
 
     # Remove common suffixes/prefixes
-    for remove in ['(regional)', '(shoppers owned)', '(vibrant beauty)', '(bed bath & beyond)',
-                    '(if physical)', '(if physical retail)', '(if physical stores)',
-                    '(airport retail)', '(retail sections)', '(general nutrition centers)',
-                    'beauty departments', 'beauty sections', 'beauty boutique',
-                    'life cafes', 'day spa']:
-        name = name.replace(remove, '')
-
-    name = re.sub(r'[^a-z0-9\s]', '', name).strip()
+    name = NAME_NOISE_RE.sub('', name)
+
+    name = NON_ALNUM_RE.sub('', name).strip()
     words = name.split()
 
     urls = []
@@ -243,3 +418,45 @@ def find_email_for_lead(company_name: str, website_url: str = None) -> Optional[
             return result
 
     return None
+
+
+def _site_key(company_name: str, website_url: Optional[str]) -> str:
+    """Host a lead's lookups will hit; leads without a URL group by name."""
+    if not website_url:
+        return company_name.lower()
+    if not website_url.startswith(('http://', 'https://')):
+        website_url = 'https://' + website_url
+    return urlsplit(website_url).netloc.lower().removeprefix('www.')
+
+
+def find_emails_for_leads(leads: list[tuple[str, Optional[str]]]) -> list[Optional[str]]:
+    """
+    Find emails for many leads at once.
+
+    Args:
+        leads: (company_name, website_url) pairs
+
+    Returns:
+        Email address or None per lead, in input order
+    """
+    # One worker per site: leads sharing a host run back to back so a site
+    # never sees two concurrent crawls, while distinct sites run in parallel.
+    sites: dict[str, list[int]] = defaultdict(list)
+    for idx, (company_name, website_url) in enumerate(leads):
+        sites[_site_key(company_name, website_url)].append(idx)
+
+    results: list[Optional[str]] = [None] * len(leads)
+
+    def _run_site(indices: list[int]):
+        for idx in indices:
+            try:
+                results[idx] = find_email_for_lead(*leads[idx])
+            except Exception as e:
+                logger.error(f"Email lookup failed for {leads[idx][0]}: {e}")
+
+    if not sites:
+        return results
+    workers = min(EMAIL_FINDER_CONCURRENCY, len(sites))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pickr-email") as pool:
+        list(pool.map(_run_site, sites.values()))
+    return results
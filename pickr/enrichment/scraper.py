@@ -4,16 +4,24 @@ Spec steps 16-30: Fetch homepage, store HTML snapshot, extract signals.
 Stores artifacts with content hashes for audit.
 """
 import hashlib
-import json
 import logging
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 from urllib.parse import urljoin
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+import orjson
+from lxml import etree
 from pickr.config import ARTIFACTS_DIR, SCRAPE_BUDGET_MS, SCRAPE_MAX_PAGES
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +34,120 @@ PLATFORM_SIGNATURES = {
     "walmart": ["walmart.com"],
 }
 
+# Lowercased once at import; pages are lowercased once per scrape
+SIGS_LOWER = {plat: tuple(sig.lower() for sig in sigs) for plat, sigs in PLATFORM_SIGNATURES.items()}
+
+MAP_KEYWORDS = ["MAP pricing", "minimum advertised price", "MSRP", "pricing policy", "authorized dealer"]
+MAP_KEYWORDS_LOWER = tuple(kw.lower() for kw in MAP_KEYWORDS)
+
+# Built once at import: one pass over the page finds every platform
+# signature and MAP keyword. Values are (kind, priority rank, length).
+if HAS_AHOCORASICK:
+    _MARKERS_AC = ahocorasick.Automaton()
+    for _rank, _sigs in enumerate(SIGS_LOWER.values()):
+        for _sig in _sigs:
+            _MARKERS_AC.add_word(_sig, ("platform", _rank, len(_sig)))
+    for _rank, _kw in enumerate(MAP_KEYWORDS_LOWER):
+        _MARKERS_AC.add_word(_kw, ("map", _rank, len(_kw)))
+    _MARKERS_AC.make_automaton()
+
+# Listing-count phrases, tried in order by _estimate_skus
+SKU_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\d+)\s*products?\b', r'(\d+)\s*items?\b', r'showing.*?of\s*(\d+)',
+))
+PRODUCT_HREF_RE = re.compile(r'/products?/')
+TAG_RE = re.compile(r'<[^>]+>')
+
+_UTF8_PARSER = lxml.html.HTMLParser(encoding="utf-8")
+
+# Artifact writes are small; two threads keep them off the fetch path
+_ARTIFACT_WRITER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pickr-artifact")
+
+# Elements whose contents aren't visible page text
+_INVISIBLE_TAGS = frozenset(("script", "style", "template"))
+
+
+def _parse_html(html: str) -> lxml.html.HtmlElement:
+    """Parse a page, tolerating XML declarations and empty documents."""
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # str input can't carry an encoding declaration; hand lxml the bytes
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=_UTF8_PARSER)
+    except etree.ParserError:
+        return lxml.html.document_fromstring("<html></html>")
+
+
+def _write_artifact(path: Path, body: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+
+
+@dataclass
+class PageIndex:
+    """Everything the extractors read from a page, gathered in one tree sweep."""
+    hrefs: list[str] = field(default_factory=list)
+    nav_links: list = field(default_factory=list)
+    brand_metas: list[str] = field(default_factory=list)
+    ld_json: list[str] = field(default_factory=list)
+    price_meta: Optional[str] = None
+    title: Optional[lxml.html.HtmlElement] = None
+
+
+def _index_page(tree: lxml.html.HtmlElement) -> PageIndex:
+    """Walk the tree once (only the tags we read) and collect every target."""
+    idx = PageIndex()
+    navs = []
+    for el in tree.iter("a", "meta", "title", "nav", "script"):
+        tag = el.tag
+        if tag == "a":
+            href = el.get("href")
+            if href is not None:
+                idx.hrefs.append(href)
+        elif tag == "meta":
+            prop = el.get("property")
+            if prop == "product:brand":
+                content = el.get("content")
+                if content is not None:
+                    idx.brand_metas.append(content)
+            elif prop == "product:price:amount" and idx.price_meta is None:
+                idx.price_meta = el.get("content", "")
+        elif tag == "script":
+            if el.get("type") == "application/ld+json":
+                idx.ld_json.append(el.text)
+        elif tag == "title":
+            if idx.title is None:
+                idx.title = el
+        else:
+            navs.append(el)
+    # Nested navs would list their links twice; keep each anchor once
+    idx.nav_links = list(dict.fromkeys(a for nav in navs for a in nav.iter("a")))
+    return idx
+
+
+def _text_nodes(el):
+    """Yield the visible text nodes under an element, in document order."""
+    hidden = 0
+    for ev, e in etree.iterwalk(el, events=("start", "end", "comment", "pi")):
+        if ev == "start":
+            if e.tag in _INVISIBLE_TAGS:
+                hidden += 1
+            elif not hidden and e.text:
+                yield e.text
+        elif ev == "end":
+            if e.tag in _INVISIBLE_TAGS:
+                hidden -= 1
+            if not hidden and e is not el and e.tail:
+                yield e.tail
+        elif not hidden and e.tail:
+            # Comments and PIs carry no visible text, only their tails
+            yield e.tail
+
+
+def _text(el, separator: str = "") -> str:
+    """Visible text under an element, each piece stripped and blanks dropped."""
+    return separator.join(t for t in (s.strip() for s in _text_nodes(el)) if t)
+
 
 class StorefrontScraper:
     """Scrapes storefronts and returns structured signals for lead_signals table."""
@@ -55,22 +177,28 @@ class StorefrontScraper:
             html = resp.text
 
             # Store HTML snapshot
-            adir = ARTIFACTS_DIR / lead_id
-            adir.mkdir(parents=True, exist_ok=True)
-            apath = adir / "home.html"
-            apath.write_text(html, encoding="utf-8")
+            apath = ARTIFACTS_DIR / lead_id / "home.html"
+            # Snapshot and hash the raw body: no re-encode of the decoded text,
+            # and the hash matches the bytes on disk
+            body = resp.content
+            # Written in the background while product pages are fetched;
+            # joined before the scrape is reported as a success
+            snapshot = _ARTIFACT_WRITER.submit(_write_artifact, apath, body)
             r["scrape_artifact_path"] = str(apath)
-            r["scrape_artifact_hash"] = hashlib.sha256(html.encode()).hexdigest()
+            r["scrape_artifact_hash"] = hashlib.sha256(body).hexdigest()
             r["pages_fetched"] = 1
 
-            soup = BeautifulSoup(html, "lxml")
-            text = soup.get_text(separator=" ", strip=True)
+            # One parse and one sweep; every extractor below reads the index
+            tree = _parse_html(html)
+            page = _index_page(tree)
+            text = _text(tree, separator=" ")
             r["site_excerpt"] = text[:2000]
-            r["detected_platform"] = self._detect_platform(html)
-            r["categories"] = self._extract_categories(soup)
+            html_lower = html.lower()
+            r["detected_platform"], mp = self._detect_markers(html, html_lower)
+            r["categories"] = self._extract_categories(page.nav_links)
 
             # Fetch sample products
-            purls = self._find_product_urls(soup, r["final_url"])
+            purls = self._find_product_urls(page.hrefs, r["final_url"])
             products = []
             for purl in purls[:min(SCRAPE_MAX_PAGES - 1, 6)]:
                 if (time.time() - start) * 1000 > SCRAPE_BUDGET_MS:
@@ -83,47 +211,66 @@ class StorefrontScraper:
                 except Exception:
                     pass
             r["sample_products"] = products
-            r["sku_count_estimate"] = self._estimate_skus(soup, html)
+            r["sku_count_estimate"] = self._estimate_skus(page.hrefs, html)
 
             prices = [p["price"] for p in products if p.get("price")]
             if prices:
                 r["price_range_min"] = min(prices)
                 r["price_range_max"] = max(prices)
 
-            r["brand_mentions_raw"] = self._extract_brands(soup, products)
+            r["brand_mentions_raw"] = self._extract_brands(page.brand_metas, products)
 
-            mp = self._detect_map(soup, html)
             r["map_text_found"] = mp["found"]
             r["map_text_excerpt"] = mp.get("excerpt")
 
-            r["private_label_ratio"] = self._pl_ratio(soup, products)
+            r["private_label_ratio"] = self._pl_ratio(page.title, products)
+            snapshot.result()
             r["success"] = True
         except Exception as e:
             r["error"] = str(e)
             logger.error(f"Scrape failed {url}: {e}")
         return r
 
-    def _detect_platform(self, html: str) -> str:
-        hl = html.lower()
-        for plat, sigs in PLATFORM_SIGNATURES.items():
-            if any(s.lower() in hl for s in sigs):
-                return plat
-        return "custom"
+    def _detect_markers(self, html: str, html_lower: str) -> tuple[str, dict]:
+        """
+        Detected platform (first in PLATFORM_SIGNATURES order with any
+        signature on the page) and MAP info (first-listed keyword present,
+        excerpted around its first occurrence).
+        """
+        platforms = list(SIGS_LOWER)
+        if HAS_AHOCORASICK:
+            plat_rank, map_rank = len(platforms), len(MAP_KEYWORDS_LOWER)
+            map_at = -1
+            for end, (kind, rank, n) in _MARKERS_AC.iter(html_lower):
+                if kind == "platform":
+                    plat_rank = min(plat_rank, rank)
+                elif rank < map_rank:
+                    map_rank, map_at = rank, end - n + 1
+            platform = platforms[plat_rank] if plat_rank < len(platforms) else "custom"
+        else:
+            platform = next(
+                (plat for plat, sigs in SIGS_LOWER.items() if any(s in html_lower for s in sigs)),
+                "custom",
+            )
+            map_at = next((i for i in map(html_lower.find, MAP_KEYWORDS_LOWER) if i >= 0), -1)
 
-    def _extract_categories(self, soup: BeautifulSoup) -> list[str]:
+        if map_at < 0:
+            return platform, {"found": False}
+        excerpt = TAG_RE.sub(' ', html[max(0,map_at-100):map_at+200]).strip()
+        return platform, {"found": True, "excerpt": excerpt[:300]}
+
+    def _extract_categories(self, nav_links: list) -> list[str]:
         cats = set()
         skip = {"home","about","contact","blog","faq","cart","login","register","account","search","help"}
-        for nav in soup.find_all("nav"):
-            for a in nav.find_all("a"):
-                t = a.get_text(strip=True)
-                if t and 2 < len(t) < 50 and t.lower() not in skip:
-                    cats.add(t)
+        for a in nav_links:
+            t = _text(a)
+            if t and 2 < len(t) < 50 and t.lower() not in skip:
+                cats.add(t)
         return list(cats)[:20]
 
-    def _find_product_urls(self, soup: BeautifulSoup, base: str) -> list[str]:
+    def _find_product_urls(self, hrefs: list[str], base: str) -> list[str]:
         urls = set()
-        for a in soup.find_all("a", href=True):
-            h = a["href"]
+        for h in hrefs:
             if any(p in h for p in ["/products/", "/product/", "/dp/", "/item/"]):
                 if h.startswith("/"):
                     h = urljoin(base, h)
@@ -133,11 +280,15 @@ class StorefrontScraper:
 
     def _fetch_product(self, url: str) -> Optional[dict]:
         resp = self.client.get(url)
-        soup = BeautifulSoup(resp.text, "lxml")
+        page = _index_page(_parse_html(resp.text))
         p = {"url": url, "title": None, "price": None, "vendor": None}
-        for s in soup.find_all("script", type="application/ld+json"):
+        for raw in page.ld_json:
+            # Most ld+json blocks are breadcrumbs/organization data; only a
+            # block naming "Product" can match, so skip the rest unparsed
+            if not raw or '"Product"' not in raw:
+                continue
             try:
-                d = json.loads(s.string)
+                d = orjson.loads(raw)
                 if isinstance(d, dict) and d.get("@type") == "Product":
                     p["title"] = d.get("name")
                     o = d.get("offers", {})
@@ -147,49 +298,36 @@ class StorefrontScraper:
                     p["vendor"] = (d.get("brand") or {}).get("name")
             except: pass
         if not p["title"]:
-            t = soup.find("title")
-            if t: p["title"] = t.get_text(strip=True)[:200]
+            if page.title is not None: p["title"] = _text(page.title)[:200]
         if p["price"] is None:
-            m = soup.find("meta", {"property": "product:price:amount"})
-            if m:
-                try: p["price"] = float(m.get("content", ""))
+            if page.price_meta is not None:
+                try: p["price"] = float(page.price_meta)
                 except: pass
         return p if p["title"] else None
 
-    def _estimate_skus(self, soup: BeautifulSoup, html: str) -> int:
-        for pat in [r'(\d+)\s*products?\b', r'(\d+)\s*items?\b', r'showing.*?of\s*(\d+)']:
-            m = re.search(pat, html, re.IGNORECASE)
+    def _estimate_skus(self, hrefs: list[str], html: str) -> int:
+        for pat in SKU_RES:
+            m = pat.search(html)
             if m:
                 try:
                     c = int(m.group(1))
                     if 1 < c < 100000: return c
                 except: pass
-        return max(len(soup.find_all("a", href=re.compile(r'/products?/'))), 0)
+        return sum(1 for h in hrefs if PRODUCT_HREF_RE.search(h))
 
-    def _extract_brands(self, soup: BeautifulSoup, products: list) -> list[str]:
+    def _extract_brands(self, brand_metas: list[str], products: list) -> list[str]:
         brands = set()
         for p in products:
             if p.get("vendor"): brands.add(p["vendor"])
-        for m in soup.find_all("meta", {"property": "product:brand"}):
-            c = m.get("content", "").strip()
+        for c in brand_metas:
+            c = c.strip()
             if c: brands.add(c)
         return list(brands)[:50]
 
-    def _detect_map(self, soup: BeautifulSoup, html: str) -> dict:
-        kws = ["MAP pricing", "minimum advertised price", "MSRP", "pricing policy", "authorized dealer"]
-        hl = html.lower()
-        for kw in kws:
-            if kw.lower() in hl:
-                i = hl.index(kw.lower())
-                excerpt = re.sub(r'<[^>]+>', ' ', html[max(0,i-100):i+200]).strip()
-                return {"found": True, "excerpt": excerpt[:300]}
-        return {"found": False}
-
-    def _pl_ratio(self, soup: BeautifulSoup, products: list) -> float:
+    def _pl_ratio(self, title: Optional[lxml.html.HtmlElement], products: list) -> float:
         if not products: return 0.0
-        t = soup.find("title")
-        if not t: return 0.0
-        sb = t.get_text(strip=True).split("|")[0].split("-")[0].strip().lower()
+        if title is None: return 0.0
+        sb = _text(title).split("|")[0].split("-")[0].strip().lower()
         if not sb: return 0.0
         ct = sum(1 for p in products if sb in (p.get("vendor") or "").lower() or sb in (p.get("title") or "").lower())
         return round(ct / len(products), 2) if products else 0.0
@@ -10,29 +10,420 @@ The adapter handles:
   - Reply sending via provider
   - Webhook processing for delivery events and replies
 """
+import asyncio
 import logging
+import random
+import time
 import httpx
-from typing import Optional
+import orjson
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Union
 from abc import ABC, abstractmethod
 from pickr.config import (
     EMAIL_PROVIDER, SMARTLEAD_API_KEY, SMARTLEAD_BASE_URL,
     INSTANTLY_API_KEY, INSTANTLY_BASE_URL,
+    SMARTLEAD_MAX_CONCURRENCY, INSTANTLY_MAX_CONCURRENCY,
+    SMARTLEAD_RPM, INSTANTLY_RPM, WEBHOOK_KEEP_RAW,
 )
 
 logger = logging.getLogger(__name__)
 
+PROVIDER_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60)
+PROVIDER_TIMEOUT = httpx.Timeout(30.0)
+
+# Responses that mean the provider is shedding load (back off), as opposed
+# to a bad request (ordinary error)
+OVERLOAD_STATUSES = frozenset({429, 502, 503, 504})
+
+# Rate-limit headers, most specific first (SmartLead/Instantly send the
+# plain x-ratelimit-* variants; the IETF draft names are bare ratelimit-*)
+RL_REMAINING_HEADERS = ("x-ratelimit-remaining-requests", "x-ratelimit-remaining", "ratelimit-remaining")
+RL_RESET_HEADERS = ("x-ratelimit-reset-requests", "x-ratelimit-reset", "ratelimit-reset")
+RL_MAX_WAIT = 60.0  # never park a caller longer than this on header advice
+
+# Transient failures are retried with exponential backoff plus jitter
+RETRY_ATTEMPTS = 3
+RETRY_BASE = 0.5      # seconds; doubles per attempt
+RETRY_MAX_WAIT = 8.0
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError)
+# Writes (replies, lead pushes, campaign creation) may already have been
+# applied when the response is lost, so they only retry failures that prove
+# the request never got through: no connection, or an explicit 429
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+WRITE_RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout)
+WRITE_RETRY_STATUSES = frozenset({429})
+
+
+def _header_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After / reset header. Accepts delta seconds
+    ("30", "1.5s"), epoch timestamps, and HTTP-dates; None if unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value.removesuffix("s"))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    if seconds > 1e9:  # epoch timestamp, not a delta
+        seconds -= time.time()
+    return max(0.0, seconds)
+
+
+def _first_header(headers: httpx.Headers, names: tuple[str, ...]) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+# Webhook event type → (normalized event, payload key holding reply_text)
+_SL_EVENT_MAP = {
+    "EMAIL_SENT": ("sent", None),
+    "EMAIL_OPENED": ("opened", None),
+    "EMAIL_REPLIED": ("replied", "reply_text"),
+    "EMAIL_BOUNCED": ("bounced", None),
+    "EMAIL_UNSUBSCRIBED": ("unsubscribed", None),
+}
+_IN_EVENT_MAP = {
+    "email_sent": ("sent", None),
+    "email_opened": ("opened", None),
+    "reply_received": ("replied", "reply_body"),
+    "email_bounced": ("bounced", None),
+    "lead_unsubscribed": ("unsubscribed", None),
+}
+
+
+# Bulky payload fields already copied onto the normalized event
+_RAW_SKIP_KEYS = frozenset({"reply_text", "reply_body"})
+
+
+@dataclass(slots=True)
+class NormalizedEvent:
+    """Provider-agnostic webhook event returned by parse_webhook."""
+    provider: str
+    event: str
+    email: str = ""
+    campaign_id: Optional[str] = None
+    reply_text: Optional[str] = None
+    raw_type: Optional[str] = None
+    raw: Optional[dict] = None
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class SlidingWindowLimiter:
+    """
+    At most `rpm` acquisitions in any trailing `window` seconds. Holds no
+    loop-bound primitives, so one instance can outlive several event loops.
+    """
+
+    def __init__(self, rpm: int, window: float = 60.0):
+        self.rpm = rpm
+        self.window = window
+        self.stamps: deque[float] = deque()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            while self.stamps and self.stamps[0] <= now - self.window:
+                self.stamps.popleft()
+            if len(self.stamps) < self.rpm:
+                # No await between the check and the append, so this is atomic
+                self.stamps.append(now)
+                return
+            await asyncio.sleep(self.stamps[0] + self.window - now)
+
+
+class BackpressureController:
+    """
+    AIMD concurrency limit plus a circuit breaker for one provider.
+
+    The limit starts at the configured ceiling. Overload signals (429/5xx
+    gateway errors, connection failures, timeouts) multiply it by beta;
+    once a full window of healthy calls averages under target_latency it
+    grows by alpha per call. trip_after consecutive overloads open the
+    circuit: calls fail fast for cooldown seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        alpha: float = 0.5,
+        beta: float = 0.5,
+        target_latency: float = 1.5,
+        trip_after: int = 5,
+        cooldown: float = 30.0,
+    ):
+        self.max_limit = float(max_concurrency)
+        self.limit = self.max_limit
+        self.alpha = alpha
+        self.beta = beta
+        self.target_latency = target_latency
+        self.trip_after = trip_after
+        self.cooldown = cooldown
+        self.latencies: deque[float] = deque(maxlen=32)
+        self.in_flight = 0
+        self.failures = 0
+        self.open_until = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, elapsed: float, overloaded: bool):
+        async with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(1.0, self.limit * self.beta)
+                self.latencies.clear()
+                self.failures += 1
+                if self.failures >= self.trip_after:
+                    self.open_until = time.monotonic() + self.cooldown
+                    self.failures = 0
+                    logger.warning(f"Provider circuit open for {self.cooldown:.0f}s")
+            else:
+                self.failures = 0
+                self.latencies.append(elapsed)
+                if (len(self.latencies) == self.latencies.maxlen
+                        and sum(self.latencies) / len(self.latencies) <= self.target_latency):
+                    self.limit = min(self.max_limit, self.limit + self.alpha)
+            self._cond.notify_all()
+
 
 class ProviderAdapter(ABC):
     """Abstract interface for email provider adapters."""
 
-    @abstractmethod
+    base_url: str = ""
+    max_concurrency: int = 20
+    rpm: int = 600
+    _http: Optional[httpx.AsyncClient] = None
+    _http_loop: Optional[asyncio.AbstractEventLoop] = None
+    _backpressure: Optional[BackpressureController] = None
+    _windows: Optional[dict[str, SlidingWindowLimiter]] = None
+    # campaign_key → provider campaign id, plus lookups in flight (loop-bound)
+    _campaign_cache: Optional[dict[str, str]] = None
+    _campaign_inflight: Optional[dict[str, asyncio.Future]] = None
+    # Latest provider rate-limit advice (monotonic reset deadline)
+    _rl_remaining: Optional[int] = None
+    _rl_reset: float = 0.0
+
+    def _client_options(self) -> dict:
+        """Per-provider client defaults (auth headers/params)."""
+        return {}
+
+    def _bind_loop(self):
+        """
+        Build the pooled client and the backpressure controller for the
+        running loop. Both are loop-bound, so a call from a different event loop
+        gets its own pair. The app serves from one loop and closes the
+        client in its shutdown hook (aclose).
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            options = self._client_options()
+            headers = {"User-Agent": "pickr/1.0", **options.pop("headers", {})}
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url, http2=True, timeout=PROVIDER_TIMEOUT,
+                limits=PROVIDER_LIMITS, headers=headers, **options,
+            )
+            self._backpressure = BackpressureController(self.max_concurrency)
+            self._campaign_inflight = {}
+            self._http_loop = loop
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP/2 client, built once and reused for every request."""
+        self._bind_loop()
+        return self._http
+
+    def _window(self, path: str) -> SlidingWindowLimiter:
+        """Per-family RPM window: lead writes and campaign calls are limited separately."""
+        family = "leads" if "/lead" in path else "campaigns"
+        if self._windows is None:
+            self._windows = {}
+        limiter = self._windows.get(family)
+        if limiter is None:
+            limiter = self._windows[family] = SlidingWindowLimiter(self.rpm)
+        return limiter
+
+    @property
+    def backpressure(self) -> BackpressureController:
+        """Adaptive in-flight limit (ceiling: max_concurrency) and circuit breaker."""
+        self._bind_loop()
+        return self._backpressure
+
+    def _rl_update(self, resp: httpx.Response):
+        """Record the provider's rate-limit headers (and Retry-After on 429)."""
+        remaining = _first_header(resp.headers, RL_REMAINING_HEADERS)
+        if remaining is not None:
+            try:
+                self._rl_remaining = int(float(remaining))
+            except ValueError:
+                pass
+        reset = _header_seconds(_first_header(resp.headers, RL_RESET_HEADERS))
+        if resp.status_code == 429:
+            reset = _header_seconds(resp.headers.get("retry-after")) or reset or 1.0
+            self._rl_remaining = 0
+        if reset is not None:
+            self._rl_reset = time.monotonic() + min(reset, RL_MAX_WAIT)
+
+    async def _rl_wait(self):
+        """Sleep until the reset deadline when the provider says we're nearly out."""
+        if self._rl_remaining is None:
+            return
+        if self._rl_remaining < max(2, 0.1 * self.backpressure.limit):
+            delay = self._rl_reset - time.monotonic()
+            if delay > 0:
+                logger.info(f"Provider rate limit low ({self._rl_remaining} left), waiting {delay:.1f}s")
+                await asyncio.sleep(delay)
+            # The window has rolled over; the next response refreshes the count
+            self._rl_remaining = None
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """
+        Issue an API call, retrying 429/502/503/504 and dropped connections
+        with exponential backoff (Retry-After wins when the provider sends
+        one). Non-GET calls only retry connect failures and 429 (see
+        SAFE_METHODS). Other 4xx come straight back. Raises httpx.HTTPError
+        subclasses.
+        """
+        if method.upper() in SAFE_METHODS:
+            retry_exceptions, retry_statuses = RETRY_EXCEPTIONS, OVERLOAD_STATUSES
+        else:
+            retry_exceptions, retry_statuses = WRITE_RETRY_EXCEPTIONS, WRITE_RETRY_STATUSES
+        if "json" in kwargs:
+            # Serialize once with orjson instead of httpx's stdlib json per attempt
+            kwargs["content"] = orjson.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {"Content-Type": "application/json", **kwargs.get("headers", {})}
+        for attempt in range(RETRY_ATTEMPTS):
+            last = attempt == RETRY_ATTEMPTS - 1
+            try:
+                resp = await self._send_once(method, path, **kwargs)
+            except retry_exceptions as e:
+                if last:
+                    raise
+                reason, retry_after = type(e).__name__, None
+            else:
+                if resp.status_code not in retry_statuses or last:
+                    return resp
+                reason, retry_after = resp.status_code, _header_seconds(resp.headers.get("retry-after"))
+            delay = min(RETRY_MAX_WAIT, RETRY_BASE * 2 ** attempt) + random.uniform(0, 0.25)
+            if retry_after is not None:
+                delay = min(retry_after, RL_MAX_WAIT)
+            logger.warning(f"Provider {method} {path} failed ({reason}), retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _send_once(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Issue one API call under backpressure; raises httpx.HTTPError subclasses."""
+        bp = self.backpressure
+        if bp.is_open:
+            raise CircuitOpenError(f"circuit open, skipping {method} {path}")
+        await self._window(path).acquire()
+        await self._rl_wait()
+        await bp.acquire()
+        overloaded = False
+        t0 = time.perf_counter()
+        try:
+            resp = await self.client.request(method, path, **kwargs)
+            overloaded = resp.status_code in OVERLOAD_STATUSES
+            self._rl_update(resp)
+            return resp
+        except httpx.TransportError:
+            overloaded = True
+            raise
+        finally:
+            await bp.release(time.perf_counter() - t0, overloaded)
+
+    @staticmethod
+    def _load_payload(payload: Union[dict, bytes, str]) -> dict:
+        """Webhook bodies may arrive as raw bytes; decode them with orjson."""
+        return payload if isinstance(payload, dict) else orjson.loads(payload)
+
+    @staticmethod
+    def _raw_payload(provider: str, payload: dict) -> Optional[dict]:
+        """
+        Log the inbound webhook payload at DEBUG; only keep it on the event
+        (minus reply bodies) with WEBHOOK_KEEP_RAW.
+        """
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"{provider} webhook payload: {payload}")
+        if WEBHOOK_KEEP_RAW:
+            return {k: v for k, v in payload.items() if k not in _RAW_SKIP_KEYS}
+        return None
+
+    async def aclose(self):
+        """Close the pooled client (call on app shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = self._http_loop = self._backpressure = None
+
     async def ensure_campaign(
         self,
         campaign_key: str,
         sender_email: str,
         sender_name: str,
     ) -> dict:
-        """Create or find existing campaign. Returns {provider_campaign_id}."""
+        """
+        Create or find existing campaign. Returns {provider_campaign_id}.
+        Resolved ids are cached per campaign_key, and concurrent calls for
+        the same key await the one lookup already in flight (single-flight).
+        """
+        if self._campaign_cache is None:
+            self._campaign_cache = {}
+        cached = self._campaign_cache.get(campaign_key)
+        if cached is not None:
+            return {"provider_campaign_id": cached}
+
+        self._bind_loop()
+        inflight = self._campaign_inflight.get(campaign_key)
+        if inflight is not None:
+            # shield: a cancelled waiter must not cancel everyone's lookup
+            return await asyncio.shield(inflight)
+
+        fut = asyncio.get_running_loop().create_future()
+        # Mark the outcome retrieved even when nobody else was waiting
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._campaign_inflight[campaign_key] = fut
+        try:
+            result = await self._resolve_campaign(campaign_key, sender_email, sender_name)
+            if "provider_campaign_id" in result:
+                self._campaign_cache[campaign_key] = result["provider_campaign_id"]
+            fut.set_result(result)
+            return result
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        except BaseException:
+            fut.cancel()
+            raise
+        finally:
+            del self._campaign_inflight[campaign_key]
+
+    @abstractmethod
+    async def _resolve_campaign(
+        self,
+        campaign_key: str,
+        sender_email: str,
+        sender_name: str,
+    ) -> dict:
+        """Look up or create the campaign at the provider (uncached)."""
         ...
 
     @abstractmethod
@@ -78,7 +469,7 @@ class ProviderAdapter(ABC):
         ...
 
     @abstractmethod
-    def parse_webhook(self, payload: dict) -> dict:
+    def parse_webhook(self, payload: Union[dict, bytes]) -> NormalizedEvent:
         """Parse incoming webhook and return normalized event."""
         ...
 
@@ -86,26 +477,33 @@ class ProviderAdapter(ABC):
 class SmartLeadAdapter(ProviderAdapter):
     """SmartLead email provider integration."""
 
+    max_concurrency = SMARTLEAD_MAX_CONCURRENCY
+    rpm = SMARTLEAD_RPM
+
     def __init__(self):
         self.api_key = SMARTLEAD_API_KEY
         self.base_url = SMARTLEAD_BASE_URL
-        self.client = httpx.AsyncClient(timeout=30)
+
+    def _client_options(self) -> dict:
+        # SmartLead authenticates with a query param; the client merges it
+        # into every request's params
+        return {"params": {"api_key": self.api_key}}
 
     async def _request(self, method: str, path: str, **kwargs) -> dict:
         """Make authenticated request to SmartLead API."""
-        url = f"{self.base_url}{path}"
-        params = kwargs.pop("params", {})
-        params["api_key"] = self.api_key
-
         try:
-            resp = await self.client.request(method, url, params=params, **kwargs)
+            resp = await self._send(method, path, **kwargs)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except httpx.HTTPError as e:
-            logger.error(f"SmartLead API error: {e}")
+            status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+            logger.error(
+                "SmartLead API error: %s", e,
+                extra={"provider": "smartlead", "status_code": status, "path": path},
+            )
             return {"error": str(e)}
 
-    async def ensure_campaign(
+    async def _resolve_campaign(
         self,
         campaign_key: str,
         sender_email: str,
@@ -150,11 +548,7 @@ class SmartLeadAdapter(ProviderAdapter):
         """Add lead to SmartLead campaign."""
         lead_data = {
             "email": email,
-            "custom_fields": {
-                "lead_id": lead_id,
-                "sequence_id": sequence_id,
-                **custom_vars,
-            },
+            "custom_fields": dict(custom_vars, lead_id=lead_id, sequence_id=sequence_id),
         }
 
         result = await self._request(
@@ -164,7 +558,10 @@ class SmartLeadAdapter(ProviderAdapter):
         )
 
         if "error" not in result:
-            return {"provider_lead_id": f"sl-{lead_id}"}
+            # Prefer SmartLead's own id; synthesize one only if it sent none
+            lead = result.get("lead") if isinstance(result, dict) else None
+            real_id = lead.get("id") if isinstance(lead, dict) else None
+            return {"provider_lead_id": str(real_id) if real_id else f"sl-{lead_id}"}
         return result
 
     async def start_sequence(
@@ -174,20 +571,22 @@ class SmartLeadAdapter(ProviderAdapter):
         emails: list[dict],
     ) -> dict:
         """Add sequence steps and start campaign for lead."""
-        # Add email steps to campaign
-        for i, email in enumerate(emails):
-            await self._request(
-                "POST",
-                f"/campaigns/{provider_campaign_id}/sequences",
-                json={
+        # Add all email steps to the campaign in one bulk call
+        await self._request(
+            "POST",
+            f"/campaigns/{provider_campaign_id}/sequences",
+            json={"sequences": [
+                {
                     "seq_number": i + 1,
                     "subject": email["subject"],
                     "email_body": email["body"],
                     "seq_delay_details": {
                         "delay_in_days": email.get("delay_days", 0),
                     },
-                },
-            )
+                }
+                for i, email in enumerate(emails)
+            ]},
+        )
 
         # Start campaign
         result = await self._request(
@@ -233,64 +632,57 @@ class SmartLeadAdapter(ProviderAdapter):
         )
         return {"status": "paused", "detail": result}
 
-    def parse_webhook(self, payload: dict) -> dict:
+    def parse_webhook(self, payload: Union[dict, bytes]) -> NormalizedEvent:
         """Parse SmartLead webhook payload into normalized event."""
-        event_type = payload.get("event_type", "")
-        lead_email = payload.get("lead_email", "")
-        campaign_id = payload.get("campaign_id")
-
-        normalized = {
-            "provider": "smartlead",
-            "raw": payload,
-        }
-
-        if event_type == "EMAIL_SENT":
-            normalized["event"] = "sent"
-            normalized["email"] = lead_email
-            normalized["campaign_id"] = str(campaign_id)
-        elif event_type == "EMAIL_OPENED":
-            normalized["event"] = "opened"
-            normalized["email"] = lead_email
-        elif event_type == "EMAIL_REPLIED":
-            normalized["event"] = "replied"
-            normalized["email"] = lead_email
-            normalized["reply_text"] = payload.get("reply_text", "")
-        elif event_type == "EMAIL_BOUNCED":
-            normalized["event"] = "bounced"
-            normalized["email"] = lead_email
-        elif event_type == "EMAIL_UNSUBSCRIBED":
-            normalized["event"] = "unsubscribed"
-            normalized["email"] = lead_email
-        else:
-            normalized["event"] = "unknown"
-            normalized["raw_type"] = event_type
-
-        return normalized
+        payload = self._load_payload(payload)
+        get = payload.get
+        event_type = get("event_type", "")
+        raw = self._raw_payload("smartlead", payload)
+
+        mapped = _SL_EVENT_MAP.get(event_type)
+        if mapped is None:
+            return NormalizedEvent("smartlead", "unknown", raw_type=event_type, raw=raw)
+
+        event, reply_key = mapped
+        lead_email, campaign_id = get("lead_email", ""), get("campaign_id")
+        return NormalizedEvent(
+            "smartlead",
+            event,
+            email=lead_email,
+            campaign_id=str(campaign_id) if event == "sent" else None,
+            reply_text=get(reply_key, "") if reply_key else None,
+            raw=raw,
+        )
 
 
 class InstantlyAdapter(ProviderAdapter):
     """Instantly.ai email provider integration."""
 
+    max_concurrency = INSTANTLY_MAX_CONCURRENCY
+    rpm = INSTANTLY_RPM
+
     def __init__(self):
         self.api_key = INSTANTLY_API_KEY
         self.base_url = INSTANTLY_BASE_URL
-        self.client = httpx.AsyncClient(timeout=30)
+
+    def _client_options(self) -> dict:
+        return {"headers": {"Authorization": f"Bearer {self.api_key}"}}
 
     async def _request(self, method: str, path: str, **kwargs) -> dict:
         """Make authenticated request to Instantly API."""
-        url = f"{self.base_url}{path}"
-        headers = kwargs.pop("headers", {})
-        headers["Authorization"] = f"Bearer {self.api_key}"
-
         try:
-            resp = await self.client.request(method, url, headers=headers, **kwargs)
+            resp = await self._send(method, path, **kwargs)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except httpx.HTTPError as e:
-            logger.error(f"Instantly API error: {e}")
+            status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+            logger.error(
+                "Instantly API error: %s", e,
+                extra={"provider": "instantly", "status_code": status, "path": path},
+            )
             return {"error": str(e)}
 
-    async def ensure_campaign(
+    async def _resolve_campaign(
         self,
         campaign_key: str,
         sender_email: str,
@@ -333,14 +725,11 @@ class InstantlyAdapter(ProviderAdapter):
             json={
                 "campaign_id": provider_campaign_id,
                 "email": email,
-                "custom_variables": {
-                    "lead_id": lead_id,
-                    "sequence_id": sequence_id,
-                    **custom_vars,
-                },
+                "custom_variables": dict(custom_vars, lead_id=lead_id, sequence_id=sequence_id),
             },
         )
-        return {"provider_lead_id": f"inst-{lead_id}"}
+        real_id = (result.get("id") or result.get("lead_id")) if isinstance(result, dict) else None
+        return {"provider_lead_id": str(real_id) if real_id else f"inst-{lead_id}"}
 
     async def start_sequence(
         self,
@@ -349,18 +738,20 @@ class InstantlyAdapter(ProviderAdapter):
         emails: list[dict],
     ) -> dict:
         """Instantly handles sequence via campaign settings."""
-        # Add sequence steps
-        for i, email in enumerate(emails):
-            await self._request(
-                "POST",
-                f"/campaign/{provider_campaign_id}/sequence/add",
-                json={
-                    "step": i + 1,
-                    "subject": email["subject"],
-                    "body": email["body"],
-                    "delay": email.get("delay_days", 0),
-                },
-            )
+        # No bulk endpoint: add the steps concurrently over the pooled
+        # connection (the explicit step number keeps them ordered)
+        path = f"/campaign/{provider_campaign_id}/sequence/add"
+        tasks = [
+            self._request("POST", path, json=self._step_payload(i, email))
+            for i, email in enumerate(emails)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        failed_steps = [
+            i + 1 for i, r in enumerate(results)
+            if isinstance(r, BaseException) or "error" in r
+        ]
+        if failed_steps:
+            logger.warning(f"Instantly campaign {provider_campaign_id}: steps {failed_steps} failed to add")
 
         # Launch campaign
         await self._request(
@@ -368,7 +759,19 @@ class InstantlyAdapter(ProviderAdapter):
             f"/campaign/{provider_campaign_id}/launch",
         )
 
-        return {"status": "active"}
+        result = {"status": "active"}
+        if failed_steps:
+            result["failed_steps"] = failed_steps
+        return result
+
+    @staticmethod
+    def _step_payload(i: int, email: dict) -> dict:
+        return {
+            "step": i + 1,
+            "subject": email["subject"],
+            "body": email["body"],
+            "delay": email.get("delay_days", 0),
+        }
 
     async def send_reply(
         self,
@@ -407,32 +810,26 @@ class InstantlyAdapter(ProviderAdapter):
         )
         return {"status": "paused", "detail": result}
 
-    def parse_webhook(self, payload: dict) -> dict:
+    def parse_webhook(self, payload: Union[dict, bytes]) -> NormalizedEvent:
         """Parse Instantly webhook into normalized event."""
-        event_type = payload.get("event", "")
-        normalized = {
-            "provider": "instantly",
-            "raw": payload,
-        }
-
-        event_map = {
-            "email_sent": "sent",
-            "email_opened": "opened",
-            "reply_received": "replied",
-            "email_bounced": "bounced",
-            "lead_unsubscribed": "unsubscribed",
-        }
-
-        normalized["event"] = event_map.get(event_type, "unknown")
-        normalized["email"] = payload.get("lead_email", "")
-        if normalized["event"] == "replied":
-            normalized["reply_text"] = payload.get("reply_body", "")
-
-        return normalized
+        payload = self._load_payload(payload)
+        get = payload.get
+        event_type, lead_email = get("event", ""), get("lead_email", "")
+        raw = self._raw_payload("instantly", payload)
+
+        event, reply_key = _IN_EVENT_MAP.get(event_type, ("unknown", None))
+        return NormalizedEvent(
+            "instantly",
+            event,
+            email=lead_email,
+            reply_text=get(reply_key, "") if reply_key else None,
+            raw=raw,
+        )
 
 
+@lru_cache(maxsize=1)
 def get_provider() -> ProviderAdapter:
-    """Factory: return the configured email provider adapter."""
+    """Factory: return the configured email provider adapter (one per process)."""
     if EMAIL_PROVIDER == "instantly":
         return InstantlyAdapter()
     return SmartLeadAdapter()  # Default
@@ -0,0 +1,36 @@
+"""
+Pickr AI - Webhook Authentication
+HMAC-SHA256 check over the untouched request body, done before any JSON
+decoding so the payload is never re-serialized just to be hashed.
+Providers that can't sign may instead pass the shared secret as ?token=.
+"""
+import hashlib
+import hmac
+from typing import Optional
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+def sign(secret: str, raw_body: bytes) -> str:
+    """Hex HMAC-SHA256 of the raw body (what senders put in SIGNATURE_HEADER)."""
+    return hmac.new(secret.encode(), raw_body, hashlib.sha256).hexdigest()
+
+
+def verify_webhook(
+    secret: str,
+    raw_body: bytes,
+    signature: Optional[str] = None,
+    token: Optional[str] = None,
+) -> bool:
+    """
+    True when the signature header (hex, optionally "sha256="-prefixed)
+    matches the body, or the ?token= query value equals the secret.
+    Always True when no secret is configured.
+    """
+    if not secret:
+        return True
+    if signature:
+        return hmac.compare_digest(sign(secret, raw_body), signature.removeprefix("sha256=").lower())
+    if token:
+        return hmac.compare_digest(token.encode(), secret.encode())
+    return False
@@ -0,0 +1,43 @@
+"""
+Pickr AI - LLM Clients
+Anthropic clients over pooled HTTP/2 connections, shared by the lead
+analyzer and the email generator. The anthropic SDK is imported on first
+use so CLI commands that never call the LLM don't pay for it.
+"""
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+import httpx
+from pickr.config import ANTHROPIC_API_KEY
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
+
+LLM_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+LLM_TIMEOUT = httpx.Timeout(60.0)
+
+
+@lru_cache(maxsize=1)
+def get_client() -> Optional["Anthropic"]:
+    """Process-wide sync client, or None when no API key is configured."""
+    if not ANTHROPIC_API_KEY:
+        return None
+    from anthropic import Anthropic
+    return Anthropic(
+        api_key=ANTHROPIC_API_KEY,
+        http_client=httpx.Client(http2=True, limits=LLM_LIMITS, timeout=LLM_TIMEOUT),
+    )
+
+
+def new_async_client() -> Optional["AsyncAnthropic"]:
+    """
+    Async client for a single event loop. httpx async pools are bound to the
+    loop that opened them, so each asyncio.run() needs its own client —
+    use it as `async with new_async_client() as aclient:`.
+    """
+    if not ANTHROPIC_API_KEY:
+        return None
+    from anthropic import AsyncAnthropic
+    return AsyncAnthropic(
+        api_key=ANTHROPIC_API_KEY,
+        http_client=httpx.AsyncClient(http2=True, limits=LLM_LIMITS, timeout=LLM_TIMEOUT),
+    )
@@ -7,29 +7,162 @@ Tables:
   brands, email_jobs, replies, suppression_list,
   audit_log, jobs, scrape_jobs, rules_leverage_matrix, objections_kb, config
 """
+import os
+import re
+import time
 import uuid
-from datetime import datetime
+import hashlib
+import logging
+from datetime import date, datetime
+from functools import lru_cache
 from enum import Enum
-from typing import Optional
+from typing import Annotated, Any, Optional
 from sqlalchemy import (
     create_engine, Column, Integer, String, Text, Float,
-    Boolean, DateTime, ForeignKey, JSON, UniqueConstraint,
-    Index, BigInteger, event
+    Boolean, DateTime, Enum as SAEnum, ForeignKey, JSON, UniqueConstraint,
+    Index, BigInteger, LargeBinary, bindparam, event, func, inspect, text
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
-from sqlalchemy.dialects.postgresql import UUID as PGUUID
-from pydantic import BaseModel, Field
-from pickr.config import DATABASE_URL
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import declarative_base, deferred, relationship, sessionmaker, validates
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID
+from pydantic import (
+    BaseModel, ConfigDict, Field, PlainSerializer, TypeAdapter, ValidationError, field_validator,
+)
+from pickr.config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_PRE_PING, DB_POOL_RECYCLE,
+    DB_POOL_TIMEOUT, IMPORT_BATCH_SIZE, AUDIT_PARTITION_MONTHS_AHEAD, AUDIT_HOT_MONTHS,
+    STATS_COUNTER_SHARDS,
+)
+
+logger = logging.getLogger(__name__)
 
 # ── SQLAlchemy Setup ──────────────────────────────────────────────
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
+_db_url = make_url(DATABASE_URL)
+# Bulk INSERTs (imports, seeds, audit flushes) go out as multi-row VALUES
+# statements, one per IMPORT_BATCH_SIZE rows
+_engine_kwargs = dict(echo=False, pool_pre_ping=DB_PRE_PING, insertmanyvalues_page_size=IMPORT_BATCH_SIZE)
+_is_postgres = _db_url.get_backend_name() == "postgresql"
+if _is_postgres:
+    _engine_kwargs.update(
+        pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE, pool_timeout=DB_POOL_TIMEOUT,
+    )
+    if _db_url.get_driver_name() == "psycopg2":
+        # Page executemany UPDATE/DELETE through execute_batch as well
+        _engine_kwargs.update(executemany_mode="values_plus_batch", executemany_batch_page_size=500)
+engine = create_engine(_db_url, **_engine_kwargs)
 SessionLocal = sessionmaker(bind=engine)
 
 
 def gen_uuid():
-    return str(uuid.uuid4())
+    """
+    UUIDv7: 48-bit millisecond timestamp, then random bits. Ids generated
+    later sort later, so inserts append to the right edge of the lead_id /
+    job_id B-trees instead of landing on random pages (as uuid4 did).
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76   # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62   # RFC 4122 variant
+    return str(uuid.UUID(int=value))
+
+
+def url_hash(url: Optional[str]) -> Optional[bytes]:
+    """SHA-256 of a website URL: the compact unique key leads dedupe on."""
+    return hashlib.sha256(url.encode()).digest() if url else None
+
+
+class UUIDString(TypeDecorator):
+    """
+    UUID ids (v7, see gen_uuid) as str in Python: native 16-byte uuid on
+    PostgreSQL, String(36) elsewhere. Malformed ids bind as NULL on
+    PostgreSQL, so looking up a bad id from a URL misses instead of raising
+    a cast error.
+    """
+    impl = String(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(PGUUID(as_uuid=False))
+        return dialect.type_descriptor(String(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name != "postgresql":
+            return value
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return None
+
+
+# Binary, indexable JSONB on PostgreSQL; plain JSON elsewhere (SQLite dev)
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+def _gin_index(table: str, column: str) -> Index:
+    """PostgreSQL-only GIN index for @> containment lookups on a JSONB column."""
+    return Index(
+        f"idx_{table}_{column}_gin", column,
+        postgresql_using="gin", postgresql_ops={column: "jsonb_path_ops"},
+    ).ddl_if(dialect="postgresql")
+
+
+class utcnow(FunctionElement):
+    """
+    Current UTC time as a naive timestamp, evaluated by the database. As the
+    column default, INSERTs/UPDATEs render it inline instead of calling
+    datetime.utcnow() and binding the result for every row; it is also the
+    server default, for rows written outside the ORM. Keeping both covers
+    SQLite tables created before the server default (no ALTER ... DEFAULT).
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # Millisecond precision, in the format SQLAlchemy's SQLite DateTime parses
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+class minute_text(FunctionElement):
+    """
+    A timestamp formatted as 'YYYY-MM-DD HH:MM' by the database, the same
+    text as str(value)[:16], so list views skip datetime parsing and formatting.
+    """
+    type = String()
+    inherit_cache = True
+
+
+@compiles(minute_text)
+def _minute_text_default(element, compiler, **kw):
+    return f"SUBSTR(CAST({compiler.process(element.clauses, **kw)} AS VARCHAR(32)), 1, 16)"
+
+
+@compiles(minute_text, "postgresql")
+def _minute_text_postgresql(element, compiler, **kw):
+    return f"TO_CHAR({compiler.process(element.clauses, **kw)}, 'YYYY-MM-DD HH24:MI')"
+
+
+@compiles(minute_text, "sqlite")
+def _minute_text_sqlite(element, compiler, **kw):
+    # DateTime columns are stored as ISO text already
+    return f"SUBSTR({compiler.process(element.clauses, **kw)}, 1, 16)"
 
 
 # ── Enums ─────────────────────────────────────────────────────────
@@ -91,6 +224,21 @@ class EmailJobStatus(str, Enum):
     FAILED = "failed"
 
 
+def _value_enum(enum_cls: type[Enum], name: str) -> SAEnum:
+    """
+    Native ENUM type on PostgreSQL (4 bytes per row, checked by the database)
+    over the enum's values; VARCHAR elsewhere. Reads and writes stay plain
+    strings, as with the String columns these replace.
+    """
+    return SAEnum(*(member.value for member in enum_cls), name=name)
+
+
+LEAD_STATUS_TYPE = _value_enum(LeadStatus, "lead_status")
+JOB_TYPE_TYPE = _value_enum(JobType, "job_type")
+JOB_STATUS_TYPE = _value_enum(JobStatus, "job_status")
+EMAIL_JOB_STATUS_TYPE = _value_enum(EmailJobStatus, "email_job_status")
+
+
 class ReplyClassification(str, Enum):
     INTERESTED = "interested"
     OBJECTION = "objection"
@@ -121,13 +269,14 @@ class Lead(Base):
     __tablename__ = "leads"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    lead_id = Column(String(36), default=gen_uuid, unique=True, nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    lead_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False, index=True)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     # Input data
     company_name = Column(String(300), nullable=False)
-    website_url = Column(String(500), unique=True)
+    website_url = Column(String(500))
+    website_url_hash = Column(LargeBinary(32))      # url_hash(website_url), unique
     contact_email = Column(String(300), nullable=False)
     purchasing_email = Column(String(300))  # Enriched email for purchasing dept
     store_count = Column(String(50))  # From import: "15+", "50", etc
@@ -139,7 +288,7 @@ class Lead(Base):
     notes = Column(Text)
 
     # Status
-    status = Column(String(50), default=LeadStatus.NEW.value, index=True)
+    status = Column(LEAD_STATUS_TYPE, default=LeadStatus.NEW.value)  # Indexed via ix_leads_status_created
     disqualify_reason = Column(String(200))
 
     # Meeting tracking
@@ -154,22 +303,44 @@ class Lead(Base):
     email_jobs = relationship("EmailJob", back_populates="lead", cascade="all, delete-orphan")
     replies = relationship("Reply", back_populates="lead", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Dashboard listing (filter by status, newest first) and the stats GROUP BY
+        Index("ix_leads_status_created", "status", "created_at"),
+        # Unfiltered newest-first listing and its (created_at, lead_id) page cursor
+        Index("ix_leads_created_lead_id", "created_at", "lead_id"),
+        # Dedup key: 32-byte hashes index far denser than 500-char URLs
+        Index("uq_leads_website_url_hash", "website_url_hash", unique=True),
+        # Provider webhooks resolve replies by sender address. Not unique:
+        # one buyer can front several stores
+        Index("ix_leads_contact_email", "contact_email"),
+    )
+
+    @validates("channel")
+    def _lower_channel(self, key, value):
+        # Stored lowercase so rule matching compares without re-lowering
+        return value.lower() if value else value
+
+    @validates("website_url")
+    def _hash_website_url(self, key, value):
+        self.website_url_hash = url_hash(value)
+        return value
+
 
 class LeadSignal(Base):
     """Structured signals extracted from scraping + AI classification."""
     __tablename__ = "lead_signals"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    lead_id = Column(String(36), ForeignKey("leads.lead_id"), unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    lead_id = Column(UUIDString, ForeignKey("leads.lead_id"), unique=True, nullable=False)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
     # Scraper raw signals
     detected_platform = Column(String(50))          # shopify, bigcommerce, woocommerce, custom
-    site_excerpt = Column(Text)                      # First 2k chars visible text
-    categories = Column(JSON, default=list)          # ["Outdoor", "Camping"]
-    sample_products = Column(JSON, default=list)     # [{title, price, vendor}]
-    brand_mentions_raw = Column(JSON, default=list)  # Raw brand tokens from scraper
+    site_excerpt = deferred(Column(Text))            # First 2k chars visible text (loaded on access)
+    categories = Column(JSONType, default=list)      # ["Outdoor", "Camping"]
+    sample_products = Column(JSONType, default=list)  # [{title, price, vendor}]
+    brand_mentions_raw = Column(JSONType, default=list)  # Raw brand tokens from scraper
     sku_count_estimate = Column(Integer, default=0)
     price_range_min = Column(Float)
     price_range_max = Column(Float)
@@ -178,7 +349,7 @@ class LeadSignal(Base):
     private_label_ratio = Column(Float, default=0.0)
 
     # AI-normalized signals
-    brand_list = Column(JSON, default=list)          # Cleaned brand list from AI
+    brand_list = Column(JSONType, default=list)      # Cleaned brand list from AI
     price_tier = Column(String(50))                  # luxury, mid, discount, mixed
     scale_score = Column(Integer, default=0)         # 0-100
     map_behavior_score = Column(Integer, default=0)  # 0-100
@@ -190,14 +361,19 @@ class LeadSignal(Base):
 
     lead = relationship("Lead", back_populates="signals")
 
+    __table_args__ = (
+        _gin_index("lead_signals", "brand_list"),
+        _gin_index("lead_signals", "categories"),
+    )
+
 
 class LeadQualification(Base):
     """Qualification decision for a lead."""
     __tablename__ = "lead_qualification"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    lead_id = Column(String(36), ForeignKey("leads.lead_id"), unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    lead_id = Column(UUIDString, ForeignKey("leads.lead_id"), unique=True, nullable=False)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
     qualifies = Column(Boolean, nullable=False)
     disqualify_reason = Column(String(200))
@@ -212,15 +388,15 @@ class LeadLeverage(Base):
     __tablename__ = "lead_leverage"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    lead_id = Column(String(36), ForeignKey("leads.lead_id"), unique=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    lead_id = Column(UUIDString, ForeignKey("leads.lead_id"), unique=True, nullable=False)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
     primary_angle = Column(String(50))
     secondary_angle = Column(String(50))
-    matched_rule_id = Column(String(36))             # Which rule matched
+    matched_rule_id = Column(UUIDString)             # Which rule matched
     match_reason = Column(Text)
-    brand_query = Column(JSON)                       # Filter used for brand selection
-    recommended_brands = Column(JSON, default=list)  # [brand_id, brand_id, brand_id] max 3
+    brand_query = Column(JSONType)                   # Filter used for brand selection
+    recommended_brands = Column(JSONType, default=list)  # [brand_id, brand_id, brand_id] max 3
 
     lead = relationship("Lead", back_populates="leverage")
 
@@ -230,21 +406,30 @@ class Brand(Base):
     __tablename__ = "brands"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    brand_id = Column(String(36), default=gen_uuid, unique=True, nullable=False)
+    brand_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False)
     brand_name = Column(String(300), nullable=False, unique=True)
-    category = Column(JSON, default=list)            # ["outdoor", "apparel"]
+    category = Column(JSONType, default=list)        # ["outdoor", "apparel"]
     pct_off_retail = Column(Float)                   # e.g., 65.0
     mov = Column(Float)                              # Minimum order value
     lead_time_min = Column(Integer)                  # Days
     lead_time_max = Column(Integer)                  # Days
     origin = Column(String(100))
-    channel_fit = Column(JSON, default=list)         # ["retail", "amazon", "multi-channel"]
+    channel_fit = Column(JSONType, default=list)     # ["retail", "amazon", "multi-channel"]
     replenishable = Column(Boolean, default=False)
     priority = Column(Boolean, default=False)        # Computed: pct_off_retail >= 45
     catalog_url = Column(String(500))                # Link to curated sheet
     notes = Column(Text)
     active = Column(Boolean, default=True)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, server_default=utcnow())  # Set on insert only; nothing reads it
+
+    __table_args__ = (
+        _gin_index("brands", "category"),
+        _gin_index("brands", "channel_fit"),
+    )
+
+    @validates("category", "channel_fit")
+    def _lower_tags(self, key, value):
+        return [v.lower() for v in value] if value else value
 
 
 class EmailJob(Base):
@@ -252,19 +437,19 @@ class EmailJob(Base):
     __tablename__ = "email_jobs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    job_id = Column(String(36), default=gen_uuid, unique=True, nullable=False, index=True)
-    lead_id = Column(String(36), ForeignKey("leads.lead_id"), nullable=False, index=True)
+    job_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False, index=True)
+    lead_id = Column(UUIDString, ForeignKey("leads.lead_id"), nullable=False, index=True)
     sequence_id = Column(String(36), index=True)     # Groups all 5 touches
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
     # Email content
     touch_number = Column(Integer)                   # 1-5 for sequence, null for replies
     email_type = Column(String(50), default="sequence")  # sequence, reply, calendar
     subject = Column(String(500))
-    body = Column(Text)
+    body = deferred(Column(Text))                    # Loaded on access; status scans skip it
 
     # Status
-    status = Column(String(50), default=EmailJobStatus.QUEUED.value, index=True)
+    status = Column(EMAIL_JOB_STATUS_TYPE, default=EmailJobStatus.QUEUED.value, index=True)
     scheduled_at = Column(DateTime)
     sent_at = Column(DateTime)
     error = Column(Text)
@@ -276,7 +461,7 @@ class EmailJob(Base):
     provider_message_id = Column(String(200))
 
     # Reply linkage
-    reply_id = Column(String(36))                    # If this is a response to a reply
+    reply_id = Column(UUIDString)                    # If this is a response to a reply
 
     lead = relationship("Lead", back_populates="email_jobs")
 
@@ -286,13 +471,13 @@ class Reply(Base):
     __tablename__ = "replies"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    reply_id = Column(String(36), default=gen_uuid, unique=True, nullable=False, index=True)
-    lead_id = Column(String(36), ForeignKey("leads.lead_id"), nullable=False, index=True)
-    email_job_id = Column(String(36), index=True)    # Which email they replied to
-    created_at = Column(DateTime, default=datetime.utcnow)
+    reply_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False, index=True)
+    lead_id = Column(UUIDString, ForeignKey("leads.lead_id"), nullable=False, index=True)
+    email_job_id = Column(UUIDString, index=True)    # Which email they replied to
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
     # Raw content
-    raw_text = Column(Text)
+    raw_text = deferred(Column(Text))                # Loaded on access
     provider_message_id = Column(String(200))
 
     # Classification (AI strict JSON)
@@ -317,29 +502,49 @@ class SuppressionList(Base):
     __tablename__ = "suppression_list"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    email = Column(String(300), index=True)
-    domain = Column(String(300), index=True)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    email = Column(String(300))
+    domain = Column(String(300))
     reason = Column(String(200))                     # unsubscribe, bounce, spam, manual
-    source_lead_id = Column(String(36))
+    source_lead_id = Column(UUIDString)
 
     __table_args__ = (
         UniqueConstraint("email", "domain", name="uq_suppression_email_domain"),
+        # One row per suppressed address, so suppress() can insert with
+        # ON CONFLICT DO NOTHING instead of check-then-insert
+        Index(
+            "uq_suppression_email", "email", unique=True,
+            postgresql_where=text("email IS NOT NULL"),
+            sqlite_where=text("email IS NOT NULL"),
+        ),
+        # Domain-wide entries are the only rows looked up by domain
+        Index(
+            "ix_suppression_domain_wide", "domain",
+            postgresql_where=text("email IS NULL"),
+            sqlite_where=text("email IS NULL"),
+        ),
     )
 
 
 class AuditLog(Base):
-    """Forensic traceability for every state change."""
+    """
+    Forensic traceability for every state change. On PostgreSQL the table is
+    range-partitioned by month on created_at (see ensure_audit_partitions),
+    which has to be part of the primary key there.
+    """
     __tablename__ = "audit_log"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow(), index=True,
+                        primary_key=_is_postgres, nullable=not _is_postgres)
     request_id = Column(String(36), index=True)      # Trace across services
     event = Column(String(100), nullable=False, index=True)
-    lead_id = Column(String(36), index=True)
-    job_id = Column(String(36))
+    lead_id = Column(UUIDString, index=True)
+    job_id = Column(UUIDString)
     actor = Column(String(100))                      # dashboard, worker, webhook, system
-    payload = Column(JSON)
+    payload = Column(JSONType)
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
 
 class Job(Base):
@@ -347,30 +552,41 @@ class Job(Base):
     __tablename__ = "jobs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    job_id = Column(String(36), default=gen_uuid, unique=True, nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    job_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False, index=True)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
-    job_type = Column(String(50), nullable=False)    # lead_research, send_email, etc.
-    lead_id = Column(String(36), index=True)
-    status = Column(String(50), default=JobStatus.QUEUED.value, index=True)
+    job_type = Column(JOB_TYPE_TYPE, nullable=False)  # lead_research, send_email, etc.
+    lead_id = Column(UUIDString, index=True)
+    status = Column(JOB_STATUS_TYPE, default=JobStatus.QUEUED.value, index=True)
     attempts = Column(Integer, default=0)
     locked_by = Column(String(100))
     started_at = Column(DateTime)
     completed_at = Column(DateTime)
     error = Column(Text)
 
+    # Worker dispatch only ever looks at pending jobs; a partial index stays
+    # tiny however many finished jobs pile up, and covers the job_id fetch
+    __table_args__ = (
+        Index(
+            "ix_jobs_queue", "job_type", "created_at",
+            postgresql_include=["job_id"],
+            postgresql_where=text("status IN ('queued', 'retrying')"),
+            sqlite_where=text("status IN ('queued', 'retrying')"),
+        ),
+    )
+
 
 class ScrapeJob(Base):
     """Scraping sub-job with artifact tracking."""
     __tablename__ = "scrape_jobs"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    scrape_id = Column(String(36), default=gen_uuid, unique=True, nullable=False)
-    lead_id = Column(String(36), index=True)
-    job_id = Column(String(36), index=True)          # Parent job
-    created_at = Column(DateTime, default=datetime.utcnow)
+    scrape_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False)
+    lead_id = Column(UUIDString, index=True)
+    job_id = Column(UUIDString, index=True)          # Parent job
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
 
-    status = Column(String(50), default="queued")
+    status = Column(JOB_STATUS_TYPE, default=JobStatus.QUEUED.value)
     pages_fetched = Column(Integer, default=0)
     budget_ms = Column(Integer, default=25000)
     max_pages = Column(Integer, default=6)
@@ -382,7 +598,7 @@ class RulesLeverageMatrix(Base):
     __tablename__ = "rules_leverage_matrix"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    rule_id = Column(String(36), default=gen_uuid, unique=True, nullable=False)
+    rule_id = Column(UUIDString, default=gen_uuid, unique=True, nullable=False)
     priority = Column(Integer, nullable=False)        # Lower = higher priority
     is_active = Column(Boolean, default=True)
 
@@ -398,9 +614,17 @@ class RulesLeverageMatrix(Base):
     # Output
     primary_angle = Column(String(50), nullable=False)
     secondary_angle = Column(String(50))
-    brand_query = Column(JSON)                        # Filter template for brand matching
+    brand_query = Column(JSONType)                    # Filter template for brand matching
     description = Column(Text)
 
+    __table_args__ = (
+        _gin_index("rules_leverage_matrix", "brand_query"),
+    )
+
+    @validates("channel_match")
+    def _lower_channel_match(self, key, value):
+        return value.lower() if value else value
+
 
 class ObjectionsKB(Base):
     """Approved objection response templates. AI cannot invent rebuttals."""
@@ -408,13 +632,17 @@ class ObjectionsKB(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     objection_type = Column(String(100), unique=True, nullable=False)
-    pattern_keywords = Column(JSON, default=list)     # Keywords to match
+    pattern_keywords = Column(JSONType, default=list)  # Keywords to match
     template_subject = Column(String(500))
     template_body = Column(Text, nullable=False)
     is_active = Column(Boolean, default=True)
     version = Column(String(20), default="v1")
     notes = Column(Text)
 
+    __table_args__ = (
+        _gin_index("objections_kb", "pattern_keywords"),
+    )
+
 
 class Config(Base):
     """Runtime config stored in DB for consistency."""
@@ -423,12 +651,47 @@ class Config(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     key = Column(String(200), unique=True, nullable=False)
     value = Column(Text)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, server_default=utcnow())  # Set on insert only; nothing reads it
+
+
+class StatsCounter(Base):
+    """
+    Row counts behind the dashboard stats, kept current by database triggers
+    (see _install_stats_counters): "leads:<status>", "email_jobs:<status>"
+    and "replies". On PostgreSQL each counter is spread over
+    STATS_COUNTER_SHARDS rows (picked by backend pid) so concurrent writers
+    don't queue on one row lock; a count is the SUM over its shards.
+    """
+    __tablename__ = "stats_counters"
+
+    key = Column(String(100), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0, server_default="0")
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+class LLMCache(Base):
+    """
+    Analyzer completions that parsed as JSON, keyed by a digest of
+    (model, prompt). Survives restarts and is shared by every process, so
+    re-running a lead or a boilerplate reply skips the model. Opt-in
+    (LLM_CACHE_PERSIST); rows expire after LLM_CACHE_TTL_HOURS.
+    """
+    __tablename__ = "llm_cache"
+
+    key = Column(LargeBinary(16), primary_key=True)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow(), index=True)  # TTL reads, pruning
+    completion = Column(Text, nullable=False)
 
 
 # ── Pydantic Schemas ──────────────────────────────────────────────
 
+# Shared by every schema: instances are never mutated after validation, and
+# stray keys from CSV rows / LLM output are dropped rather than stored
+SCHEMA_CONFIG = ConfigDict(frozen=True, extra="ignore", str_strip_whitespace=True)
+
 class LeadCreateRequest(BaseModel):
+    model_config = SCHEMA_CONFIG
+
     company_name: str
     website_url: Optional[str] = None
     contact_email: str
@@ -440,9 +703,39 @@ class LeadCreateRequest(BaseModel):
     location: Optional[str] = None
     notes: Optional[str] = None
 
+    @field_validator("channel", "contact_email")
+    @classmethod
+    def _lowercase(cls, v: Optional[str]) -> Optional[str]:
+        # Normalized once here (whitespace is stripped by SCHEMA_CONFIG);
+        # intake and suppression checks use the value as-is. Bulk imports
+        # skip ORM validators, so channel is normalized at the schema too.
+        return v.lower() if v else v
+
+
+# Reused validator for whole import batches (one call instead of one per row)
+LEAD_CREATE_BATCH = TypeAdapter(list[LeadCreateRequest])
+
+
+def validate_lead_rows(rows: list[dict]) -> tuple[list[LeadCreateRequest], int]:
+    """
+    Validate import rows in one LEAD_CREATE_BATCH pass. On failure the rows
+    the errors point at are logged and dropped and the rest validated again.
+    Returns (requests, number of rejected rows).
+    """
+    try:
+        return LEAD_CREATE_BATCH.validate_python(rows), 0
+    except ValidationError as e:
+        bad = set()
+        for err in e.errors():
+            bad.add(err["loc"][0])
+            logger.error(f"Row import error: row {err['loc'][0] + 1}: {err['msg']}")
+        return LEAD_CREATE_BATCH.validate_python([row for i, row in enumerate(rows) if i not in bad]), len(bad)
+
 
 class LeadClassifierOutput(BaseModel):
     """Strict JSON schema for AI lead classifier output."""
+    model_config = SCHEMA_CONFIG
+
     brand_list: list[str] = Field(default_factory=list)
     private_label_ratio: float = 0.0
     price_tier: str = "mixed"
@@ -455,6 +748,8 @@ class LeadClassifierOutput(BaseModel):
 
 class ReplyClassifierOutput(BaseModel):
     """Strict JSON schema for AI reply classifier output."""
+    model_config = SCHEMA_CONFIG
+
     classification: str
     objection_type: Optional[str] = None
     action: str
@@ -462,6 +757,8 @@ class ReplyClassifierOutput(BaseModel):
 
 
 class PipelineStats(BaseModel):
+    model_config = SCHEMA_CONFIG
+
     total_leads: int = 0
     new: int = 0
     researched: int = 0
@@ -478,11 +775,651 @@ class PipelineStats(BaseModel):
     conversion_rate: float = 0.0
 
 
+# ── API response schemas ──────────────────────────────────────────
+# Built straight from query rows (from_attributes) and serialized by
+# pydantic-core. Values pass through untouched: no whitespace stripping.
+RESPONSE_SCHEMA_CONFIG = ConfigDict(frozen=True, from_attributes=True)
+
+# Timestamps go out as str(datetime), the format these endpoints always used
+TimestampText = Annotated[datetime, PlainSerializer(lambda v: str(v), return_type=str)]
+
+
+class LeadSummary(BaseModel):
+    model_config = RESPONSE_SCHEMA_CONFIG
+
+    lead_id: str
+    company_name: str
+    email: str
+    purchasing_email: Optional[str] = None
+    website: Optional[str] = None
+    store_count: Optional[str] = None
+    hq: Optional[str] = None
+    focus: Optional[str] = None
+    status: Optional[str] = None
+    channel: Optional[str] = None
+    niche: Optional[str] = None
+    created_at: TimestampText
+
+
+class PendingReply(BaseModel):
+    model_config = RESPONSE_SCHEMA_CONFIG
+
+    reply_id: str
+    lead_id: str
+    classification: Optional[str] = None
+    objection_type: Optional[str] = None
+    raw_text: Optional[str] = None          # First 200 characters
+    draft_response: Optional[str] = None
+
+
+class AuditLogEntry(BaseModel):
+    model_config = RESPONSE_SCHEMA_CONFIG
+
+    id: int
+    event: str
+    lead_id: Optional[str] = None
+    actor: Optional[str] = None
+    request_id: Optional[str] = None
+    payload: Any = None
+    created_at: TimestampText
+
+
 # ── Init Database ─────────────────────────────────────────────────
 
 def init_db():
     """Create all tables."""
     Base.metadata.create_all(bind=engine)
+    _applied_markers.cache_clear()
+    _dedupe_suppression_emails()
+    _migrate_website_url_hash()
+    _ensure_indexes()
+    _drop_redundant_indexes()
+    _backfill_lowercase_channels()
+    _migrate_jsonb()
+    _migrate_uuid()
+    _migrate_server_defaults()
+    _partition_audit_log()
+    ensure_audit_partitions()
+    _migrate_native_enums()
+    _install_stats_counters()
+    _tune_toast()
+
+
+def _ensure_indexes():
+    """create_all skips tables that already exist, so add indexes declared since."""
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# Indexes made redundant by a composite that leads with the same column
+_REDUNDANT_INDEXES = (
+    "ix_leads_status",              # ix_leads_status_created
+    "ix_suppression_list_email",    # uq_suppression_email_domain / uq_suppression_email
+    "ix_suppression_list_domain",   # ix_suppression_domain_wide
+)
+
+
+def _drop_redundant_indexes():
+    """One-shot per index: drop indexes older databases still carry that another index now covers."""
+    pending = [name for name in _REDUNDANT_INDEXES if f"migration:drop_index:{name}" not in _applied_markers()]
+    if not pending:
+        return
+    db = SessionLocal()
+    try:
+        for name in pending:
+            db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            db.add(Config(key=f"migration:drop_index:{name}", value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+@lru_cache(maxsize=1)
+def _applied_markers() -> frozenset[str]:
+    """
+    Every one-shot migration marker, read in one query per init_db() (which
+    clears this) instead of one lookup per migration step.
+    """
+    db = SessionLocal()
+    try:
+        return frozenset(key for (key,) in db.query(Config.key).filter(Config.key.like("migration:%")))
+    finally:
+        db.close()
+
+
+def _dedupe_suppression_emails():
+    """
+    One-shot: drop duplicate suppression rows for the same email (keeping the
+    oldest) left by racing inserts, so uq_suppression_email can be built.
+    """
+    marker = "migration:suppression_unique_email"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        db.execute(text(
+            "DELETE FROM suppression_list WHERE email IS NOT NULL AND id NOT IN "
+            "(SELECT MIN(id) FROM suppression_list WHERE email IS NOT NULL GROUP BY email)"
+        ))
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _migrate_website_url_hash():
+    """
+    One-shot: add and backfill leads.website_url_hash on databases created
+    before it existed, and drop the old unique constraint on website_url
+    (SQLite can't drop constraints in place, so it keeps both there).
+    """
+    marker = "migration:website_url_hash"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        inspector = inspect(conn)
+        if "website_url_hash" not in {col["name"] for col in inspector.get_columns("leads")}:
+            column_type = LargeBinary(32).compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE leads ADD COLUMN website_url_hash {column_type}"))
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(
+                "UPDATE leads SET website_url_hash = sha256(convert_to(website_url, 'UTF8')) "
+                "WHERE website_url <> '' AND website_url_hash IS NULL"
+            ))
+            for constraint in inspector.get_unique_constraints("leads"):
+                if constraint["column_names"] == ["website_url"]:
+                    conn.execute(text(f'ALTER TABLE leads DROP CONSTRAINT "{constraint["name"]}"'))
+        else:
+            rows = db.query(Lead.id, Lead.website_url).filter(
+                Lead.website_url != "", Lead.website_url_hash.is_(None),
+            ).all()
+            if rows:
+                db.execute(Lead.__table__.update().where(Lead.__table__.c.id == bindparam("row_id")), [
+                    {"row_id": row.id, "website_url_hash": url_hash(row.website_url)} for row in rows
+                ])
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _backfill_lowercase_channels():
+    """
+    One-shot: lowercase channel values written before they were normalized
+    on write. Guarded by a config marker so it only runs once per database.
+    """
+    marker = "migration:lowercase_channels"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        for column in (Lead.channel, RulesLeverageMatrix.channel_match):
+            db.query(column.class_).filter(column != func.lower(column)).update(
+                {column: func.lower(column)}, synchronize_session=False,
+            )
+        # JSON tag lists can't be lowered portably in SQL; the catalog is small
+        for brand in db.query(Brand):
+            brand.category, brand.channel_fit = brand.category, brand.channel_fit
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _migrate_jsonb():
+    """
+    PostgreSQL only: convert json columns from databases created before the
+    JSONB switch (create_all never alters existing tables) and build their
+    GIN indexes. Guarded by a config marker so it only runs once.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    marker = "migration:jsonb"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            json_columns = {
+                col["name"] for col in inspector.get_columns(table.name)
+                if str(col["type"]).upper() == "JSON"
+            }
+            for column in json_columns:
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ALTER COLUMN "{column}" TYPE jsonb USING "{column}"::jsonb'
+                ))
+            for index in table.indexes:
+                if index.name.endswith("_gin"):
+                    index.create(conn, checkfirst=True)
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+_UUID_PATTERN = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+
+
+def _migrate_uuid():
+    """
+    PostgreSQL only: convert varchar id columns from databases created before
+    UUIDString to native uuid. Foreign keys onto leads.lead_id are dropped
+    and recreated around the ALTERs since PostgreSQL can't re-type either
+    side alone. Any value that isn't a uuid stops the migration before the
+    first DDL, naming its column, rather than being nulled (which would
+    orphan child rows). Runs once (config marker).
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    marker = "migration:uuid"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        inspector = inspect(conn)
+        pending = {}
+        for table in Base.metadata.sorted_tables:
+            db_types = {col["name"]: str(col["type"]).upper() for col in inspector.get_columns(table.name)}
+            columns = [
+                col.name for col in table.columns
+                if isinstance(col.type, UUIDString) and db_types.get(col.name) != "UUID"
+            ]
+            if columns:
+                pending[table.name] = columns
+        bad = [
+            f"{table}.{column}"
+            for table, columns in pending.items() for column in columns
+            if conn.execute(text(
+                f'SELECT 1 FROM {table} WHERE "{column}" IS NOT NULL '
+                f'AND "{column}" !~* \'{_UUID_PATTERN}\' LIMIT 1'
+            )).first()
+        ]
+        if bad:
+            raise RuntimeError(
+                f"UUID migration aborted: non-uuid values in {', '.join(bad)}. "
+                f"Fix or remove those rows, then restart."
+            )
+        if pending:
+            fks = [
+                (table, fk) for table in Base.metadata.tables
+                for fk in inspector.get_foreign_keys(table)
+            ]
+            for table, fk in fks:
+                conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{fk["name"]}"'))
+            for table, columns in pending.items():
+                for column in columns:
+                    conn.execute(text(
+                        f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE uuid USING "{column}"::uuid'
+                    ))
+            for table, fk in fks:
+                conn.execute(text(
+                    f'ALTER TABLE {table} ADD CONSTRAINT "{fk["name"]}" '
+                    f'FOREIGN KEY ({", ".join(fk["constrained_columns"])}) '
+                    f'REFERENCES {fk["referred_table"]} ({", ".join(fk["referred_columns"])})'
+                ))
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _migrate_server_defaults():
+    """
+    PostgreSQL only: add the utcnow() server defaults to timestamp columns of
+    tables created before they were declared. Runs once (config marker).
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    marker = "migration:server_defaults"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        for table in Base.metadata.sorted_tables:
+            for col in table.columns:
+                if col.server_default is not None:
+                    default = col.server_default.arg.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN "{col.name}" SET DEFAULT {default}'))
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _month_start(day: date, offset: int = 0) -> date:
+    years, month = divmod(day.month - 1 + offset, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def _create_audit_partitions(conn, first: date, last: date):
+    """Monthly audit_log partitions from first's month through last's, plus a default."""
+    default_exists = conn.execute(text("SELECT to_regclass('audit_log_default')")).scalar() is not None
+    month = _month_start(first)
+    while month <= last:
+        upper = _month_start(month, 1)
+        name = f"audit_log_y{month:%Y}m{month:%m}"
+        create = text(f"CREATE TABLE {name} PARTITION OF audit_log FOR VALUES FROM ('{month}') TO ('{upper}')")
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            in_range = f"created_at >= '{month}' AND created_at < '{upper}'"
+            stranded = default_exists and conn.execute(
+                text(f"SELECT 1 FROM audit_log_default WHERE {in_range} LIMIT 1")
+            ).first()
+            if stranded:
+                # Rows written while this month had no partition sit in the
+                # default, and PostgreSQL won't create the month over them:
+                # detach the default, create the month, move them across
+                conn.execute(text("ALTER TABLE audit_log DETACH PARTITION audit_log_default"))
+                conn.execute(create)
+                conn.execute(text(f"INSERT INTO audit_log SELECT * FROM audit_log_default WHERE {in_range}"))
+                conn.execute(text(f"DELETE FROM audit_log_default WHERE {in_range}"))
+                conn.execute(text("ALTER TABLE audit_log ATTACH PARTITION audit_log_default DEFAULT"))
+                logger.info(f"Created audit partition {name}, moving its rows out of audit_log_default")
+            else:
+                conn.execute(create)
+        month = upper
+    # Catches rows outside every monthly range rather than failing the insert
+    conn.execute(text("CREATE TABLE IF NOT EXISTS audit_log_default PARTITION OF audit_log DEFAULT"))
+
+
+def ensure_audit_partitions():
+    """
+    PostgreSQL only: make sure audit_log has partitions for this month and the
+    next AUDIT_PARTITION_MONTHS_AHEAD. Called at startup and by the worker
+    when the month turns over; old months can be archived with a DROP TABLE.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    today = datetime.utcnow().date()
+    try:
+        with engine.begin() as conn:
+            partitioned = conn.execute(text(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'audit_log'::regclass"
+            )).first()
+            if partitioned is not None:
+                _create_audit_partitions(conn, today, _month_start(today, AUDIT_PARTITION_MONTHS_AHEAD))
+    except Exception as e:
+        # Audit rows still land in audit_log_default; never block startup on this
+        logger.error(f"Audit partition maintenance failed: {e}")
+
+
+def detach_cold_audit_partitions():
+    """
+    PostgreSQL only: detach monthly audit_log partitions older than
+    AUDIT_HOT_MONTHS (0 disables). Detached months stay behind as standalone
+    audit_log_yYYYYmMM tables, ready to export to analytics/columnar storage
+    or drop, while audit queries and indexes only cover the hot months.
+    """
+    if engine.dialect.name != "postgresql" or AUDIT_HOT_MONTHS <= 0:
+        return
+    cutoff = _month_start(datetime.utcnow().date(), -AUDIT_HOT_MONTHS)
+    with engine.begin() as conn:
+        partitions = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'audit_log'::regclass"
+        )).scalars().all()
+        for name in partitions:
+            match = re.fullmatch(r"audit_log_y(\d{4})m(\d{2})", name)
+            if match and date(int(match[1]), int(match[2]), 1) < cutoff:
+                conn.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {name}"))
+                logger.info(f"Detached cold audit partition {name}")
+
+
+def _partition_audit_log():
+    """
+    PostgreSQL only: rebuild an audit_log created before partitioning as a
+    partitioned table and copy its rows across. The old table's sequence and
+    indexes are renamed/dropped first so the new ones can take their names.
+    Runs once (config marker); may take a while on a large audit log.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    marker = "migration:partition_audit_log"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        partitioned = conn.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'audit_log'::regclass"
+        )).first()
+        if partitioned is None:
+            old_indexes = [index["name"] for index in inspect(conn).get_indexes("audit_log")]
+            conn.execute(text("ALTER TABLE audit_log RENAME TO audit_log_unpartitioned"))
+            conn.execute(text("ALTER SEQUENCE audit_log_id_seq RENAME TO audit_log_unpartitioned_id_seq"))
+            conn.execute(text("ALTER INDEX audit_log_pkey RENAME TO audit_log_unpartitioned_pkey"))
+            for name in old_indexes:
+                conn.execute(text(f'DROP INDEX "{name}"'))
+            AuditLog.__table__.create(conn)
+
+            today = datetime.utcnow().date()
+            oldest = conn.execute(text("SELECT MIN(created_at) FROM audit_log_unpartitioned")).scalar()
+            _create_audit_partitions(
+                conn, oldest.date() if oldest else today,
+                _month_start(today, AUDIT_PARTITION_MONTHS_AHEAD),
+            )
+            columns = ", ".join(col.name for col in AuditLog.__table__.columns if col.name != "created_at")
+            conn.execute(text(
+                f"INSERT INTO audit_log ({columns}, created_at) "
+                f"SELECT {columns}, COALESCE(created_at, {utcnow().compile(dialect=engine.dialect)}) "
+                f"FROM audit_log_unpartitioned"
+            ))
+            conn.execute(text(
+                "SELECT setval('audit_log_id_seq', COALESCE((SELECT MAX(id) FROM audit_log), 0) + 1, false)"
+            ))
+            conn.execute(text("DROP TABLE audit_log_unpartitioned"))
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+_ENUM_COLUMNS = (
+    ("leads", "status", LEAD_STATUS_TYPE),
+    ("email_jobs", "status", EMAIL_JOB_STATUS_TYPE),
+    ("jobs", "job_type", JOB_TYPE_TYPE),
+    ("jobs", "status", JOB_STATUS_TYPE),
+    ("scrape_jobs", "status", JOB_STATUS_TYPE),
+)
+
+
+def _migrate_native_enums():
+    """
+    PostgreSQL only: convert varchar status/type columns from databases
+    created before they were native ENUMs. A column holding values outside
+    its enum is left as varchar (and logged) rather than failing startup.
+    Runs once (config marker).
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    marker = "migration:native_enums"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        inspector = inspect(conn)
+        for table, column, enum_type in _ENUM_COLUMNS:
+            db_type = next(col["type"] for col in inspector.get_columns(table) if col["name"] == column)
+            if isinstance(db_type, SAEnum):
+                continue
+            stray = conn.execute(
+                text(f'SELECT DISTINCT "{column}" FROM {table} WHERE "{column}" IS NOT NULL')
+            ).scalars().all()
+            stray = sorted(set(stray) - set(enum_type.enums))
+            if stray:
+                logger.warning(f"Keeping {table}.{column} as varchar: values outside {enum_type.name}: {stray}")
+                continue
+            enum_type.create(conn, checkfirst=True)
+            conn.execute(text(
+                f'ALTER TABLE {table} ALTER COLUMN "{column}" TYPE {enum_type.name} '
+                f'USING "{column}"::{enum_type.name}'
+            ))
+        # Counter trigger functions installed before the switch compared the
+        # status against '' without a cast, which an enum rejects
+        if _applied_markers() & {"migration:stats_counters", _STATS_COUNTERS_MARKER}:
+            _create_pg_counter_functions(conn)
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+# Tables counted into stats_counters and the counter key for a row ({row}
+# is NEW/OLD in row-level triggers, empty in set-based SQL)
+_COUNTED_TABLES = {
+    "leads": "'leads:' || COALESCE(CAST({row}status AS TEXT), '')",
+    "email_jobs": "'email_jobs:' || COALESCE(CAST({row}status AS TEXT), '')",
+    "replies": "'replies'",
+}
+
+# PostgreSQL: statement-level triggers over transition tables, so a bulk
+# INSERT/COPY adds one aggregated upsert rather than one per row. Updates
+# that leave the key unchanged net to zero and write nothing. Deltas land
+# in this backend's shard; a shard may go negative, the sum stays exact.
+_PG_COUNTER_FUNCTION = """
+CREATE OR REPLACE FUNCTION stats_counters_{table}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO stats_counters (key, shard, value)
+        SELECT k, pg_backend_pid() % {shards}, COUNT(*) FROM (SELECT {key} AS k FROM new_rows) d GROUP BY k
+        ON CONFLICT (key, shard) DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO stats_counters (key, shard, value)
+        SELECT k, pg_backend_pid() % {shards}, -COUNT(*) FROM (SELECT {key} AS k FROM old_rows) d GROUP BY k
+        ON CONFLICT (key, shard) DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+    ELSE
+        INSERT INTO stats_counters (key, shard, value)
+        SELECT k, pg_backend_pid() % {shards}, SUM(n) FROM (
+            SELECT {key} AS k, -1 AS n FROM old_rows
+            UNION ALL
+            SELECT {key} AS k, 1 AS n FROM new_rows
+        ) d GROUP BY k HAVING SUM(n) <> 0
+        ON CONFLICT (key, shard) DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+_PG_COUNTER_TRIGGERS = (
+    ("insert", "INSERT", "NEW TABLE AS new_rows"),
+    ("update", "UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+    ("delete", "DELETE", "OLD TABLE AS old_rows"),
+)
+
+# SQLite: row-level triggers (no transition tables). Writers are serialized
+# anyway, so everything stays in shard 0.
+_SQLITE_COUNTER_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS stats_{table}_insert AFTER INSERT ON {table} BEGIN
+        INSERT OR IGNORE INTO stats_counters (key, value) VALUES ({new_key}, 0);
+        UPDATE stats_counters SET value = value + 1 WHERE key = {new_key};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_{table}_update AFTER UPDATE ON {table}
+    WHEN {old_key} IS NOT {new_key} BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE key = {old_key};
+        INSERT OR IGNORE INTO stats_counters (key, value) VALUES ({new_key}, 0);
+        UPDATE stats_counters SET value = value + 1 WHERE key = {new_key};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_{table}_delete AFTER DELETE ON {table} BEGIN
+        UPDATE stats_counters SET value = value - 1 WHERE key = {old_key};
+    END""",
+)
+
+
+def _create_pg_counter_functions(conn):
+    for table, key in _COUNTED_TABLES.items():
+        conn.execute(text(_PG_COUNTER_FUNCTION.format(
+            table=table, key=key.format(row=""), shards=STATS_COUNTER_SHARDS,
+        )))
+
+
+def stats_counters_enabled() -> bool:
+    """Whether stats_counters is trigger-maintained on this database."""
+    return engine.dialect.name in ("postgresql", "sqlite")
+
+
+# Bumped when stats_counters changed shape (per-shard rows); databases
+# installed under the old marker are rebuilt once
+_STATS_COUNTERS_MARKER = "migration:stats_counters:sharded"
+
+
+def _install_stats_counters():
+    """
+    One-shot: install the triggers that maintain stats_counters and seed the
+    counters from the current tables. On PostgreSQL the counted tables are
+    locked against writes meanwhile, so nothing lands between seed and trigger.
+    A stats_counters table from before sharding is dropped and rebuilt; it
+    only holds derived counts.
+    """
+    if not stats_counters_enabled():
+        return
+    marker = _STATS_COUNTERS_MARKER
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"LOCK TABLE {', '.join(_COUNTED_TABLES)} IN SHARE ROW EXCLUSIVE MODE"))
+        if "shard" not in {col["name"] for col in inspect(conn).get_columns("stats_counters")}:
+            StatsCounter.__table__.drop(conn)
+            StatsCounter.__table__.create(conn)
+        if engine.dialect.name == "postgresql":
+            _create_pg_counter_functions(conn)
+            for table in _COUNTED_TABLES:
+                for name, op, referencing in _PG_COUNTER_TRIGGERS:
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS stats_{table}_{name} ON {table}"))
+                    conn.execute(text(
+                        f"CREATE TRIGGER stats_{table}_{name} AFTER {op} ON {table} "
+                        f"REFERENCING {referencing} FOR EACH STATEMENT "
+                        f"EXECUTE FUNCTION stats_counters_{table}()"
+                    ))
+        else:
+            for table, key in _COUNTED_TABLES.items():
+                for ddl in _SQLITE_COUNTER_TRIGGERS:
+                    conn.execute(text(ddl.format(
+                        table=table, new_key=key.format(row="NEW."), old_key=key.format(row="OLD."),
+                    )))
+        conn.execute(text("DELETE FROM stats_counters"))
+        for table, key in _COUNTED_TABLES.items():
+            conn.execute(text(
+                f"INSERT INTO stats_counters (key, value) "
+                f"SELECT k, COUNT(*) FROM (SELECT {key.format(row='')} AS k FROM {table}) d GROUP BY k"
+            ))
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
+
+
+# Tables whose rows carry multi-KB text (site excerpts, email bodies, reply
+# text). A low toast_tuple_target moves that text out of line sooner, so the
+# heap pages that status/index scans read stay dense.
+_TOAST_TABLES = ("lead_signals", "email_jobs", "replies")
+
+
+def _tune_toast():
+    """PostgreSQL only: apply toast_tuple_target to _TOAST_TABLES. Runs once (config marker)."""
+    if engine.dialect.name != "postgresql":
+        return
+    marker = "migration:toast_tuple_target"
+    if marker in _applied_markers():
+        return
+    db = SessionLocal()
+    try:
+        for table in _TOAST_TABLES:
+            db.execute(text(f"ALTER TABLE {table} SET (toast_tuple_target = 256)"))
+        db.add(Config(key=marker, value=datetime.utcnow().isoformat()))
+        db.commit()
+    finally:
+        db.close()
 
 
 def get_db():
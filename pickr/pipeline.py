@@ -3,32 +3,53 @@ Pickr AI - Pipeline Orchestrator (v2)
 Full 82-step workflow aligned with Haim's spec.
 Ties all modules together: intake → scrape → classify → leverage → brand → email → reply.
 """
+import io
+import os
+import socket
+import time
 import uuid
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import func, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
 from pickr.models import (
-    Lead, LeadSignal, LeadQualification, LeadLeverage, Brand,
+    Lead, LeadSignal, LeadQualification, LeadLeverage,
     EmailJob, Reply, Job, ScrapeJob, LeadStatus, JobStatus,
-    EmailJobStatus, LeadCreateRequest, SessionLocal, init_db,
+    EmailJobStatus, LeadCreateRequest, SessionLocal, StatsCounter, init_db, gen_uuid,
+    stats_counters_enabled, url_hash,
 )
 from pickr.enrichment.scraper import StorefrontScraper
 from pickr.enrichment.analyzer import classify_lead, classify_reply
-from pickr.enrichment.email_finder import find_email_for_lead
+from pickr.enrichment.email_finder import find_email_for_lead, find_emails_for_leads
 from pickr.engine.leverage import LeverageEngine, BrandMatcher
-from pickr.engine.email_generator import generate_email, generate_interest_response
+from pickr.engine.email_generator import generate_sequence, generate_interest_response
 from pickr.engine.objection_handler import ObjectionHandler
 from pickr.engine.linter import EmailLinter
-from pickr.audit import audit, gen_request_id
-from pickr.suppression import is_suppressed, suppress, check_remove_me
+from pickr.audit import audit, bulk_audit, gen_request_id
+from pickr.suppression import is_suppressed, filter_suppressed, suppress, check_remove_me
 from pickr.config import (
-    FOLLOWUP_TIMING, SCHEMA_VERSION, HUMAN_APPROVAL_THRESHOLD,
+    FOLLOWUP_TIMING, SCHEMA_VERSION, HUMAN_APPROVAL_THRESHOLD, IMPORT_BATCH_SIZE,
+    STATS_CACHE_TTL_SECONDS, PIPELINE_CONCURRENCY, JOB_CLAIM_BATCH_SIZE, JOB_NOTIFY_CHANNEL,
+    JOB_LEASE_SECONDS,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _copy_value(value) -> str:
+    """Encode one field for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bytes):
+        return "\\\\x" + value.hex()  # bytea hex input, backslash escaped for COPY
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
 class PickrPipeline:
     """Main orchestrator for the Pickr AI sales pipeline."""
 
@@ -38,6 +59,8 @@ class PickrPipeline:
         self.brand_matcher = BrandMatcher()
         self.objection_handler = ObjectionHandler()
         self.linter = EmailLinter()
+        self._stats_cache: Optional[tuple[float, dict]] = None
+        self._approval_phase_over = False  # Latches once HUMAN_APPROVAL_THRESHOLD drafts exist
 
     def initialize(self):
         """Initialize database tables."""
@@ -49,41 +72,175 @@ class PickrPipeline:
     def create_lead(self, db: Session, req: LeadCreateRequest, actor: str = "dashboard") -> dict:
         """Steps 2-12: Validate, suppress check, dedup, create lead, create job."""
         request_id = gen_request_id()
-        email = req.contact_email.lower().strip()
+        email = req.contact_email
 
         # Step 5: Suppression precheck
         if is_suppressed(db, email):
             return {"suppressed": True, "lead_id": None, "request_id": request_id}
 
-        # Step 6: Dedup check on website_url
-        if req.website_url:
-            existing = db.query(Lead).filter(Lead.website_url == req.website_url).first()
-            if existing:
-                return {"suppressed": False, "lead_id": existing.lead_id, "dedupe": True, "request_id": request_id}
-
-        # Step 7-8: Create lead
-        lead = Lead(
-            company_name=req.company_name, website_url=req.website_url,
+        # Step 6-8: Insert, deduplicating on website_url in the same statement
+        # where the dialect supports ON CONFLICT (no probe-then-insert race)
+        lead_id = gen_uuid()
+        values = dict(
+            lead_id=lead_id, company_name=req.company_name,
+            website_url=req.website_url, website_url_hash=url_hash(req.website_url),
             contact_email=email, channel=req.channel, niche=req.niche,
             location=req.location, notes=req.notes, status=LeadStatus.NEW.value,
             store_count=req.store_count, hq_location=req.hq_location, focus=req.focus,
         )
-        db.add(lead)
-        db.flush()
-
-        # Step 9: Audit
-        audit(db, "lead_created", lead_id=lead.lead_id, actor=actor,
+        dialect = db.get_bind().dialect
+        if dialect.name in ("postgresql", "sqlite"):
+            dialect_insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+            inserted = db.execute(
+                dialect_insert(Lead.__table__)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=["website_url_hash"])
+                .returning(Lead.__table__.c.lead_id)
+            ).first()
+        else:
+            inserted = None
+            if values["website_url_hash"] is None or db.query(Lead.id).filter(
+                Lead.website_url_hash == values["website_url_hash"]
+            ).first() is None:
+                db.execute(Lead.__table__.insert().values(**values))
+                inserted = (lead_id,)
+        if inserted is None:
+            # Only the id is needed: one indexed column, no Lead hydration
+            existing_id = db.query(Lead.lead_id).filter(Lead.website_url_hash == values["website_url_hash"]).scalar()
+            return {"suppressed": False, "lead_id": existing_id, "dedupe": True, "request_id": request_id}
+
+        # Step 9: Audit (buffered until commit)
+        audit(db, "lead_created", lead_id=lead_id, actor=actor,
               request_id=request_id, payload={"company_name": req.company_name, "email": email})
 
         # Step 10-11: Create research job and queue
-        job = Job(job_type="lead_research", lead_id=lead.lead_id, status=JobStatus.QUEUED.value)
-        db.add(job)
+        job_id = gen_uuid()
+        db.execute(Job.__table__.insert().values(
+            job_id=job_id, job_type="lead_research", lead_id=lead_id, status=JobStatus.QUEUED.value,
+        ))
+        self._notify_workers(db)
         db.commit()
 
-        logger.info(f"Lead created: {lead.lead_id} ({lead.company_name}). Job: {job.job_id}")
-        return {"suppressed": False, "lead_id": lead.lead_id, "job_id": job.job_id,
+        logger.info(f"Lead created: {lead_id} ({req.company_name}). Job: {job_id}")
+        return {"suppressed": False, "lead_id": lead_id, "job_id": job_id,
                 "dedupe": False, "request_id": request_id}
 
+    def create_leads_bulk(self, db: Session, reqs: list[LeadCreateRequest], actor: str = "dashboard") -> dict:
+        """
+        Batched Steps 2-12 for CSV/sheet imports.
+        Suppression runs as one set lookup per batch; dedup on website_url is
+        folded into the INSERT itself (ON CONFLICT DO NOTHING). Leads, jobs and
+        (buffered) audit rows then go out as a single multi-row write each.
+        """
+        results = {"created": 0, "skipped": 0, "errors": 0}
+
+        for start in range(0, len(reqs), IMPORT_BATCH_SIZE):
+            batch = reqs[start:start + IMPORT_BATCH_SIZE]
+
+            # Step 5: Suppression precheck (batched)
+            suppressed = filter_suppressed(db, [r.contact_email for r in batch])
+
+            # Step 7-8: Build lead rows
+            now = datetime.utcnow()
+            lead_rows = []
+            for req in batch:
+                email = req.contact_email
+                if email in suppressed:
+                    results["skipped"] += 1
+                    continue
+                lead_rows.append({
+                    "lead_id": gen_uuid(), "company_name": req.company_name,
+                    "website_url": req.website_url or None,  # None avoids unique constraint on empty
+                    "website_url_hash": url_hash(req.website_url),
+                    "contact_email": email, "channel": req.channel, "niche": req.niche,
+                    "location": req.location, "notes": req.notes, "status": LeadStatus.NEW.value,
+                    "store_count": req.store_count, "hq_location": req.hq_location, "focus": req.focus,
+                    "created_at": now, "updated_at": now,
+                })
+            if not lead_rows:
+                continue
+
+            # Step 6 + 8: Insert, skipping existing website_urls
+            inserted = self._insert_leads(db, lead_rows)
+            results["skipped"] += len(lead_rows) - len(inserted)
+
+            # Step 9-11: Audit (buffered until commit) + research jobs
+            created = [row for row in lead_rows if row["lead_id"] in inserted]
+            bulk_audit(db, [
+                {"event": "lead_created", "lead_id": row["lead_id"],
+                 "payload": {"company_name": row["company_name"], "email": row["contact_email"]}}
+                for row in created
+            ], actor=actor)
+            if created:
+                db.execute(Job.__table__.insert(), [
+                    {"job_id": gen_uuid(), "job_type": "lead_research",
+                     "lead_id": row["lead_id"], "status": JobStatus.QUEUED.value}
+                    for row in created
+                ])
+                self._notify_workers(db)
+            db.commit()
+            results["created"] += len(inserted)
+
+        logger.info(f"Bulk intake: {results}")
+        return results
+
+    def _insert_leads(self, db: Session, rows: list[dict]) -> set[str]:
+        """
+        Insert lead rows, skipping any whose website_url already exists
+        (in the table or earlier in the same batch). Returns inserted lead_ids.
+        """
+        dialect = db.get_bind().dialect
+        if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+            return self._copy_leads(db, rows)
+
+        if dialect.name in ("postgresql", "sqlite"):
+            dialect_insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+            stmt = (
+                dialect_insert(Lead.__table__)
+                .on_conflict_do_nothing(index_elements=["website_url_hash"])
+                .returning(Lead.__table__.c.lead_id)
+            )
+            return {row.lead_id for row in db.execute(stmt, rows)}
+
+        # Other dialects: dedup pre-pass, then executemany
+        urls = {r["website_url"] for r in rows if r["website_url"]}
+        seen_urls = set()
+        if urls:
+            seen_urls = {row.website_url for row in db.query(Lead.website_url).filter(Lead.website_url.in_(urls))}
+        fresh = []
+        for row in rows:
+            if row["website_url"]:
+                if row["website_url"] in seen_urls:
+                    continue
+                seen_urls.add(row["website_url"])
+            fresh.append(row)
+        db.bulk_insert_mappings(Lead, fresh)
+        return {row["lead_id"] for row in fresh}
+
+    def _copy_leads(self, db: Session, rows: list[dict]) -> set[str]:
+        """Postgres/psycopg2: COPY into a temp table, then INSERT ... ON CONFLICT DO NOTHING."""
+        columns = ", ".join(rows[0])
+        buf = io.StringIO()
+        for row in rows:
+            buf.write("\t".join(_copy_value(v) for v in row.values()))
+            buf.write("\n")
+        buf.seek(0)
+
+        # Raw DB-API connection bound to the session's transaction
+        cursor = db.connection().connection.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE lead_import ON COMMIT DROP AS "
+            f"SELECT {columns} FROM leads WITH NO DATA"
+        )
+        cursor.copy_expert(f"COPY lead_import ({columns}) FROM STDIN", buf)
+        cursor.execute(
+            f"INSERT INTO leads ({columns}) SELECT {columns} FROM lead_import "
+            f"ON CONFLICT (website_url_hash) DO NOTHING RETURNING lead_id::text"
+        )
+        # ::text: psycopg2 hands native uuid columns back as uuid.UUID, which
+        # would never match the str ids the caller generated
+        return {lead_id for (lead_id,) in cursor.fetchall()}
+
     # ── Step 13-30: Research (Scrape) ────────────────────────────
 
     def research_lead(self, db: Session, lead: Lead, job: Job, request_id: Optional[str] = None) -> dict:
@@ -128,6 +285,7 @@ class PickrPipeline:
             scrape_artifact_hash=scrape_result.get("scrape_artifact_hash"),
         )
         db.add(signals)
+        lead.signals = signals  # Later stages read it without a reload
 
         scrape_job.status = "success" if scrape_result.get("success") else "failed"
         scrape_job.pages_fetched = scrape_result.get("pages_fetched", 0)
@@ -149,26 +307,30 @@ class PickrPipeline:
         if not signals:
             return {"status": "no_signals"}
 
-        signals_dict = {
-            "detected_platform": signals.detected_platform,
-            "categories": signals.categories,
-            "brand_mentions_raw": signals.brand_mentions_raw,
-            "sku_count_estimate": signals.sku_count_estimate,
-            "price_range_min": signals.price_range_min,
-            "price_range_max": signals.price_range_max,
-            "site_excerpt": signals.site_excerpt,
-            "map_text_found": signals.map_text_found,
-        }
-
-        classifier_output, llm_call_id = classify_lead(signals_dict, lead.company_name, lead.niche)
-
-        signals.brand_list = classifier_output.brand_list
-        signals.price_tier = classifier_output.price_tier
-        signals.scale_score = classifier_output.scale_score
-        signals.map_behavior_score = classifier_output.map_behavior_score
-        signals.store_count = classifier_output.store_count
-
-        qual_result = self.leverage_engine.qualify(signals)
+        # Leads already disqualified by scraped signals skip the LLM call
+        qual_result = self.leverage_engine.prequalify(signals)
+        llm_call_id = None
+        if qual_result is None:
+            signals_dict = {
+                "detected_platform": signals.detected_platform,
+                "categories": signals.categories,
+                "brand_mentions_raw": signals.brand_mentions_raw,
+                "sku_count_estimate": signals.sku_count_estimate,
+                "price_range_min": signals.price_range_min,
+                "price_range_max": signals.price_range_max,
+                "site_excerpt": signals.site_excerpt,
+                "map_text_found": signals.map_text_found,
+            }
+
+            classifier_output, llm_call_id = classify_lead(signals_dict, lead.company_name, lead.niche)
+
+            signals.brand_list = classifier_output.brand_list
+            signals.price_tier = classifier_output.price_tier
+            signals.scale_score = classifier_output.scale_score
+            signals.map_behavior_score = classifier_output.map_behavior_score
+            signals.store_count = classifier_output.store_count
+
+            qual_result = self.leverage_engine.qualify(signals)
         qualification = LeadQualification(
             lead_id=lead.lead_id, qualifies=qual_result["qualified"],
             disqualify_reason=qual_result["reason"],
@@ -207,6 +369,7 @@ class PickrPipeline:
         brand_query = leverage.brand_query or {"priority_first": True, "cap": 3}
         brand_ids = self.brand_matcher.match(db, lead, signals, brand_query, request_id)
         leverage.recommended_brands = brand_ids
+        lead.leverage = leverage
         lead.status = LeadStatus.QUALIFIED.value
         db.commit()
 
@@ -223,37 +386,43 @@ class PickrPipeline:
             return {"status": "no_leverage"}
 
         sequence_id = f"seq-{uuid.uuid4().hex[:12]}"
-        brand_names = []
-        if leverage.recommended_brands:
-            brands = db.query(Brand).filter(Brand.brand_id.in_(leverage.recommended_brands)).all()
-            brand_names = [b.brand_name for b in brands]
+        brand_names = self._get_brand_names(db, lead)
 
         lint_result = self.linter.lint_template_inputs({"company_name": lead.company_name, "brand_names": brand_names})
         if not lint_result["ok"]:
             return {"status": "lint_failed", "violations": lint_result["violations"]}
 
+        # All 5 touches are generated concurrently (one LLM round-trip of wall time)
+        emails = generate_sequence(
+            company_name=lead.company_name, niche=lead.niche or "retail",
+            primary_angle=leverage.primary_angle, brand_names=brand_names,
+            site_excerpt=lead.signals.site_excerpt if lead.signals else None,
+            categories=lead.signals.categories if lead.signals else None,
+        )
+
+        # Lint every touch, then write the sequence as one multi-row INSERT
+        # (plus one buffered audit INSERT) instead of a flush per touch
         now = datetime.utcnow()
-        for touch in range(1, 6):
+        job_rows, audit_events = [], []
+        for touch, email_data in enumerate(emails, start=1):
             delay_hours = FOLLOWUP_TIMING.get(touch, 0)
-            email_data = generate_email(
-                company_name=lead.company_name, niche=lead.niche or "retail",
-                primary_angle=leverage.primary_angle, touch_number=touch,
-                brand_names=brand_names,
-                site_excerpt=lead.signals.site_excerpt if lead.signals else None,
-                categories=lead.signals.categories if lead.signals else None,
-            )
             body_lint = self.linter.lint(email_data["subject"], email_data["body"], brand_count=len(brand_names))
 
-            email_job = EmailJob(
-                lead_id=lead.lead_id, sequence_id=sequence_id, touch_number=touch,
-                email_type="sequence", subject=email_data["subject"], body=email_data["body"],
-                status=EmailJobStatus.RENDERED.value if body_lint["ok"] else EmailJobStatus.FAILED.value,
-                scheduled_at=now + timedelta(hours=delay_hours),
-                error=str(body_lint["violations"]) if not body_lint["ok"] else None,
-            )
-            db.add(email_job)
-            audit(db, "email_rendered", lead_id=lead.lead_id, actor="worker", request_id=request_id,
-                  payload={"touch": touch, "sequence_id": sequence_id, "lint_ok": body_lint["ok"]})
+            job_rows.append({
+                "job_id": gen_uuid(), "lead_id": lead.lead_id, "sequence_id": sequence_id,
+                "touch_number": touch, "email_type": "sequence",
+                "subject": email_data["subject"], "body": email_data["body"],
+                "status": EmailJobStatus.RENDERED.value if body_lint["ok"] else EmailJobStatus.FAILED.value,
+                "scheduled_at": now + timedelta(hours=delay_hours),
+                "error": str(body_lint["violations"]) if not body_lint["ok"] else None,
+            })
+            audit_events.append({
+                "event": "email_rendered", "lead_id": lead.lead_id,
+                "payload": {"touch": touch, "sequence_id": sequence_id, "lint_ok": body_lint["ok"]},
+            })
+
+        db.execute(EmailJob.__table__.insert(), job_rows)
+        bulk_audit(db, audit_events, actor="worker", request_id=request_id)
 
         lead.status = LeadStatus.CONTACTED.value
         db.commit()
@@ -335,17 +504,14 @@ class PickrPipeline:
         if res["status"] in ("suppressed",):
             return results
 
-        db.refresh(lead)
         res = self.classify_and_qualify(db, lead, job, request_id)
         results["classification"] = res
         if res["status"] == "disqualified":
             return results
 
-        db.refresh(lead)
         res = self.assign_leverage_and_brands(db, lead, request_id)
         results["leverage"] = res
 
-        db.refresh(lead)
         res = self.create_email_sequence(db, lead, request_id)
         results["email_sequence"] = res
 
@@ -355,65 +521,212 @@ class PickrPipeline:
         return results
 
     def process_queued_jobs(self, db: Session) -> dict:
-        """Process all queued lead_research jobs."""
-        jobs = db.query(Job).filter(Job.job_type == "lead_research", Job.status == JobStatus.QUEUED.value).all()
+        """
+        Process all queued lead_research jobs.
+        Leads are independent and their time goes to scraping and LLM calls,
+        so up to PIPELINE_CONCURRENCY run at once, each in its own session.
+        On PostgreSQL jobs are claimed in batches (see _claim_job_ids), so
+        several workers can drain the queue side by side; claims a dead
+        worker left behind are put back first (see _requeue_expired_jobs).
+        """
         results = {"processed": 0, "errors": 0}
-        for job in jobs:
-            lead = db.query(Lead).filter(Lead.lead_id == job.lead_id).first()
+        claim = db.get_bind().dialect.name == "postgresql"
+        if claim:
+            self._requeue_expired_jobs(db)
+        while True:
+            job_ids = self._claim_job_ids(db, "lead_research") if claim else self._queued_job_ids(db, "lead_research")
+            if not job_ids:
+                return results
+
+            workers = min(PIPELINE_CONCURRENCY, len(job_ids))
+            if db.get_bind().dialect.name == "sqlite":
+                workers = 1  # SQLite serializes writers; threads would only fight over the lock
+
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pickr-lead") as pool:
+                    outcomes = list(pool.map(self._process_job, job_ids))
+            else:
+                outcomes = [self._process_job(job_id) for job_id in job_ids]
+
+            for ok in outcomes:
+                results["processed" if ok else "errors"] += 1
+            if not claim:
+                return results
+
+    def _claim_job_ids(self, db: Session, job_type: str) -> list[str]:
+        """
+        PostgreSQL: mark up to JOB_CLAIM_BATCH_SIZE of the oldest queued jobs
+        running (locked_by this process) and return their ids. FOR UPDATE
+        SKIP LOCKED lets concurrent workers claim disjoint batches without
+        waiting on each other. started_at starts the lease; research_lead
+        renews it when the job actually begins.
+        """
+        job_ids = db.execute(text(
+            "UPDATE jobs SET status = :running, locked_by = :worker, "
+            "started_at = TIMEZONE('utc', CURRENT_TIMESTAMP) WHERE job_id IN ("
+            "SELECT job_id FROM jobs WHERE job_type = :job_type AND status = :queued "
+            "ORDER BY created_at LIMIT :limit FOR UPDATE SKIP LOCKED) RETURNING job_id::text"
+        ), {
+            "running": JobStatus.RUNNING.value, "queued": JobStatus.QUEUED.value,
+            "worker": f"{socket.gethostname()}:{os.getpid()}",
+            "job_type": job_type, "limit": JOB_CLAIM_BATCH_SIZE,
+        }).scalars().all()
+        db.commit()
+        return job_ids
+
+    def _requeue_expired_jobs(self, db: Session):
+        """
+        PostgreSQL: put running jobs whose lease (JOB_LEASE_SECONDS since
+        started_at) ran out back in the queue. A worker killed mid-batch
+        (crash, deploy) would otherwise leave every job it claimed but never
+        finished running forever. Running rows without started_at predate
+        leases and are requeued too.
+        """
+        requeued = db.execute(text(
+            "UPDATE jobs SET status = :queued, locked_by = NULL, started_at = NULL "
+            "WHERE status = :running AND (started_at IS NULL OR "
+            "started_at < TIMEZONE('utc', CURRENT_TIMESTAMP) - make_interval(secs => :lease))"
+        ), {
+            "queued": JobStatus.QUEUED.value, "running": JobStatus.RUNNING.value,
+            "lease": JOB_LEASE_SECONDS,
+        }).rowcount
+        db.commit()
+        if requeued:
+            logger.warning(f"Requeued {requeued} jobs whose worker lease expired")
+
+    def _notify_workers(self, db: Session):
+        """PostgreSQL: wake LISTENing workers once the current transaction commits."""
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": JOB_NOTIFY_CHANNEL})
+
+    def _queued_job_ids(self, db: Session, job_type: str) -> list[str]:
+        """
+        Oldest-first ids of queued jobs. The scan only needs one column, so it
+        goes through the raw DB-API cursor instead of building ORM rows.
+        """
+        mark = "?" if db.get_bind().dialect.paramstyle == "qmark" else "%s"
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT job_id FROM jobs WHERE job_type = {mark} AND status = {mark} "
+                f"ORDER BY created_at",
+                (job_type, JobStatus.QUEUED.value),
+            )
+            return [job_id for (job_id,) in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def _process_job(self, job_id: str) -> bool:
+        """
+        Run one lead_research job in a session of its own. Returns success.
+        Nothing else writes this lead while its job runs, so objects aren't
+        expired on commit: stages hand the lead (with the signals and
+        leverage they attach) straight on instead of reloading it.
+        """
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            job, lead = (
+                db.query(Job, Lead)
+                .outerjoin(Lead, Lead.lead_id == Job.lead_id)
+                .options(joinedload(Lead.signals), joinedload(Lead.leverage))
+                .filter(Job.job_id == job_id)
+                .one()
+            )
             if not lead:
                 job.status = JobStatus.FAILED.value
                 job.error = "Lead not found"
-                results["errors"] += 1
-                continue
+                db.commit()
+                return False
             try:
                 self.process_lead_full(db, lead, job)
-                results["processed"] += 1
+                return True
             except Exception as e:
-                job.status = JobStatus.FAILED.value
-                job.error = str(e)
-                results["errors"] += 1
-                logger.error(f"Job {job.job_id} failed: {e}")
-        db.commit()
-        return results
+                logger.error(f"Job {job_id} failed: {e}")
+                # A failed bookkeeping write must not abort the rest of the
+                # batch; on PostgreSQL the expired lease requeues the job
+                try:
+                    db.rollback()
+                    job.status = JobStatus.FAILED.value
+                    job.error = str(e)
+                    db.commit()
+                except Exception as commit_error:
+                    db.rollback()
+                    logger.error(f"Could not mark job {job_id} failed: {commit_error}")
+                return False
+        finally:
+            db.close()
 
     def get_stats(self, db: Session) -> dict:
-        """Pipeline statistics."""
-        total = db.query(Lead).count()
-        return {
+        """Pipeline statistics. Cached for STATS_CACHE_TTL_SECONDS to absorb dashboard polling."""
+        cached = self._stats_cache
+        if cached and cached[0] > time.monotonic():
+            return dict(cached[1])
+
+        if stats_counters_enabled():
+            # Trigger-maintained counters: a handful of rows, however big the tables get
+            counters = dict(
+                db.query(StatsCounter.key, func.sum(StatsCounter.value)).group_by(StatsCounter.key).all()
+            )
+            by_status = {
+                key.removeprefix("leads:"): value
+                for key, value in counters.items() if key.startswith("leads:")
+            }
+            total_emails = counters.get(f"email_jobs:{EmailJobStatus.SENT.value}", 0)
+            total_replies = counters.get("replies", 0)
+        else:
+            # One GROUP BY for every lead status, one round-trip for the other two counters
+            # count(*) lets PostgreSQL answer from the status index alone
+            by_status = dict(db.query(Lead.status, func.count()).group_by(Lead.status).all())
+            total_emails, total_replies = db.query(
+                db.query(func.count(EmailJob.id)).filter(EmailJob.status == EmailJobStatus.SENT.value).scalar_subquery(),
+                db.query(func.count(Reply.id)).scalar_subquery(),
+            ).one()
+
+        total = sum(by_status.values())
+        booked = by_status.get(LeadStatus.BOOKED.value, 0)
+        stats = {
             "total_leads": total,
-            "new": db.query(Lead).filter(Lead.status == LeadStatus.NEW.value).count(),
-            "researched": db.query(Lead).filter(Lead.status == LeadStatus.RESEARCHED.value).count(),
-            "qualified": db.query(Lead).filter(Lead.status == LeadStatus.QUALIFIED.value).count(),
-            "disqualified": db.query(Lead).filter(Lead.status == LeadStatus.DISQUALIFIED.value).count(),
-            "contacted": db.query(Lead).filter(Lead.status == LeadStatus.CONTACTED.value).count(),
-            "interested": db.query(Lead).filter(Lead.status == LeadStatus.INTERESTED.value).count(),
-            "booked": db.query(Lead).filter(Lead.status == LeadStatus.BOOKED.value).count(),
-            "dead": db.query(Lead).filter(Lead.status == LeadStatus.DEAD.value).count(),
-            "total_emails": db.query(EmailJob).filter(EmailJob.status == EmailJobStatus.SENT.value).count(),
-            "total_replies": db.query(Reply).count(),
-            "conversion_rate": round(db.query(Lead).filter(Lead.status == LeadStatus.BOOKED.value).count() / max(total, 1) * 100, 1),
+            "new": by_status.get(LeadStatus.NEW.value, 0),
+            "researched": by_status.get(LeadStatus.RESEARCHED.value, 0),
+            "qualified": by_status.get(LeadStatus.QUALIFIED.value, 0),
+            "disqualified": by_status.get(LeadStatus.DISQUALIFIED.value, 0),
+            "contacted": by_status.get(LeadStatus.CONTACTED.value, 0),
+            "interested": by_status.get(LeadStatus.INTERESTED.value, 0),
+            "booked": booked,
+            "dead": by_status.get(LeadStatus.DEAD.value, 0),
+            "total_emails": total_emails,
+            "total_replies": total_replies,
+            "conversion_rate": round(booked / max(total, 1) * 100, 1),
         }
+        self._stats_cache = (time.monotonic() + STATS_CACHE_TTL_SECONDS, stats)
+        return dict(stats)
 
     def _get_brand_names(self, db: Session, lead: Lead) -> list[str]:
         if not lead.leverage or not lead.leverage.recommended_brands:
             return []
-        brands = db.query(Brand).filter(Brand.brand_id.in_(lead.leverage.recommended_brands)).all()
-        return [b.brand_name for b in brands]
+        # Names come from the cached active catalog: no query per sequence/reply
+        names_by_id = self.brand_matcher.load_catalog(db).names_by_id
+        return [names_by_id[b] for b in lead.leverage.recommended_brands if b in names_by_id]
 
     def _pause_pending_emails(self, db: Session, lead_id: str):
-        pending = db.query(EmailJob).filter(
-            EmailJob.lead_id == lead_id,
-            EmailJob.status.in_([EmailJobStatus.QUEUED.value, EmailJobStatus.RENDERED.value]),
-        ).all()
-        for ej in pending:
-            ej.status = EmailJobStatus.PAUSED.value
+        db.execute(
+            update(EmailJob)
+            .where(
+                EmailJob.lead_id == lead_id,
+                EmailJob.status.in_([EmailJobStatus.QUEUED.value, EmailJobStatus.RENDERED.value]),
+            )
+            .values(status=EmailJobStatus.PAUSED.value)
+        )
 
     def _maybe_require_approval(self, db: Session, reply: Reply):
-        total = db.query(Reply).filter(Reply.draft_response.isnot(None)).count()
-        if total <= HUMAN_APPROVAL_THRESHOLD:
-            reply.draft_approved = None
-        else:
-            reply.draft_approved = True
+        # Drafts only accumulate, so once past the threshold the answer never
+        # changes. Until then, probe for the (threshold+1)-th draft instead of
+        # counting them all.
+        if not self._approval_phase_over:
+            self._approval_phase_over = db.query(Reply.id).filter(
+                Reply.draft_response.isnot(None)
+            ).offset(HUMAN_APPROVAL_THRESHOLD).limit(1).first() is not None
+        reply.draft_approved = True if self._approval_phase_over else None
 
     # ── Email Enrichment ─────────────────────────────────────────────
 
@@ -440,23 +753,29 @@ class PickrPipeline:
 
     def enrich_all_leads_email(self, db: Session) -> dict:
         """Find and enrich emails for all leads missing purchasing emails."""
-        leads = db.query(Lead).filter(
+        leads = db.query(Lead.id, Lead.company_name, Lead.website_url).filter(
             Lead.purchasing_email.is_(None)
         ).all()
 
-        results = {"enriched": 0, "failed": 0, "already_have": 0}
-
-        for lead in leads:
-            try:
-                result = self.enrich_lead_email(db, lead.lead_id)
-                if result.get("status") == "enriched":
-                    results["enriched"] += 1
-                elif result.get("status") == "already_enriched":
-                    results["already_have"] += 1
-                else:
-                    results["failed"] += 1
-            except Exception as e:
-                logger.error(f"Error enriching {lead.lead_id}: {e}")
+        already_have = db.query(func.count(Lead.id)).filter(
+            Lead.purchasing_email.is_not(None)
+        ).scalar()
+        results = {"enriched": 0, "failed": 0, "already_have": already_have}
+
+        # Site lookups are network-bound, so run them in parallel up front,
+        # then write every hit back in one executemany UPDATE by primary key
+        emails = find_emails_for_leads([(lead.company_name, lead.website_url) for lead in leads])
+
+        updates = []
+        for lead, email in zip(leads, emails):
+            if email:
+                updates.append({"id": lead.id, "purchasing_email": email})
+                logger.info(f"Enriched email for {lead.company_name}: {email}")
+            else:
                 results["failed"] += 1
+        if updates:
+            db.execute(update(Lead), updates)
+        db.commit()
+        results["enriched"] = len(updates)
 
         return results
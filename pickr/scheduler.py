@@ -1,15 +1,21 @@
 """
 Pickr AI - Background Job Processor (v2)
-Polls for queued jobs and processes them via the pipeline.
+Processes queued jobs via the pipeline. On PostgreSQL the worker LISTENs for
+new-job notifications and wakes immediately; elsewhere it polls.
 Designed to run as a separate worker process alongside the API server.
 """
 import logging
+import select
 import time
 import signal
 import sys
-from pickr.models import SessionLocal, Job, JobStatus, init_db
+from datetime import datetime
+from pickr.models import (
+    SessionLocal, engine, init_db, ensure_audit_partitions, detach_cold_audit_partitions,
+)
 from pickr.pipeline import PickrPipeline
-from pickr.config import SCHEMA_VERSION
+from pickr.enrichment.analyzer import prune_llm_cache
+from pickr.config import SCHEMA_VERSION, JOB_NOTIFY_CHANNEL
 
 logger = logging.getLogger(__name__)
 
@@ -23,15 +29,58 @@ def _handle_signal(signum, frame):
     _shutdown = True
 
 
+def _open_listener():
+    """
+    PostgreSQL/psycopg2: a dedicated autocommit connection LISTENing on
+    JOB_NOTIFY_CHANNEL. Returns None (plain polling) on other databases or
+    if the connection can't be opened.
+    """
+    if engine.dialect.name != "postgresql" or engine.dialect.driver != "psycopg2":
+        return None
+    try:
+        pooled = engine.raw_connection()
+        pooled.detach()  # Lives for the worker's lifetime, outside the pool
+        conn = pooled.driver_connection
+        conn.rollback()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {JOB_NOTIFY_CHANNEL}")
+        return conn
+    except Exception as e:
+        logger.error(f"Job listener unavailable, falling back to polling: {e}")
+        return None
+
+
+def _wait_for_jobs(listener, timeout: int):
+    """
+    Sleep up to timeout seconds, in one-second slices so shutdown stays
+    responsive. Returns early when a job notification arrives.
+    """
+    deadline = time.monotonic() + timeout
+    while not _shutdown:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if listener is None:
+            time.sleep(min(1, remaining))
+            continue
+        if select.select([listener], [], [], min(1, remaining))[0]:
+            listener.poll()
+            if listener.notifies:
+                listener.notifies.clear()
+                return
+
+
 def run_worker(poll_interval: int = 30):
     """
-    Worker loop: poll for queued jobs, process them via the pipeline.
+    Worker loop: process queued jobs via the pipeline, then wait for more.
 
-    This replaces APScheduler with a simpler poll-based approach
-    that works well with PostgreSQL and Docker.
+    This replaces APScheduler with a simpler loop that works well with
+    PostgreSQL and Docker. New jobs NOTIFY JOB_NOTIFY_CHANNEL, so on
+    PostgreSQL the wait ends as soon as one is queued.
 
     Args:
-        poll_interval: Seconds between poll cycles (default: 30)
+        poll_interval: Max seconds between queue checks (default: 30)
     """
     signal.signal(signal.SIGTERM, _handle_signal)
     signal.signal(signal.SIGINT, _handle_signal)
@@ -44,32 +93,60 @@ def run_worker(poll_interval: int = 30):
         f"Polling every {poll_interval}s."
     )
 
+    listener = _open_listener()
+    detach_cold_audit_partitions()
+    partition_month = datetime.utcnow().strftime("%Y-%m")  # initialize() just ensured them
+    prune_day = None
+
+    # One session for the worker's lifetime: each tick only claims or lists
+    # job ids (jobs run in sessions of their own), so there is nothing to
+    # expire between ticks and no reason to rebuild it every time
+    db = SessionLocal(expire_on_commit=False)
+
     while not _shutdown:
-        db = SessionLocal()
+        # Monthly audit_log upkeep: partitions ahead, cold months detached
+        month = datetime.utcnow().strftime("%Y-%m")
+        if month != partition_month:
+            try:
+                ensure_audit_partitions()
+                detach_cold_audit_partitions()
+                partition_month = month
+            except Exception as e:
+                logger.error(f"Audit partition maintenance failed: {e}")
+
+        # Daily llm_cache upkeep: drop expired completions
+        day = datetime.utcnow().date()
+        if day != prune_day:
+            try:
+                pruned = prune_llm_cache()
+                if pruned:
+                    logger.info(f"Pruned {pruned} expired LLM cache rows")
+                prune_day = day
+            except Exception as e:
+                logger.error(f"LLM cache pruning failed: {e}")
+
         try:
-            # Count queued jobs
-            queued = db.query(Job).filter(
-                Job.status == JobStatus.QUEUED.value
-            ).count()
-
-            if queued > 0:
-                logger.info(f"Found {queued} queued jobs. Processing...")
-                results = pipeline.process_queued_jobs(db)
+            results = pipeline.process_queued_jobs(db)
+            db.commit()
+            if results["processed"] or results["errors"]:
                 logger.info(f"Processing results: {results}")
             else:
-                logger.debug("No queued jobs. Sleeping...")
+                logger.debug("No queued jobs. Waiting...")
 
         except Exception as e:
+            db.rollback()
             logger.error(f"Worker error: {e}", exc_info=True)
-        finally:
-            db.close()
 
-        # Sleep in small increments to allow graceful shutdown
-        for _ in range(poll_interval):
-            if _shutdown:
-                break
-            time.sleep(1)
+        try:
+            _wait_for_jobs(listener, poll_interval)
+        except Exception as e:
+            logger.error(f"Job listener failed, reconnecting: {e}")
+            listener.close()
+            listener = _open_listener()
 
+    db.close()
+    if listener is not None:
+        listener.close()
     logger.info("Worker shutdown complete.")
 
 
@@ -3,19 +3,83 @@ Pickr AI - Suppression List
 Non-negotiable: unsubscribe/remove-me must suppress forever.
 Checked at 3 gates: intake, before send, on reply classification.
 """
+import re
+import time
 import logging
 from typing import Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from pickr.models import SuppressionList, Lead, EmailJob, EmailJobStatus
+from pickr.models import SuppressionList, Lead, LeadStatus, EmailJob, EmailJobStatus
 from pickr.audit import audit
+from pickr.config import SUPPRESSION_CACHE_TTL_SECONDS
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
 
 logger = logging.getLogger(__name__)
 
+REMOVAL_PHRASES = (
+    "unsubscribe",
+    "remove me",
+    "remove my",
+    "stop emailing",
+    "stop contacting",
+    "opt out",
+    "opt-out",
+    "take me off",
+    "don't email",
+    "do not email",
+    "do not contact",
+    "don't contact",
+    "no more emails",
+    "stop sending",
+    "not interested please remove",
+    "please remove",
+)
+
+# Built once at import: one pass over the reply finds any removal phrase.
+if HAS_AHOCORASICK:
+    _REMOVAL_AC = ahocorasick.Automaton()
+    for _phrase in REMOVAL_PHRASES:
+        _REMOVAL_AC.add_word(_phrase, _phrase)
+    _REMOVAL_AC.make_automaton()
+else:
+    _REMOVAL_RE = re.compile("|".join(re.escape(p) for p in REMOVAL_PHRASES))
+
+# (loaded_at, suppressed emails, domain-wide suppressed domains) for bulk
+# intake. suppress() invalidates it; other processes see new entries within
+# SUPPRESSION_CACHE_TTL_SECONDS. Single-address checks always hit the table.
+_snapshot: Optional[tuple[float, frozenset[str], frozenset[str]]] = None
+
+
+def invalidate_cache():
+    global _snapshot
+    _snapshot = None
+
+
+def _load_snapshot(db: Session) -> tuple[frozenset[str], frozenset[str]]:
+    global _snapshot
+    cached = _snapshot
+    if cached is not None and time.monotonic() - cached[0] < SUPPRESSION_CACHE_TTL_SECONDS:
+        return cached[1], cached[2]
+    emails, domains = set(), set()
+    for email, domain in db.query(SuppressionList.email, SuppressionList.domain):
+        if email is not None:
+            emails.add(email)
+        elif domain:
+            domains.add(domain)
+    _snapshot = (time.monotonic(), frozenset(emails), frozenset(domains))
+    return _snapshot[1], _snapshot[2]
+
 
 def extract_domain(email: str) -> str:
-    """Extract domain from an email address."""
+    """Extract domain from a normalized (lowercase, stripped) email address."""
     if "@" in email:
-        return email.split("@")[1].lower().strip()
+        return email.split("@")[1]
     return ""
 
 
@@ -23,31 +87,36 @@ def is_suppressed(db: Session, email: str) -> bool:
     """
     Check if an email or its domain is suppressed.
     Called at: lead intake, before email send, on reply classification.
+    Expects a normalized address, as LeadCreateRequest and leads.contact_email hold.
     """
-    email_lower = email.lower().strip()
-    domain = extract_domain(email_lower)
+    domain = extract_domain(email)
 
-    # Check exact email match
-    email_match = db.query(SuppressionList).filter(
-        SuppressionList.email == email_lower
-    ).first()
-    if email_match:
-        logger.info(f"SUPPRESSED (email): {email_lower} — reason: {email_match.reason}")
-        return True
-
-    # Check domain match
+    # Exact email or domain-wide match in one round trip
+    match = SuppressionList.email == email
     if domain:
-        domain_match = db.query(SuppressionList).filter(
-            SuppressionList.domain == domain,
-            SuppressionList.email.is_(None),
-        ).first()
-        if domain_match:
-            logger.info(f"SUPPRESSED (domain): {domain} — reason: {domain_match.reason}")
-            return True
+        match = or_(match, and_(SuppressionList.domain == domain, SuppressionList.email.is_(None)))
+    hit = db.query(SuppressionList.email, SuppressionList.reason).filter(match).first()
+    if hit:
+        kind, value = ("email", email) if hit.email is not None else ("domain", domain)
+        logger.info(f"SUPPRESSED ({kind}): {value} — reason: {hit.reason}")
+        return True
 
     return False
 
 
+def filter_suppressed(db: Session, emails: list[str]) -> set[str]:
+    """
+    Batch form of is_suppressed for bulk intake (normalized emails).
+    Returns the subset of emails that are suppressed, checked against the
+    cached suppression snapshot rather than per-batch queries.
+    """
+    emails = set(emails)
+    if not emails:
+        return set()
+    hit_emails, hit_domains = _load_snapshot(db)
+    return {e for e in emails if e in hit_emails or extract_domain(e) in hit_domains}
+
+
 def suppress(
     db: Session,
     email: str,
@@ -55,27 +124,39 @@ def suppress(
     source_lead_id: Optional[str] = None,
     suppress_domain: bool = True,
     request_id: Optional[str] = None,
-) -> SuppressionList:
+) -> bool:
     """
     Add email (and optionally domain) to suppression list.
     Also pauses all pending email_jobs for this email.
+    Returns True if the address was newly suppressed.
     """
     email_lower = email.lower().strip()
     domain = extract_domain(email_lower)
-
-    # Add email suppression
-    existing = db.query(SuppressionList).filter(
-        SuppressionList.email == email_lower
-    ).first()
-
-    if not existing:
-        entry = SuppressionList(
-            email=email_lower,
-            domain=domain if suppress_domain else None,
-            reason=reason,
-            source_lead_id=source_lead_id,
+    values = dict(
+        email=email_lower,
+        domain=domain if suppress_domain else None,
+        reason=reason,
+        source_lead_id=source_lead_id,
+    )
+
+    # Check-and-insert in one statement; concurrent suppressions of the same
+    # address no longer race into an IntegrityError
+    dialect = db.get_bind().dialect
+    if dialect.name in ("postgresql", "sqlite"):
+        dialect_insert = pg_insert if dialect.name == "postgresql" else sqlite_insert
+        stmt = (
+            dialect_insert(SuppressionList.__table__)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=["email"], index_where=SuppressionList.email.isnot(None))
+            .returning(SuppressionList.__table__.c.id)
         )
-        db.add(entry)
+        created = db.execute(stmt).first() is not None
+    else:
+        created = db.query(SuppressionList.id).filter(SuppressionList.email == email_lower).first() is None
+        if created:
+            db.add(SuppressionList(**values))
+
+    if created:
         logger.info(f"SUPPRESSED: {email_lower} (reason: {reason})")
 
         # Audit
@@ -92,51 +173,35 @@ def suppress(
             },
         )
     else:
-        entry = existing
         logger.info(f"Already suppressed: {email_lower}")
 
-    # Pause all pending email jobs for leads with this email
-    leads = db.query(Lead).filter(Lead.contact_email == email_lower).all()
-    for lead in leads:
-        # Update lead status
-        lead.status = "dead"
-        lead.disqualify_reason = f"suppressed: {reason}"
-
-        # Pause pending email jobs
-        pending_jobs = db.query(EmailJob).filter(
-            EmailJob.lead_id == lead.lead_id,
-            EmailJob.status.in_([
-                EmailJobStatus.QUEUED.value,
-                EmailJobStatus.RENDERED.value,
-            ]),
-        ).all()
-        for job in pending_jobs:
-            job.status = EmailJobStatus.PAUSED.value
-            logger.info(f"Paused email job {job.job_id} for suppressed lead")
+    # Mark every lead with this email dead and pause their pending email
+    # jobs: two set-based UPDATEs, whatever the number of leads and jobs
+    db.execute(
+        update(Lead)
+        .where(Lead.contact_email == email_lower)
+        .values(status=LeadStatus.DEAD.value, disqualify_reason=f"suppressed: {reason}")
+    )
+    paused = db.execute(
+        update(EmailJob)
+        .where(
+            EmailJob.lead_id.in_(select(Lead.lead_id).where(Lead.contact_email == email_lower)),
+            EmailJob.status.in_([EmailJobStatus.QUEUED.value, EmailJobStatus.RENDERED.value]),
+        )
+        .values(status=EmailJobStatus.PAUSED.value)
+    ).rowcount
+    if paused:
+        logger.info(f"Paused {paused} email jobs for suppressed {email_lower}")
 
     db.commit()
-    return entry
+    if created:
+        invalidate_cache()
+    return created
 
 
 def check_remove_me(text: str) -> bool:
     """Check if reply text contains unsubscribe/remove-me signals."""
     lower = text.lower()
-    removal_phrases = [
-        "unsubscribe",
-        "remove me",
-        "remove my",
-        "stop emailing",
-        "stop contacting",
-        "opt out",
-        "opt-out",
-        "take me off",
-        "don't email",
-        "do not email",
-        "do not contact",
-        "don't contact",
-        "no more emails",
-        "stop sending",
-        "not interested please remove",
-        "please remove",
-    ]
-    return any(phrase in lower for phrase in removal_phrases)
+    if HAS_AHOCORASICK:
+        return next(_REMOVAL_AC.iter(lower), None) is not None
+    return _REMOVAL_RE.search(lower) is not None
@@ -5,32 +5,80 @@ FastAPI app with dashboard, webhook endpoints, and full CRUD.
 import csv
 import io
 import logging
+import re
+import unicodedata
+import orjson
+from datetime import datetime
+from pathlib import Path
 from typing import Optional
+from anyio import to_thread
 from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File
-from fastapi.responses import HTMLResponse, JSONResponse
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import bindparam, func, literal, select, text, tuple_, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 from pickr.models import (
     Lead, EmailJob, Reply, AuditLog, Job, Brand, SuppressionList,
-    LeadCreateRequest, SessionLocal, init_db, get_db,
-    LeadStatus, EmailJobStatus, JobStatus,
+    LeadCreateRequest, SessionLocal, init_db, get_db, validate_lead_rows, minute_text,
+    LeadStatus, EmailJobStatus, JobStatus, LeadSummary, PendingReply, AuditLogEntry,
 )
 from pickr.pipeline import PickrPipeline
-from pickr.suppression import suppress
-from pickr.config import WEBHOOK_SECRET, EMAIL_PROVIDER, SCHEMA_VERSION
+from pickr.suppression import is_suppressed, suppress
+from pickr.config import WEBHOOK_SECRET, EMAIL_PROVIDER, SCHEMA_VERSION, WEB_THREADPOOL_SIZE
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Pickr AI", version="2.0.0")
+# Compiled once at import; autoescape keeps scraped/imported text inert in the page
+_templates = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    autoescape=True, auto_reload=False,
+)
+_DASHBOARD_TEMPLATE = _templates.get_template("dashboard.html")
+
+_STATUS_COLORS = {"qualified": "green", "disqualified": "red", "contacted": "blue",
+                  "interested": "lime", "booked": "gold", "dead": "gray"}
+
+app = FastAPI(title="Pickr AI", version="2.0.0", default_response_class=ORJSONResponse)
+# Table-heavy HTML and list JSON compress several-fold; tiny bodies aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 pipeline = PickrPipeline()
 
 
 @app.on_event("startup")
 def startup():
+    # Sync handlers (and run_in_threadpool) share AnyIO's default limiter;
+    # size it to the DB pool instead of AnyIO's fixed 40
+    to_thread.current_default_thread_limiter().total_tokens = WEB_THREADPOOL_SIZE
     pipeline.initialize()
+    _warm_query_cache()
     logger.info("Pickr AI v2 started. Schema: %s", SCHEMA_VERSION)
 
 
+def _warm_query_cache():
+    """
+    Run the per-request lookups once so SQLAlchemy has their compiled SQL
+    cached before the first real request instead of compiling on it.
+    """
+    missing = "00000000-0000-0000-0000-000000000000"
+    db = SessionLocal()
+    try:
+        db.query(Lead).filter(Lead.lead_id == missing).first()
+        db.query(Lead).filter(Lead.contact_email == missing).first()
+        db.query(Reply).filter(Reply.reply_id == missing).first()
+        is_suppressed(db, missing)
+        pipeline.get_stats(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    from pickr.integrations.provider_adapter import get_provider
+    await get_provider().aclose()
+
+
 # ── Health ───────────────────────────────────────────────────────
 
 @app.get("/health")
@@ -43,62 +91,32 @@ def health():
 @app.get("/", response_class=HTMLResponse)
 def dashboard(db: Session = Depends(get_db)):
     stats = pipeline.get_stats(db)
-    leads = db.query(Lead).order_by(Lead.created_at.desc()).limit(50).all()
-    recent_emails = db.query(EmailJob).filter(EmailJob.status != EmailJobStatus.QUEUED.value).order_by(EmailJob.created_at.desc()).limit(20).all()
-    recent_replies = db.query(Reply).order_by(Reply.created_at.desc()).limit(20).all()
-    pending_approval = db.query(Reply).filter(Reply.draft_approved.is_(None), Reply.draft_response.isnot(None)).count()
-
-    leads_html = ""
-    for l in leads:
-        status_class = {"qualified": "green", "disqualified": "red", "contacted": "blue",
-                        "interested": "lime", "booked": "gold", "dead": "gray"}.get(l.status, "white")
-        leads_html += f"""<tr>
-            <td>{l.company_name}</td><td>{l.contact_email}</td><td>{l.channel or '-'}</td>
-            <td><span style='color:{status_class}'>{l.status}</span></td>
-            <td>{l.niche or '-'}</td><td>{str(l.created_at)[:16]}</td>
-            <td><a href='/api/leads/{l.lead_id}'>view</a></td></tr>"""
-
-    emails_html = ""
-    for e in recent_emails:
-        emails_html += f"<tr><td>{e.lead_id[:8]}...</td><td>T{e.touch_number or '-'}</td><td>{e.status}</td><td>{e.subject or '-'}</td><td>{str(e.created_at)[:16]}</td></tr>"
-
-    replies_html = ""
-    for r in recent_replies:
-        approval = "pending" if r.draft_approved is None else ("approved" if r.draft_approved else "rejected")
-        replies_html += f"<tr><td>{r.lead_id[:8]}...</td><td>{r.classification or '-'}</td><td>{r.action or '-'}</td><td>{approval}</td><td>{str(r.created_at)[:16]}</td></tr>"
-
-    return f"""<!DOCTYPE html><html><head><title>Pickr AI v2</title>
-<style>
-body{{font-family:system-ui;background:#0a0a0a;color:#e0e0e0;margin:0;padding:20px}}
-h1{{color:#fff}}.stats{{display:grid;grid-template-columns:repeat(auto-fit,minmax(140px,1fr));gap:12px;margin:20px 0}}
-.stat{{background:#1a1a2e;padding:16px;border-radius:8px;text-align:center}}
-.stat .num{{font-size:28px;font-weight:bold;color:#00d4ff}}.stat .label{{font-size:12px;color:#888;margin-top:4px}}
-table{{width:100%;border-collapse:collapse;margin:16px 0}}
-th,td{{padding:8px 12px;text-align:left;border-bottom:1px solid #222}}
-th{{color:#888;font-size:12px;text-transform:uppercase}}
-a{{color:#00d4ff;text-decoration:none}}
-.section{{background:#111;border-radius:8px;padding:16px;margin:16px 0}}
-.badge{{background:#ff4444;color:#fff;padding:2px 8px;border-radius:12px;font-size:12px}}
-</style></head><body>
-<h1>Pickr AI v2 Dashboard</h1>
-<div class='stats'>
-<div class='stat'><div class='num'>{stats['total_leads']}</div><div class='label'>Total Leads</div></div>
-<div class='stat'><div class='num'>{stats['qualified']}</div><div class='label'>Qualified</div></div>
-<div class='stat'><div class='num'>{stats['contacted']}</div><div class='label'>Contacted</div></div>
-<div class='stat'><div class='num'>{stats['interested']}</div><div class='label'>Interested</div></div>
-<div class='stat'><div class='num'>{stats['booked']}</div><div class='label'>Booked</div></div>
-<div class='stat'><div class='num'>{stats['total_emails']}</div><div class='label'>Emails Sent</div></div>
-<div class='stat'><div class='num'>{stats['total_replies']}</div><div class='label'>Replies</div></div>
-<div class='stat'><div class='num'>{stats['conversion_rate']}%</div><div class='label'>Conversion</div></div>
-</div>
-{f"<div class='badge'>Pending approvals: {pending_approval}</div>" if pending_approval else ""}
-<div class='section'><h2>Leads</h2>
-<table><tr><th>Company</th><th>Email</th><th>Channel</th><th>Status</th><th>Niche</th><th>Created</th><th>Detail</th></tr>{leads_html}</table></div>
-<div class='section'><h2>Recent Emails</h2>
-<table><tr><th>Lead</th><th>Touch</th><th>Status</th><th>Subject</th><th>Created</th></tr>{emails_html}</table></div>
-<div class='section'><h2>Recent Replies</h2>
-<table><tr><th>Lead</th><th>Classification</th><th>Action</th><th>Approval</th><th>Time</th></tr>{replies_html}</table></div>
-</body></html>"""
+    # Only the columns the page renders, as plain rows (no ORM hydration)
+    leads = db.query(
+        Lead.lead_id, Lead.company_name, Lead.contact_email, Lead.channel,
+        Lead.status, Lead.niche, minute_text(Lead.created_at).label("created_at"),
+    ).order_by(Lead.created_at.desc()).limit(50).all()
+    recent_emails = db.query(
+        EmailJob.lead_id, EmailJob.touch_number, EmailJob.status, EmailJob.subject,
+        minute_text(EmailJob.created_at).label("created_at"),
+    ).filter(EmailJob.status != EmailJobStatus.QUEUED.value).order_by(EmailJob.created_at.desc()).limit(20).all()
+    # The pending-approval count rides along on the replies query; with no
+    # replies at all there is nothing pending either
+    pending = db.query(func.count(Reply.id)).filter(
+        Reply.draft_approved.is_(None), Reply.draft_response.isnot(None),
+    ).scalar_subquery()
+    recent_replies = db.query(
+        Reply.lead_id, Reply.classification, Reply.action, Reply.draft_approved,
+        minute_text(Reply.created_at).label("created_at"), pending.label("pending_approval"),
+    ).order_by(Reply.created_at.desc()).limit(20).all()
+    pending_approval = recent_replies[0].pending_approval if recent_replies else 0
+
+    # Rows are already fetched; the page goes out chunk by chunk as the
+    # template renders instead of being joined into one string first
+    return StreamingResponse(_DASHBOARD_TEMPLATE.generate(
+        stats=stats, leads=leads, recent_emails=recent_emails, recent_replies=recent_replies,
+        pending_approval=pending_approval, status_colors=_STATUS_COLORS,
+    ), media_type="text/html")
 
 
 # ── API: Leads ───────────────────────────────────────────────────
@@ -109,23 +127,59 @@ def create_lead(req: LeadCreateRequest, db: Session = Depends(get_db)):
     return result
 
 
-@app.get("/api/leads")
-def list_leads(status: Optional[str] = None, limit: int = 50, db: Session = Depends(get_db)):
-    q = db.query(Lead)
+@app.get("/api/leads", response_model=list[LeadSummary])
+def list_leads(status: Optional[LeadStatus] = None, limit: int = 50,
+               before_created_at: Optional[datetime] = None, before_lead_id: Optional[str] = None,
+               db: Session = Depends(get_db)):
+    """Newest first. Pass the last row's created_at and lead_id to get the next page."""
+    # Only the returned columns, as rows named after LeadSummary's fields:
+    # no ORM identity map or hydration, and no dict building per row
+    q = db.query(
+        Lead.lead_id, Lead.company_name, Lead.contact_email.label("email"), Lead.purchasing_email,
+        Lead.website_url.label("website"), Lead.store_count, Lead.hq_location.label("hq"), Lead.focus,
+        Lead.status, Lead.channel, Lead.niche, Lead.created_at,
+    )
     if status:
-        q = q.filter(Lead.status == status)
-    leads = q.order_by(Lead.created_at.desc()).limit(limit).all()
-    return [{"lead_id": l.lead_id, "company_name": l.company_name, "email": l.contact_email,
-             "purchasing_email": l.purchasing_email, "website": l.website_url,
-             "store_count": l.store_count, "hq": l.hq_location, "focus": l.focus,
-             "status": l.status, "channel": l.channel, "niche": l.niche} for l in leads]
+        q = q.filter(Lead.status == status.value)
+    q = _before(q, Lead.created_at, Lead.lead_id, before_created_at, before_lead_id)
+    return q.order_by(Lead.created_at.desc(), Lead.lead_id.desc()).limit(limit).all()
+
+
+def _before(q, created_col, id_col, before_created_at, before_id):
+    """
+    Keyset page filter for newest-first listings: rows strictly older than
+    the cursor, with the id breaking created_at ties (bulk imports share one
+    timestamp). Each page is an index range scan however deep it is. The
+    cursor id binds with the column's type, so a malformed one misses
+    instead of failing the uuid cast.
+    """
+    if before_created_at is None:
+        return q
+    if before_id is None:
+        return q.filter(created_col < before_created_at)
+    return q.filter(tuple_(created_col, id_col) < tuple_(before_created_at, literal(before_id, id_col.type)))
 
 
 @app.get("/api/leads/{lead_id}")
 def get_lead(lead_id: str, db: Session = Depends(get_db)):
-    lead = db.query(Lead).filter(Lead.lead_id == lead_id).first()
+    # Everything the response touches in one round of queries: the one-to-one
+    # rows ride along on the lead SELECT, the collections get one query each
+    lead = (
+        db.query(Lead)
+        .options(
+            joinedload(Lead.signals), joinedload(Lead.leverage),
+            selectinload(Lead.email_jobs),
+        )
+        .filter(Lead.lead_id == lead_id)
+        .first()
+    )
     if not lead:
         raise HTTPException(404, "Lead not found")
+    # Only the 100-character preview of each reply leaves the database
+    replies = db.query(
+        Reply.classification, Reply.action,
+        func.substr(Reply.raw_text, 1, 100).label("text"), Reply.draft_approved,
+    ).filter(Reply.lead_id == lead_id).order_by(Reply.id).all()
     return {
         "lead_id": lead.lead_id, "company_name": lead.company_name,
         "email": lead.contact_email, "purchasing_email": lead.purchasing_email,
@@ -146,41 +200,57 @@ def get_lead(lead_id: str, db: Session = Depends(get_db)):
         "emails": [{"touch": e.touch_number, "status": e.status, "subject": e.subject}
                    for e in lead.email_jobs],
         "replies": [{"classification": r.classification, "action": r.action,
-                     "text": r.raw_text[:100] if r.raw_text else None,
-                     "approved": r.draft_approved}
-                    for r in lead.replies],
+                     "text": r.text or None, "approved": r.draft_approved}
+                    for r in replies],
     }
 
 
 @app.post("/api/leads/csv")
 async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
     content = await file.read()
+    # The inserts are blocking DB work; keep them off the event loop
+    return await run_in_threadpool(_import_csv, db, content)
+
+
+# Lead field, the CSV headers that may carry it (first present wins), and
+# its value when the file has none of them
+_CSV_COLUMNS = (
+    ("company_name", ("company_name", "company"), ""),
+    ("website_url", ("website_url", "website"), ""),
+    ("contact_email", ("contact_email", "email"), ""),
+    ("store_count", ("store_count",), None),
+    ("hq_location", ("hq", "hq_location"), None),
+    ("focus", ("focus",), None),
+    ("channel", ("channel",), None),
+    ("niche", ("niche",), None),
+    ("location", ("location", "locations"), None),
+)
+
+
+def _import_csv(db: Session, content: bytes) -> dict:
     reader = csv.DictReader(io.StringIO(content.decode("utf-8")))
-    results = {"created": 0, "skipped": 0, "errors": 0}
-    for row in reader:
-        try:
-            req = LeadCreateRequest(
-                company_name=row.get("company_name", row.get("company", "")),
-                website_url=row.get("website_url", row.get("website", "")),
-                contact_email=row.get("contact_email", row.get("email", "")),
-                store_count=row.get("store_count"),
-                hq_location=row.get("hq", row.get("hq_location")),
-                focus=row.get("focus"),
-                channel=row.get("channel"),
-                niche=row.get("niche"),
-                location=row.get("location", row.get("locations")),
-            )
-            result = pipeline.create_lead(db, req)
-            if result.get("suppressed") or result.get("dedupe"):
-                results["skipped"] += 1
-            else:
-                results["created"] += 1
-        except Exception as e:
-            logger.error(f"CSV import error: {e}")
-            results["errors"] += 1
+    # Resolve header aliases once per file, not per row
+    headers = set(reader.fieldnames or ())
+    columns = [
+        (field, next((h for h in aliases if h in headers), None), default)
+        for field, aliases, default in _CSV_COLUMNS
+    ]
+    rows = [
+        {field: row[header] if header else default for field, header, default in columns}
+        for row in reader
+    ]
+    # One validation pass, then batched inserts (see create_leads_bulk)
+    reqs, rejected = validate_lead_rows(rows)
+    results = pipeline.create_leads_bulk(db, reqs)
+    results["errors"] += rejected
     return results
 
 
+# Placeholder-email helpers for import_sheet, compiled once
+_URL_PREFIX = re.compile(r"^(?:https?://)?(?:www\.)?")
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+
+
 @app.post("/api/leads/import-sheet")
 def import_sheet(leads_data: list[dict], db: Session = Depends(get_db)):
     """
@@ -198,7 +268,7 @@ def import_sheet(leads_data: list[dict], db: Session = Depends(get_db)):
       }
     ]
     """
-    results = {"created": 0, "skipped": 0, "errors": 0}
+    rows, errors = [], 0
     for row in leads_data:
         try:
             # Generate a contact email placeholder - will be enriched
@@ -207,39 +277,37 @@ def import_sheet(leads_data: list[dict], db: Session = Depends(get_db)):
 
             # Generate a temporary email based on domain
             if website_url:
-                domain = website_url.replace("https://", "").replace("http://", "").replace("www.", "").rstrip("/")
+                domain = _URL_PREFIX.sub("", website_url).rstrip("/")
                 if not domain:
                     domain = f"{company_name.lower().replace(' ', '')}.com"
                 contact_email = f"info@{domain}"
             else:
                 # Clean company name for email domain
-                import unicodedata, re
                 clean_name = unicodedata.normalize('NFKD', company_name.lower())
                 clean_name = clean_name.encode('ascii', 'ignore').decode('ascii')
-                clean_name = re.sub(r'[^a-z0-9]', '', clean_name)
+                clean_name = _NON_ALNUM.sub('', clean_name)
                 if not clean_name:
                     clean_name = "unknown"
                 contact_email = f"info@{clean_name}.com"
 
-            req = LeadCreateRequest(
-                company_name=company_name,
-                website_url=website_url,
-                contact_email=contact_email,
-                store_count=row.get("store_count"),
-                hq_location=row.get("hq"),
-                focus=row.get("focus"),
-                channel=row.get("channel"),
-                niche=row.get("niche"),
-                location=row.get("locations"),
-            )
-            result = pipeline.create_lead(db, req)
-            if result.get("suppressed") or result.get("dedupe"):
-                results["skipped"] += 1
-            else:
-                results["created"] += 1
+            rows.append({
+                "company_name": company_name,
+                "website_url": website_url,
+                "contact_email": contact_email,
+                "store_count": row.get("store_count"),
+                "hq_location": row.get("hq"),
+                "focus": row.get("focus"),
+                "channel": row.get("channel"),
+                "niche": row.get("niche"),
+                "location": row.get("locations"),
+            })
         except Exception as e:
             logger.error(f"Sheet import error: {e}")
-            results["errors"] += 1
+            errors += 1
+
+    reqs, rejected = validate_lead_rows(rows)
+    results = pipeline.create_leads_bulk(db, reqs)
+    results["errors"] += errors + rejected
     return results
 
 
@@ -262,16 +330,25 @@ def enrich_all_leads(db: Session = Depends(get_db)):
 @app.post("/api/db/migrate")
 def run_migrations(db: Session = Depends(get_db)):
     """Add missing columns to leads table (safe to run multiple times)."""
-    migrations = [
-        ("purchasing_email", "ALTER TABLE leads ADD COLUMN IF NOT EXISTS purchasing_email VARCHAR(300)"),
-        ("store_count", "ALTER TABLE leads ADD COLUMN IF NOT EXISTS store_count VARCHAR(50)"),
-        ("hq_location", "ALTER TABLE leads ADD COLUMN IF NOT EXISTS hq_location VARCHAR(300)"),
-        ("focus", "ALTER TABLE leads ADD COLUMN IF NOT EXISTS focus VARCHAR(500)"),
+    columns = [
+        ("purchasing_email", "ADD COLUMN IF NOT EXISTS purchasing_email VARCHAR(300)"),
+        ("store_count", "ADD COLUMN IF NOT EXISTS store_count VARCHAR(50)"),
+        ("hq_location", "ADD COLUMN IF NOT EXISTS hq_location VARCHAR(300)"),
+        ("focus", "ADD COLUMN IF NOT EXISTS focus VARCHAR(500)"),
     ]
+    # One ALTER in one transaction: one lock on leads and one commit, not four
+    try:
+        db.execute(text("ALTER TABLE leads " + ", ".join(clause for _, clause in columns)))
+        db.commit()
+        return {"migrations": [{"column": name, "status": "ok"} for name, _ in columns]}
+    except Exception:
+        db.rollback()
+
+    # Something failed; apply column by column to report which one
     results = []
-    for name, sql in migrations:
+    for name, clause in columns:
         try:
-            db.execute(text(sql))
+            db.execute(text(f"ALTER TABLE leads {clause}"))
             db.commit()
             results.append({"column": name, "status": "ok"})
         except Exception as e:
@@ -299,66 +376,79 @@ def handle_reply(lead_id: str, raw_text: str, db: Session = Depends(get_db)):
     return pipeline.handle_reply(db, lead_id, raw_text)
 
 
-@app.get("/api/replies/pending")
+@app.get("/api/replies/pending", response_model=list[PendingReply])
 def pending_replies(db: Session = Depends(get_db)):
-    replies = db.query(Reply).filter(
+    return db.query(
+        Reply.reply_id, Reply.lead_id, Reply.classification, Reply.objection_type,
+        func.nullif(func.substr(Reply.raw_text, 1, 200), "").label("raw_text"), Reply.draft_response,
+    ).filter(
         Reply.draft_approved.is_(None), Reply.draft_response.isnot(None)
     ).order_by(Reply.created_at.desc()).all()
-    return [{"reply_id": r.reply_id, "lead_id": r.lead_id,
-             "classification": r.classification, "objection_type": r.objection_type,
-             "raw_text": r.raw_text[:200] if r.raw_text else None,
-             "draft_response": r.draft_response}
-            for r in replies]
 
 
 @app.post("/api/replies/{reply_id}/approve")
 def approve_reply(reply_id: str, db: Session = Depends(get_db)):
-    reply = db.query(Reply).filter(Reply.reply_id == reply_id).first()
-    if not reply:
-        raise HTTPException(404, "Reply not found")
-    reply.draft_approved = True
-    db.commit()
+    _update_one(db, update(Reply).where(Reply.reply_id == reply_id).values(draft_approved=True),
+                "Reply not found")
     return {"status": "approved"}
 
 
 @app.post("/api/replies/{reply_id}/reject")
 def reject_reply(reply_id: str, db: Session = Depends(get_db)):
-    reply = db.query(Reply).filter(Reply.reply_id == reply_id).first()
-    if not reply:
-        raise HTTPException(404, "Reply not found")
-    reply.draft_approved = False
-    db.commit()
+    _update_one(db, update(Reply).where(Reply.reply_id == reply_id).values(draft_approved=False),
+                "Reply not found")
     return {"status": "rejected"}
 
 
+def _update_one(db: Session, stmt, not_found: str):
+    """Run a single-row UPDATE and commit; no match is a 404. One round trip, nothing loaded."""
+    if db.execute(stmt).rowcount == 0:
+        db.rollback()
+        raise HTTPException(404, not_found)
+    db.commit()
+
+
 # ── API: Webhooks (SmartLead / Instantly) ────────────────────────
 
 @app.post("/webhooks/provider")
 async def provider_webhook(request: Request, db: Session = Depends(get_db)):
     """Process delivery/reply webhooks from SmartLead or Instantly."""
-    payload = await request.json()
+    from pickr.integrations.webhook_auth import SIGNATURE_HEADER, verify_webhook
+    raw_body = await request.body()
+    # Authenticate the raw bytes before decoding anything
+    if not verify_webhook(WEBHOOK_SECRET, raw_body,
+                          signature=request.headers.get(SIGNATURE_HEADER),
+                          token=request.query_params.get("token")):
+        raise HTTPException(401, "Invalid webhook signature")
+    payload = orjson.loads(raw_body)
 
     # Import here to avoid circular
     from pickr.integrations.provider_adapter import get_provider
     adapter = get_provider()
     event = adapter.parse_webhook(payload)
 
-    if event["event"] == "replied":
-        email = event.get("email", "")
-        lead = db.query(Lead).filter(Lead.contact_email == email).first()
-        if lead:
-            pipeline.handle_reply(db, lead.lead_id, event.get("reply_text", ""),
-                                  provider_message_id=payload.get("message_id"))
+    # Reply handling queries the DB and calls the LLM synchronously; run it
+    # in the threadpool so one slow webhook doesn't stall the event loop
+    await run_in_threadpool(_apply_webhook_event, db, event, payload.get("message_id"))
+    return {"received": True}
+
 
-    elif event["event"] == "bounced":
-        email = event.get("email", "")
-        suppress(db, email, reason="bounce")
+# Built once so every webhook reuses the same compiled statement
+_LEAD_ID_BY_EMAIL = select(Lead.lead_id).where(Lead.contact_email == bindparam("email")).limit(1)
 
-    elif event["event"] == "unsubscribed":
-        email = event.get("email", "")
-        suppress(db, email, reason="unsubscribe")
 
-    return {"received": True}
+def _apply_webhook_event(db: Session, event, message_id: Optional[str]):
+    if event.event == "replied":
+        lead_id = db.execute(_LEAD_ID_BY_EMAIL, {"email": event.email}).scalar()
+        if lead_id:
+            pipeline.handle_reply(db, lead_id, event.reply_text or "",
+                                  provider_message_id=message_id)
+
+    elif event.event == "bounced":
+        suppress(db, event.email, reason="bounce")
+
+    elif event.event == "unsubscribed":
+        suppress(db, event.email, reason="unsubscribe")
 
 
 # ── API: Suppression ─────────────────────────────────────────────
@@ -371,39 +461,35 @@ def suppress_email(email: str, reason: str = "manual", db: Session = Depends(get
 
 # ── API: Audit ───────────────────────────────────────────────────
 
-@app.get("/api/audit")
-def audit_log(lead_id: Optional[str] = None, limit: int = 50, db: Session = Depends(get_db)):
-    q = db.query(AuditLog)
+@app.get("/api/audit", response_model=list[AuditLogEntry])
+def audit_log(lead_id: Optional[str] = None, limit: int = 50,
+              before_created_at: Optional[datetime] = None, before_id: Optional[int] = None,
+              db: Session = Depends(get_db)):
+    """Newest first. Pass the last row's created_at and id to get the next page."""
+    q = db.query(
+        AuditLog.id, AuditLog.event, AuditLog.lead_id, AuditLog.actor,
+        AuditLog.request_id, AuditLog.payload, AuditLog.created_at,
+    )
     if lead_id:
         q = q.filter(AuditLog.lead_id == lead_id)
-    logs = q.order_by(AuditLog.created_at.desc()).limit(limit).all()
-    return [{"event": l.event, "lead_id": l.lead_id, "actor": l.actor,
-             "request_id": l.request_id, "payload": l.payload,
-             "created_at": str(l.created_at)} for l in logs]
+    q = _before(q, AuditLog.created_at, AuditLog.id, before_created_at, before_id)
+    return q.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit).all()
 
 
 # ── API: Outcome (Step 81) ──────────────────────────────────────
 
 @app.post("/api/leads/{lead_id}/outcome")
 def set_outcome(lead_id: str, outcome: str, notes: Optional[str] = None, db: Session = Depends(get_db)):
-    lead = db.query(Lead).filter(Lead.lead_id == lead_id).first()
-    if not lead:
-        raise HTTPException(404, "Lead not found")
-    lead.outcome = outcome
-    lead.outcome_notes = notes
+    values = {"outcome": outcome, "outcome_notes": notes}
     if outcome == "deal_in_progress":
-        lead.status = "booked"
-    db.commit()
+        values["status"] = "booked"
+    _update_one(db, update(Lead).where(Lead.lead_id == lead_id).values(**values), "Lead not found")
     return {"lead_id": lead_id, "outcome": outcome}
 
 
 @app.post("/api/leads/{lead_id}/book")
 def mark_booked(lead_id: str, db: Session = Depends(get_db)):
-    lead = db.query(Lead).filter(Lead.lead_id == lead_id).first()
-    if not lead:
-        raise HTTPException(404, "Lead not found")
-    from datetime import datetime
-    lead.status = LeadStatus.BOOKED.value
-    lead.booked_at = datetime.utcnow()
-    db.commit()
+    _update_one(db, update(Lead).where(Lead.lead_id == lead_id).values(
+        status=LeadStatus.BOOKED.value, booked_at=datetime.utcnow(),
+    ), "Lead not found")
     return {"lead_id": lead_id, "status": "booked"}